@@ -0,0 +1,170 @@
+"""
+并发基准测试 - 对比同步部署（gunicorn sync + PyMySQL）与异步部署（asgi.py + aiomysql）
+对每种部署、每个并发数，用保持连接的客户端持续请求指定接口一段时间，
+统计吞吐量与 p50 / p99 延迟
+
+使用方法（两种部署需在同一台机器、连接同一个数据库）:
+1. 脚本自动启动两种部署（需安装 gunicorn、uvicorn、aiomysql）:
+   在backend目录下运行: python benchmarks/bench_async.py --launch
+2. 或手动启动后指定地址:
+   python benchmarks/bench_async.py --sync-url http://127.0.0.1:5000 \
+       --async-url http://127.0.0.1:5001
+可选参数: --concurrency 8 32 128  --duration 10  --path /api/user/all?limit=20
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+SYNC_PORT = 5101
+ASYNC_PORT = 5102
+# 启动参数与 gunicorn_conf.py / gunicorn_asgi_conf.py 中的进程、线程数一致
+SYNC_COMMAND = ['gunicorn', 'app:app', '--workers', '4', '--threads', '2',
+                '--worker-class', 'sync', '--bind', f'127.0.0.1:{SYNC_PORT}']
+ASYNC_COMMAND = ['gunicorn', 'asgi:application', '--workers', '4',
+                 '--worker-class', 'uvicorn.workers.UvicornWorker',
+                 '--bind', f'127.0.0.1:{ASYNC_PORT}']
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='同步 / 异步部署并发基准测试')
+    parser.add_argument('--launch', action='store_true', help='自动启动两种部署')
+    parser.add_argument('--sync-url', default=f'http://127.0.0.1:{SYNC_PORT}')
+    parser.add_argument('--async-url', default=f'http://127.0.0.1:{ASYNC_PORT}')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--duration', type=float, default=10, help='每轮持续秒数')
+    parser.add_argument('--path', action='append',
+                        help='请求的接口，可重复指定，轮流请求')
+    return parser.parse_args(argv)
+
+
+def launch(command, url, env):
+    process = subprocess.Popen(command, cwd=SRC_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + '/api/health', timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.3)
+    process.terminate()
+    raise RuntimeError(f"启动失败: {' '.join(command)}")
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('连接已关闭')
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+# 单个客户端：保持一个连接，循环请求直到截止时间
+async def _client(host, port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n'
+            writer.write(request.encode('latin-1'))
+            try:
+                status = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors.append(1)
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_level(url, paths, concurrency, duration):
+    parts = urlsplit(url)
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        _client(parts.hostname, parts.port or 80, paths, deadline, latencies, errors)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return 0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(0.50),
+        'p99': percentile(0.99),
+        'errors': len(errors),
+    }
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    paths = args.path or ['/api/user/all?limit=20', '/api/user/1']
+    processes = []
+    try:
+        if args.launch:
+            env = dict(os.environ)
+            env.pop('ADDRESS_BOOK_ASYNC', None)
+            processes.append(launch(SYNC_COMMAND, args.sync_url, env))
+            async_env = dict(env, ADDRESS_BOOK_ASYNC='1')
+            processes.append(launch(ASYNC_COMMAND, args.async_url, async_env))
+
+        print(f"接口: {', '.join(paths)}，每轮 {args.duration:g} 秒\n")
+        print(f"{'部署':<8}{'并发':>6}{'请求/秒':>12}"
+              f"{'p50(ms)':>10}{'p99(ms)':>10}{'错误':>8}")
+        for label, url in (('同步', args.sync_url), ('异步', args.async_url)):
+            for concurrency in args.concurrency:
+                result = asyncio.run(run_level(url, paths, concurrency, args.duration))
+                print(f"{label:<8}{concurrency:>6}{result['rps']:>12,.0f}"
+                      f"{result['p50']:>10.1f}{result['p99']:>10.1f}"
+                      f"{result['errors']:>8}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,109 @@
+"""
+冷启动基准测试 - 测量每个 worker 导入 app.py 的耗时
+1. 旧启动流程：导入 app 后执行 SELECT 1，并全表查询 update_time 为空的联系人
+   （原 app.py 中的启动修复）
+2. 新启动流程：只导入 app，不访问数据库（连接池在第一个请求时才建立连接）
+每种流程在全新的子进程中重复运行，取中位数
+
+使用方法:
+在backend目录下运行: python benchmarks/bench_cold_start.py [--rows 100000] [--repeat 7]
+默认使用临时 SQLite 数据库；指定 --database-uri 可以测量真实的 MySQL
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from sqlalchemy import create_engine, insert
+
+from exts import db
+from models import User
+
+# 原 app.py 在导入时执行的启动检查与修复
+LEGACY_BOOT = '''
+from sqlalchemy import text
+from models import User
+with app.app_context():
+    db.session.execute(text('SELECT 1'))
+    old_users = User.query.filter(User.update_time.is_(None)).all()
+    for user in old_users:
+        user.update_time = user.create_time
+    if old_users:
+        db.session.commit()
+'''
+
+BOOT_SCRIPT = '''
+import time
+started = time.perf_counter()
+from app import app, db
+{extra}
+print(time.perf_counter() - started)
+'''
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='worker 冷启动耗时基准测试')
+    parser.add_argument('--rows', type=int, default=100000,
+                        help='临时数据库中的联系人数')
+    parser.add_argument('--repeat', type=int, default=7, help='每种流程启动的次数')
+    parser.add_argument('--database-uri', help='使用已有数据库（不写入测试数据）')
+    return parser.parse_args(argv)
+
+
+def seed(uri, total):
+    engine = create_engine(uri)
+    db.metadata.create_all(engine)
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, total, 5000):
+            rows = []
+            for i in range(offset, min(offset + 5000, total)):
+                created = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+                rows.append({'username': f'user{i}', 'phone': f'1{i:010d}',
+                             'operator': 'system', 'is_favorite': i % 10 == 0,
+                             'create_time': created, 'update_time': created})
+            conn.execute(insert(User.__table__), rows)
+    engine.dispose()
+
+
+def measure(uri, extra, repeat):
+    env = dict(os.environ, ADDRESS_BOOK_DATABASE_URI=uri)
+    env.pop('ADDRESS_BOOK_ASYNC', None)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', BOOT_SCRIPT.format(extra=extra)],
+                                cwd=SRC_DIR, env=env, capture_output=True, text=True,
+                                check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = args.database_uri
+        if uri is None:
+            uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(uri, args.rows)
+            print(f"临时 SQLite 数据库，{args.rows} 个联系人")
+        print(f"每种流程启动 {args.repeat} 次，取中位数\n")
+
+        legacy = measure(uri, LEGACY_BOOT, args.repeat)
+        current = measure(uri, '', args.repeat)
+        print(f"  旧启动流程（启动时修复数据）: {legacy * 1000:>10.1f} ms")
+        print(f"  新启动流程（延迟连接）      : {current * 1000:>10.1f} ms")
+        print(f"  每个 worker 节省 {(legacy - current) * 1000:.1f} ms")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
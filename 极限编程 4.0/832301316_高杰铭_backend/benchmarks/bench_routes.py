@@ -0,0 +1,347 @@
+"""
+接口基准测试 - 在大规模数据下测量 controller/user.py 中每个接口的吞吐量与延迟
+1. 用 seed_data.py 生成 10k / 100k / 1m 个联系人及长尾分布的版本历史
+   （按 --users 与 --seed 缓存，重复运行不再生成）
+2. 每次运行复制一份数据库副本，通过 Flask 测试客户端依次压测各接口
+   （不经过网络与 WSGI 服务器）
+3. 记录每个接口的吞吐量、p50/p95/p99 延迟和平均 SQL 条数，写入 JSON 结果文件
+4. 指定 --baseline 时与保存的基线结果对比，
+   p95 延迟或吞吐量变差超过 --threshold 视为退化（退出码为 1）
+
+使用方法:
+在backend目录下运行:
+    python benchmarks/bench_routes.py --users 100k --output result.json
+与基线对比:
+    python benchmarks/bench_routes.py --users 100k --baseline baseline.json
+只测部分接口:
+    python benchmarks/bench_routes.py --routes get,edit --requests 2000
+指定 --database-uri 可以测量已用 seed_data.py 写入数据的 MySQL（测试会修改其中的数据）
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import sqlalchemy
+from sqlalchemy import select
+
+from models import User
+from seed_data import ContactFactory, parse_users, seed_database
+from sql_stats import count_statements
+
+# 接口执行顺序：delete 删除的是 create 新建的联系人，保证各次运行的数据规模一致
+ROUTES = ('create', 'all', 'all_deep', 'get', 'edit', 'versions', 'versions_heavy',
+          'toggle', 'delete')
+# versions_heavy 从版本数最多的这部分联系人中抽样
+HEAVY_FRACTION = 0.01
+PAGE_SIZE = 20
+PERCENTILES = (50, 95, 99)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='接口基准测试')
+    parser.add_argument('--users', type=parse_users, default='10k',
+                        help='联系人数量：10k / 100k / 1m 或具体数字')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='随机种子（同时用于生成数据与请求序列）')
+    parser.add_argument('--requests', type=int, default=500, help='每个接口的请求数')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='每个接口正式计时前的预热请求数')
+    parser.add_argument('--routes', default=','.join(ROUTES),
+                        help='要测试的接口，逗号分隔')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(),
+                                                           'address_book_bench'),
+                        help='缓存生成的 SQLite 数据库的目录')
+    parser.add_argument('--database-uri',
+                        help='使用已写入数据的数据库，而不是 SQLite 副本')
+    parser.add_argument('--output', default='bench_routes_result.json',
+                        help='结果文件路径')
+    parser.add_argument('--baseline', help='用于对比的基线结果文件')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='判定为退化的相对变化（默认 10%%）')
+    args = parser.parse_args(argv)
+    args.routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"未知的接口: {', '.join(sorted(unknown))}")
+    return args
+
+
+# 数据库地址与监控目录需要在首次导入 config 之前通过环境变量指定
+def configure_environment(uri, workdir):
+    os.environ['ADDRESS_BOOK_DATABASE_URI'] = uri
+    os.environ['ADDRESS_BOOK_METRICS_DIR'] = os.path.join(workdir, 'metrics')
+    os.environ.pop('ADDRESS_BOOK_REPLICA_URIS', None)
+    os.environ.pop('ADDRESS_BOOK_ASYNC', None)
+
+
+# 准备本次运行使用的数据库：SQLite 时复制缓存的种子数据库，避免上一次运行的修改影响结果
+def prepare_database(args, working):
+    if args.database_uri:
+        return
+    os.makedirs(args.data_dir, exist_ok=True)
+    cached = os.path.join(args.data_dir, f'contacts_{args.users}_{args.seed}.db')
+    if not os.path.exists(cached):
+        print(f"生成 {args.users} 个联系人的种子数据库（只需一次）: {cached}")
+        partial = cached + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        info = seed_database(f'sqlite:///{partial}', args.users, args.seed)
+        os.replace(partial, cached)
+        print(f"✓ {info['versions']} 条版本记录，用时 {info['seconds']} 秒\n")
+    shutil.copyfile(cached, working)
+
+
+# 导入 app.py（需在 configure_environment 之后）
+def load_app():
+    from app import app, db
+    # 按生产配置测量：关闭调试模式（紧凑 JSON、不写 SQL 统计响应头）
+    app.config['DEBUG'] = False
+    return app, db
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = round(pct / 100 * len(sorted_values) + 0.5) - 1
+    index = max(0, min(len(sorted_values) - 1, rank))
+    return sorted_values[index]
+
+
+# 生成各接口的请求序列；每个请求为 (method, path, json)
+class Workload:
+    def __init__(self, user_ids, heavy_ids, seed):
+        self.rng = random.Random(seed)
+        self.factory = ContactFactory(seed + 1)
+        self.user_ids = user_ids
+        self.heavy_ids = heavy_ids or user_ids
+        self.created_ids = []
+        self.deep_cursor = None
+        self.counter = 0
+
+    def random_id(self):
+        return self.rng.choice(self.user_ids)
+
+    def create(self):
+        self.counter += 1
+        contact = self.factory.contact(self.counter)
+        contact['username'] = f"bench{self.counter}_{contact['username']}"[:50]
+        if contact['email']:
+            contact['email'] = f"bench{self.counter}_{contact['email']}"
+        contact.pop('create_time')
+        return 'POST', '/api/user/create', contact
+
+    def all(self):
+        return 'GET', f'/api/user/all?limit={PAGE_SIZE}', None
+
+    # 沿着游标一页页向后翻，翻到底后从头开始
+    def all_deep(self):
+        path = f'/api/user/all?limit={PAGE_SIZE}'
+        if self.deep_cursor:
+            path += f'&cursor={self.deep_cursor}'
+        return 'GET', path, None
+
+    def get(self):
+        return 'GET', f'/api/user/{self.random_id()}', None
+
+    def edit(self):
+        contact = self.factory.contact(self.rng.randint(0, 10 ** 9))
+        user_id = self.random_id()
+        body = {'username': f'edited{user_id}', 'phone': contact['phone'],
+                'email': None, 'address': contact['address'],
+                'social_media': contact['social_media'], 'notes': contact['notes'],
+                'is_favorite': contact['is_favorite'], 'operator': 'bench'}
+        return 'PUT', f'/api/user/edit/{user_id}', body
+
+    def versions(self):
+        return 'GET', f'/api/user/versions/{self.random_id()}?limit={PAGE_SIZE}', None
+
+    def versions_heavy(self):
+        user_id = self.rng.choice(self.heavy_ids)
+        return 'GET', f'/api/user/versions/{user_id}?limit={PAGE_SIZE}', None
+
+    def toggle(self):
+        path = f'/api/user/toggle-favorite/{self.random_id()}'
+        return 'POST', path, {'operator': 'bench'}
+
+    # 优先删除本次 create 新建的联系人，不够时删除原有联系人（不会重复删除）
+    def delete(self):
+        if self.created_ids:
+            user_id = self.created_ids.pop()
+        else:
+            user_id = self.user_ids.pop(self.rng.randrange(len(self.user_ids)))
+        return 'DELETE', f'/api/user/delete/{user_id}', None
+
+    # 记录响应中需要用于后续请求的信息
+    def observe(self, route, body):
+        if route == 'create' and body.get('data'):
+            self.created_ids.append(body['data']['id'])
+        elif route == 'all_deep':
+            self.deep_cursor = body.get('next_cursor')
+
+
+def run_route(client, workload, route, total, warmup):
+    latencies = []
+    statements = 0
+    errors = 0
+    started = time.perf_counter()
+    for index in range(warmup + total):
+        method, path, body = getattr(workload, route)()
+        with count_statements() as stats:
+            request_started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - request_started
+        payload = response.get_json(silent=True) or {}
+        workload.observe(route, payload)
+        if index == warmup - 1:
+            started = time.perf_counter()
+        if index < warmup:
+            continue
+        latencies.append(elapsed)
+        statements += stats.count
+        if response.status_code != 200 or payload.get('code') != 200:
+            errors += 1
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        'requests': total,
+        'errors': errors,
+        'throughput_rps': round(total / wall, 1) if wall else None,
+        'mean_ms': (round(sum(latencies) / len(latencies) * 1000, 3)
+                    if latencies else None),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else None,
+        'sql_statements_per_request': round(statements / total, 2) if total else None,
+    }
+    for pct in PERCENTILES:
+        value = percentile(latencies, pct)
+        result[f'p{pct}_ms'] = round(value * 1000, 3) if value is not None else None
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    meta = baseline['meta']
+    print(f"\n与基线对比（{meta.get('commit')} @ {meta.get('timestamp')}）:")
+    for key in ('users', 'seed', 'database'):
+        before, after = meta.get(key), results['meta'].get(key)
+        if before != after:
+            print(f"  ⚠ 基线的 {key} 不同: {before} -> {after}")
+    regressions = []
+    for route, current in results['routes'].items():
+        previous = baseline['routes'].get(route)
+        if not previous:
+            print(f"  {route:<16} 基线中没有该接口")
+            continue
+        p95_before, p95_after = previous['p95_ms'], current['p95_ms']
+        rps_before, rps_after = previous['throughput_rps'], current['throughput_rps']
+        p95_change = p95_after / p95_before - 1 if p95_before else 0
+        rps_change = rps_after / rps_before - 1 if rps_before else 0
+        regressed = p95_change > threshold or rps_change < -threshold
+        if regressed:
+            regressions.append(route)
+        print(f"  {route:<16} p95 {p95_before:>9.2f} -> {p95_after:>9.2f} ms"
+              f" ({p95_change:+.1%})"
+              f"   吞吐 {rps_before:>8.1f} -> {rps_after:>8.1f} req/s"
+              f" ({rps_change:+.1%})"
+              f"{'   ❌ 退化' if regressed else ''}")
+    return regressions
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    with tempfile.TemporaryDirectory() as workdir:
+        working = os.path.join(workdir, 'bench.db')
+        uri = args.database_uri or f'sqlite:///{working}'
+        configure_environment(uri, workdir)
+        prepare_database(args, working)
+        app, db = load_app()
+
+        with app.app_context():
+            user_ids = list(db.session.scalars(select(User.id).order_by(User.id)))
+            heavy_count = max(1, int(len(user_ids) * HEAVY_FRACTION))
+            heavy_ids = list(db.session.scalars(
+                select(User.id)
+                .order_by(User.version_count.desc(), User.id)
+                .limit(heavy_count)
+            ))
+        if not user_ids:
+            print("❌ 数据库中没有联系人，请先用 seed_data.py 生成数据")
+            return False
+
+        results = {
+            'meta': {
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'commit': git_commit(),
+                'users': args.users,
+                'seed': args.seed,
+                'requests_per_route': args.requests,
+                'warmup': args.warmup,
+                'database': sqlalchemy.engine.make_url(uri).get_backend_name(),
+                'python': platform.python_version(),
+                'sqlalchemy': sqlalchemy.__version__,
+                'platform': platform.platform(),
+            },
+            'routes': {},
+        }
+        print(f"{len(user_ids)} 个联系人，每个接口 {args.requests} 次请求"
+              f"（预热 {args.warmup} 次）\n")
+        print(f"  {'接口':<14} {'吞吐(req/s)':>12} {'p50(ms)':>9} {'p95(ms)':>9}"
+              f" {'p99(ms)':>9} {'SQL/请求':>9} {'错误':>5}")
+
+        workload = Workload(user_ids, heavy_ids, args.seed)
+        client = app.test_client()
+        for route in ROUTES:
+            if route not in args.routes:
+                continue
+            result = run_route(client, workload, route, args.requests, args.warmup)
+            results['routes'][route] = result
+            print(f"  {route:<16} {result['throughput_rps']:>12.1f}"
+                  f" {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}"
+                  f" {result['p99_ms']:>9.2f}"
+                  f" {result['sql_statements_per_request']:>9.2f}"
+                  f" {result['errors']:>5}")
+
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 结果已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ 以下接口相对基线退化超过 {args.threshold:.0%}:"
+                  f" {', '.join(regressions)}")
+            return False
+        print("\n✅ 没有超过阈值的退化")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+"""
+序列化基准测试 - 对比 /api/user/all 的两种序列化路径
+1. 旧路径：ORM 查询 User 对象 -> to_dict() -> 标准库 json
+2. 新路径：Core 查询所需列 -> user_row_to_dict() -> FastJSONProvider(orjson)
+脚本会先校验两条路径输出逐字节一致，再分别统计每秒处理的行数
+
+使用方法:
+在backend目录下运行: python benchmarks/bench_serialization.py [行数] [重复次数]
+（使用临时 SQLite 数据库，不会访问 MySQL）
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert, select
+
+import config
+from exts import db
+from json_provider import FastJSONProvider
+from models import User
+from serializers import USER_COLUMNS, user_row_to_dict, format_time
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英'
+
+
+def build_app(db_path):
+    app = Flask(__name__)
+    app.config.from_object(config.Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    db.init_app(app)
+    return app
+
+
+def seed(total):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(total):
+        given = ''.join(rng.choice(GIVEN_NAMES) for _ in range(rng.randint(1, 2)))
+        name = rng.choice(SURNAMES) + given
+        created = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        rows.append({
+            'username': f'{name}{i}',
+            'phone': f'1{rng.randint(3, 9)}{rng.randint(0, 999999999):09d}',
+            'email': f'user{i}@example.com' if i % 3 else None,
+            'address': '北京市海淀区中关村大街' if i % 4 == 0 else None,
+            'social_media': f'wx_{i}' if i % 5 == 0 else None,
+            'notes': '常联系 😀 "VIP"\n' if i % 7 == 0 else None,
+            'is_favorite': i % 10 == 0,
+            'operator': 'system',
+            'create_time': created,
+            'update_time': created + timedelta(seconds=rng.randint(0, 86400)),
+        })
+    for start_index in range(0, total, 5000):
+        db.session.execute(insert(User), rows[start_index:start_index + 5000])
+    db.session.commit()
+
+
+ORDER_BY = (User.is_favorite.desc(), User.create_time.desc(), User.id.desc())
+
+
+def orm_path(app):
+    app.json = DefaultJSONProvider(app)
+    users = User.query.order_by(*ORDER_BY).all()
+    return jsonify({'code': 200, 'data': [user.to_dict() for user in users]}).get_data()
+
+
+def core_path(app):
+    app.json = FastJSONProvider(app)
+    rows = db.session.execute(select(*USER_COLUMNS).order_by(*ORDER_BY))
+    data = [user_row_to_dict(row) for row in rows]
+    return jsonify({'code': 200, 'data': data}).get_data()
+
+
+def measure(app, path, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        format_time.cache_clear()
+        started = time.perf_counter()
+        path(app)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            seed(total)
+            print(f"数据量: {total} 行，每种路径重复 {repeat} 次取最快一次\n")
+
+            for compact in (False, True):
+                label = '紧凑输出' if compact else '缩进输出(DEBUG)'
+                DefaultJSONProvider.compact = compact
+                FastJSONProvider.compact = compact
+                old_body = orm_path(app)
+                new_body = core_path(app)
+                if old_body != new_body:
+                    print(f"❌ {label}: 两种路径输出不一致！")
+                    return False
+
+                old_time = measure(app, orm_path, repeat)
+                new_time = measure(app, core_path, repeat)
+                print(f"{label}: 输出一致（{len(new_body)} 字节）")
+                print(f"  ORM + to_dict + json : {total / old_time:>12,.0f} 行/秒")
+                print(f"  Core + 字典 + orjson : {total / new_time:>12,.0f} 行/秒")
+                print(f"  提升 {old_time / new_time:.2f} 倍\n")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
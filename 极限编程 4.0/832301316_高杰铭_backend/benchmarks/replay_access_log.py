@@ -0,0 +1,341 @@
+"""
+访问日志回放 - 按生产环境的请求组成与到达间隔，对本地实例重放流量
+1. 解析 gunicorn（默认格式，可带 access_log_format 末尾的 %(D)s 耗时）
+   与 uwsgi 的访问日志，自动识别格式
+2. 按日志中的时间重建请求到达间隔（gunicorn 日志只精确到秒，
+   同一秒内的请求均匀分布），可按 --speed 倍速回放
+3. 日志中没有请求体，POST / PUT 的请求体按接口合成
+   （与 seed_data.py 使用相同的数据生成规则）
+4. 按接口统计回放延迟的 p50/p95/p99 与状态码分布；
+   日志中带耗时时同时列出生产环境的延迟，便于对比
+   延迟从计划发送时间开始计算，服务端处理不过来造成的排队也计入延迟
+
+使用方法:
+在backend目录下运行:
+    python benchmarks/replay_access_log.py /www/wwwlogs/python/src/gunicorn_acess.log
+2 倍速回放前 10000 条:
+    python benchmarks/replay_access_log.py gunicorn_acess.log --speed 2 --limit 10000
+本地数据库只有 seed_data.py 生成的 N 个联系人时，
+用 --remap-ids N 把日志中的 id 映射到 1..N
+回放会执行日志中的写操作（创建 / 编辑 / 删除），请只对本地测试实例使用
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_async import read_response
+from seed_data import ContactFactory
+
+# gunicorn 默认格式: %(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"，
+#                   末尾可选 %(D)s（微秒）
+GUNICORN_LINE = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) [^"]*" (?P<status>\d{3}) \S+'
+    r'(?: "[^"]*" "[^"]*")?(?: (?P<micros>\d+))?\s*$'
+)
+# uwsgi 默认格式: [pid: 1|app: 0|req: 1/1] 127.0.0.1 () {34 vars in 612 bytes}
+#                 [Sat Oct 18 14:17:30 2026] GET /api/user/all
+#                 => generated 1234 bytes in 5 msecs (HTTP/1.1 200) ...
+UWSGI_LINE = re.compile(
+    r'^\[pid: .*?\] \S+ .*?'
+    r'\[(?P<time>[A-Z][a-z]{2} [A-Z][a-z]{2} +\d+ [\d:]+ \d{4})\] '
+    r'(?P<method>[A-Z]+) (?P<path>\S+) => generated \d+ bytes '
+    r'in (?P<msecs>\d+) msecs \(\S+ (?P<status>\d{3})\)'
+)
+GUNICORN_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+UWSGI_TIME_FORMAT = '%a %b %d %H:%M:%S %Y'
+# 路径中的数字段视为 id，归并为同一个接口
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+ID_IN_PATH = re.compile(r'/(\d+)(?=/|\?|$)')
+PERCENTILES = (50, 95, 99)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='访问日志回放')
+    parser.add_argument('logs', nargs='+',
+                        help='gunicorn / uwsgi 访问日志，'
+                             '可指定多个（例如轮转后的日志）')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='回放目标地址')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='回放倍速（2 表示 2 倍速）')
+    parser.add_argument('--limit', type=int, help='只回放前 N 条请求')
+    parser.add_argument('--prefix', default='/api/', help='只回放该前缀的路径')
+    parser.add_argument('--remap-ids', type=int, metavar='N',
+                        help='把路径中的 id 映射到 1..N')
+    parser.add_argument('--bulk-rows', type=int, default=20,
+                        help='合成批量导入请求时每次的行数')
+    parser.add_argument('--max-connections', type=int, default=64,
+                        help='最多同时使用的连接数')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='合成请求体使用的随机种子')
+    parser.add_argument('--output', help='结果写入 JSON 文件')
+    return parser.parse_args(argv)
+
+
+def route_of(method, path):
+    return f"{method} {ID_SEGMENT.sub('/<id>', path.split('?', 1)[0])}"
+
+
+# 解析一行日志，返回 (时间戳, method, path, status, 生产耗时秒数或 None)；
+# 无法识别的行返回 None
+def parse_line(line):
+    match = GUNICORN_LINE.match(line)
+    if match:
+        timestamp = datetime.strptime(match['time'], GUNICORN_TIME_FORMAT).timestamp()
+        duration = int(match['micros']) / 1_000_000 if match['micros'] else None
+        return timestamp, match['method'], match['path'], int(match['status']), duration
+    match = UWSGI_LINE.search(line)
+    if match:
+        logged_time = ' '.join(match['time'].split())
+        timestamp = datetime.strptime(logged_time, UWSGI_TIME_FORMAT).timestamp()
+        duration = int(match['msecs']) / 1000
+        return timestamp, match['method'], match['path'], int(match['status']), duration
+    return None
+
+
+# 读取日志并计算每个请求相对第一条请求的发送时间（秒，已按倍速缩放）
+def load_requests(paths, prefix, speed, limit):
+    entries = []
+    skipped = 0
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                entry = parse_line(line)
+                # HEAD 响应没有响应体，回放时无法按 Content-Length 读取，直接跳过
+                if (entry is None or entry[1] == 'HEAD'
+                        or not entry[2].startswith(prefix)):
+                    skipped += 1
+                    continue
+                entries.append(entry)
+    # 日志按请求结束的顺序写入，先按时间稳定排序
+    entries.sort(key=lambda entry: entry[0])
+    if limit:
+        entries = entries[:limit]
+
+    # 同一秒内的多条请求在这一秒内均匀分布
+    per_second = Counter(int(entry[0]) for entry in entries)
+    seen = Counter()
+    requests = []
+    start = int(entries[0][0]) if entries else 0
+    for timestamp, method, path, status, duration in entries:
+        second = int(timestamp)
+        offset = second - start + seen[second] / per_second[second]
+        seen[second] += 1
+        requests.append({'at': offset / speed, 'method': method, 'path': path,
+                         'route': route_of(method, path), 'logged_status': status,
+                         'logged_duration': duration})
+    return requests, skipped
+
+
+# 为日志中的请求生成回放用的路径与请求体
+class PayloadSynthesizer:
+    def __init__(self, seed, remap_ids, bulk_rows):
+        self.factory = ContactFactory(seed)
+        self.remap_ids = remap_ids
+        self.bulk_rows = bulk_rows
+        self.counter = 0
+        self.run_tag = f'{int(time.time()) % 100000}'
+
+    def path(self, path):
+        if not self.remap_ids:
+            return path
+        return ID_IN_PATH.sub(
+            lambda match: f'/{(int(match[1]) - 1) % self.remap_ids + 1}', path)
+
+    def _contact(self):
+        self.counter += 1
+        contact = self.factory.contact(self.counter)
+        contact.pop('create_time')
+        # 每次回放使用不同的前缀，避免与上一次回放创建的联系人重名
+        username = f"replay{self.run_tag}_{self.counter}_{contact['username']}"
+        contact['username'] = username[:50]
+        if contact['email']:
+            contact['email'] = f"replay{self.run_tag}_{contact['email']}"
+        contact['operator'] = 'replay'
+        return contact
+
+    def body(self, method, path):
+        route = route_of(method, path)
+        if route == 'POST /api/user/create':
+            return self._contact()
+        if route == 'POST /api/user/bulk-create':
+            return {'users': [self._contact() for _ in range(self.bulk_rows)],
+                    'operator': 'replay'}
+        if method == 'PUT':
+            contact = self._contact()
+            user_id = ID_IN_PATH.search(path)
+            suffix = user_id[1] if user_id else self.counter
+            contact['username'] = f"replay_edit{suffix}"
+            contact['email'] = None
+            return contact
+        if method in ('POST', 'PATCH'):
+            return {'operator': 'replay'}
+        return None
+
+
+def _encode_request(host, method, path, body):
+    head = f'{method} {path} HTTP/1.1\r\nHost: {host}\r\n'
+    payload = b''
+    if body is not None:
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        head += 'Content-Type: application/json\r\n'
+    head += f'Content-Length: {len(payload)}\r\n\r\n'
+    return head.encode('latin-1') + payload
+
+
+# 保持连接的连接池，同时使用的连接数不超过 limit
+class ConnectionPool:
+    def __init__(self, host, port, limit):
+        self.host = host
+        self.port = port
+        self.idle = []
+        self.slots = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        await self.slots.acquire()
+        if self.idle:
+            return self.idle.pop()
+        try:
+            return await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            self.slots.release()
+            raise
+
+    def release(self, connection, reusable):
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+        self.slots.release()
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+
+
+async def _send(pool, request, data, scheduled, results):
+    status = None
+    connection = None
+    try:
+        connection = await pool.acquire()
+        reader, writer = connection
+        writer.write(data)
+        status = await read_response(reader)
+    except (OSError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        if connection is not None:
+            pool.release(connection, status is not None)
+    results.append((request, status, time.perf_counter() - scheduled))
+
+
+# 按计划时间依次发出请求（开环：不等待前一个请求完成），只有在途的请求占用任务
+async def replay(url, requests, synthesizer, max_connections):
+    parts = urlsplit(url)
+    pool = ConnectionPool(parts.hostname, parts.port or 80, max_connections)
+    results = []
+    tasks = set()
+    started = time.perf_counter()
+    for request in requests:
+        path = synthesizer.path(request['path'])
+        data = _encode_request(parts.netloc, request['method'], path,
+                               synthesizer.body(request['method'], path))
+        scheduled = started + request['at']
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        task = asyncio.create_task(_send(pool, request, data, scheduled, results))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    pool.close()
+    return results, time.perf_counter() - started
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {f'p{pct}_ms': None for pct in PERCENTILES}
+    return {
+        f'p{pct}_ms': round(values[min(len(values) - 1, int(len(values) * pct / 100))]
+                            * 1000, 2)
+        for pct in PERCENTILES
+    }
+
+
+def summarize(results, elapsed):
+    by_route = {}
+    for request, status, latency in results:
+        by_route.setdefault(request['route'], []).append((request, status, latency))
+
+    routes = {}
+    for route, items in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        statuses = Counter(str(status) if status else 'error' for _, status, _ in items)
+        logged = [request['logged_duration'] for request, _, _ in items
+                  if request['logged_duration'] is not None]
+        routes[route] = {
+            'requests': len(items),
+            'statuses': dict(statuses),
+            'replay': _percentiles([latency for _, status, latency in items if status]),
+            'production': _percentiles(logged) if logged else None,
+        }
+    return {'requests': len(results), 'elapsed_seconds': round(elapsed, 2),
+            'throughput_rps': round(len(results) / elapsed, 1) if elapsed else None,
+            'routes': routes}
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    requests, skipped = load_requests(args.logs, args.prefix, args.speed, args.limit)
+    if not requests:
+        print("❌ 日志中没有可回放的请求")
+        return False
+
+    mix = Counter(request['route'] for request in requests)
+    span = requests[-1]['at']
+    print(f"读取 {len(requests)} 条请求（跳过 {skipped} 行），"
+          f"日志跨度 {span * args.speed:.0f} 秒，"
+          f"按 {args.speed:g} 倍速回放约 {span:.0f} 秒\n")
+    print("请求组成:")
+    for route, count in mix.most_common():
+        print(f"  {route:<40} {count:>8} ({count / len(requests):.1%})")
+
+    synthesizer = PayloadSynthesizer(args.seed, args.remap_ids, args.bulk_rows)
+    results, elapsed = asyncio.run(replay(args.url, requests, synthesizer,
+                                          args.max_connections))
+    summary = summarize(results, elapsed)
+
+    print(f"\n回放完成: {summary['requests']} 个请求，"
+          f"用时 {summary['elapsed_seconds']} 秒，{summary['throughput_rps']} req/s\n")
+    print(f"  {'接口':<38} {'请求数':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}"
+          f" {'生产 p95':>9}  状态码")
+    for route, stats in summary['routes'].items():
+        replayed = stats['replay']
+        production = stats['production']['p95_ms'] if stats['production'] else None
+        cells = [replayed['p50_ms'], replayed['p95_ms'], replayed['p99_ms'], production]
+        cells = ''.join(f" {cell:>9.2f}" if cell is not None else f" {'-':>9}"
+                        for cell in cells)
+        statuses = ' '.join(f'{status}×{count}'
+                            for status, count in sorted(stats['statuses'].items()))
+        print(f"  {route:<40} {stats['requests']:>6}{cells}  {statuses}")
+
+    if args.output:
+        summary['meta'] = {'logs': args.logs, 'url': args.url, 'speed': args.speed,
+                           'remap_ids': args.remap_ids, 'skipped_lines': skipped}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已写入 {args.output}")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,291 @@
+"""
+基准测试数据生成 - 生成可复现的大规模联系人与版本历史
+1. 联系人：常见姓氏按频率加权的中文姓名、真实号段的手机号、常见邮箱域名、省市区地址
+2. 版本历史：长尾分布，大多数联系人只有初始版本，少数联系人被反复修改上百次；
+   按 config.py 中的 VERSION_STORAGE_MODE / VERSION_SNAPSHOT_INTERVAL 编码
+   （与线上写入一致）
+相同的 --users 与 --seed 总是生成完全相同的数据
+
+使用方法:
+在backend目录下运行:
+    python benchmarks/seed_data.py --users 100k --output /tmp/bench_100k.db
+也可以指定 --database-uri 写入已有的空数据库（例如测试用的 MySQL）
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 添加src目录到路径
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from sqlalchemy import create_engine, event, insert, select
+
+from models import DataVersion, User, UserSearchToken, UserVersion
+from search_index import build_token_rows
+from versioning import VERSION_FIELDS
+
+# 常见姓氏及大致占比（‰）
+SURNAMES = [
+    ('王', 74), ('李', 72), ('张', 69), ('刘', 54), ('陈', 45), ('杨', 31),
+    ('黄', 23), ('赵', 22), ('吴', 20), ('周', 19), ('徐', 14), ('孙', 14),
+    ('马', 13), ('朱', 12), ('胡', 11), ('郭', 11), ('何', 10), ('林', 10),
+    ('高', 10), ('罗', 9), ('郑', 9), ('梁', 8), ('谢', 6), ('宋', 6),
+    ('唐', 6), ('许', 5), ('韩', 5), ('冯', 5), ('邓', 5), ('曹', 5),
+    ('彭', 5), ('曾', 5), ('萧', 4), ('田', 4), ('董', 4), ('潘', 3),
+    ('袁', 3), ('蔡', 3), ('蒋', 3), ('余', 3),
+    ('欧阳', 1), ('司马', 1), ('诸葛', 1),
+]
+GIVEN_CHARS = ('伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华建国志文玉兰'
+               '宇浩然子涵梓萱一诺欣怡思雨佳琪俊杰晨阳嘉怡雅婷鑫博文轩昊天瑞')
+PHONE_PREFIXES = ('130', '131', '132', '133', '135', '136', '137', '138', '139',
+                  '150', '151', '152', '153', '155', '156', '157', '158', '159',
+                  '166', '170', '173', '176', '177', '178', '180', '181', '182',
+                  '183', '185', '186', '187', '188', '189', '191', '195', '198', '199')
+EMAIL_DOMAINS = [('qq.com', 40), ('163.com', 20), ('126.com', 8), ('gmail.com', 8),
+                 ('outlook.com', 6), ('foxmail.com', 5), ('sina.com', 4),
+                 ('139.com', 3), ('hotmail.com', 3), ('example.com.cn', 3)]
+EMAIL_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+CITIES = [('北京市', '海淀区'), ('北京市', '朝阳区'), ('上海市', '浦东新区'),
+          ('上海市', '徐汇区'), ('广东省广州市', '天河区'), ('广东省深圳市', '南山区'),
+          ('浙江省杭州市', '西湖区'), ('江苏省南京市', '鼓楼区'),
+          ('四川省成都市', '武侯区'), ('湖北省武汉市', '洪山区'),
+          ('福建省福州市', '鼓楼区'), ('福建省厦门市', '思明区'),
+          ('陕西省西安市', '雁塔区'), ('山东省济南市', '历下区'),
+          ('湖南省长沙市', '岳麓区'), ('重庆市', '渝北区')]
+STREETS = ('中山路', '人民路', '解放路', '建设路', '和平路', '学院路', '科技园路',
+           '滨江大道', '长江路', '新华街')
+NOTES = ('大学同学', '同事', '客户，周三下午方便联系', '快递请放门卫', '老乡',
+         '健身房认识的朋友', '项目合作方', '邻居', '家人', '常联系 😀',
+         '"VIP" 客户\n注意回访')
+SOCIAL_PREFIXES = ('wx_', 'weibo_', 'dy_', 'qq_')
+
+# 版本数的长尾分布：P(额外修改次数 >= k) 约为 k^-ALPHA，最多 MAX_EDITS 次
+HISTORY_ALPHA = 1.6
+MAX_EDITS = 200
+BATCH_SIZE = 5000
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+START_TIME = datetime(2024, 1, 1)
+
+
+def parse_users(value):
+    return SCALES.get(value.lower()) or int(value)
+
+
+def _weighted(pairs):
+    values = [value for value, _ in pairs]
+    weights = [weight for _, weight in pairs]
+    return values, weights
+
+
+class ContactFactory:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.surnames, self.surname_weights = _weighted(SURNAMES)
+        self.domains, self.domain_weights = _weighted(EMAIL_DOMAINS)
+
+    def name(self, index):
+        rng = self.rng
+        surname = rng.choices(self.surnames, self.surname_weights)[0]
+        length = rng.choice((1, 2, 2, 2))
+        given = ''.join(rng.choice(GIVEN_CHARS) for _ in range(length))
+        # 用户名唯一：重名时加上序号
+        return f'{surname}{given}{index}'
+
+    def phone(self):
+        prefix = self.rng.choice(PHONE_PREFIXES)
+        return prefix + f'{self.rng.randint(0, 99_999_999):08d}'
+
+    def email(self, index):
+        rng = self.rng
+        domain = rng.choices(self.domains, self.domain_weights)[0]
+        if domain == 'qq.com':
+            return f'{rng.randint(10_000, 3_999_999_999)}{index}@qq.com'
+        handle = ''.join(rng.choice(EMAIL_LETTERS) for _ in range(rng.randint(3, 8)))
+        return f'{handle}{index}@{domain}'
+
+    def address(self):
+        rng = self.rng
+        city, district = rng.choice(CITIES)
+        return f'{city}{district}{rng.choice(STREETS)}{rng.randint(1, 999)}号'
+
+    def contact(self, index):
+        rng = self.rng
+        created = START_TIME + timedelta(seconds=rng.randint(0, 700 * 86400))
+        return {
+            'username': self.name(index),
+            'phone': self.phone() if rng.random() < 0.95 else None,
+            'email': self.email(index) if rng.random() < 0.6 else None,
+            'address': self.address() if rng.random() < 0.4 else None,
+            'social_media': (f'{rng.choice(SOCIAL_PREFIXES)}{index}'
+                             if rng.random() < 0.25 else None),
+            'notes': rng.choice(NOTES) if rng.random() < 0.2 else None,
+            'is_favorite': rng.random() < 0.08,
+            'operator': 'system',
+            'create_time': created,
+        }
+
+    def edit_count(self):
+        # 逆变换采样得到长尾（Pareto）分布的修改次数
+        edits = int(self.rng.random() ** (-1 / HISTORY_ALPHA)) - 1
+        return min(edits, MAX_EDITS)
+
+    # 生成一次修改后的字段值与变化的字段
+    def edit(self, state, index):
+        rng = self.rng
+        field = rng.choice(('phone', 'phone', 'email', 'address', 'notes',
+                            'social_media'))
+        new_state = dict(state)
+        if field == 'phone':
+            new_state['phone'] = self.phone()
+        elif field == 'email':
+            new_state['email'] = self.email(index)
+        elif field == 'address':
+            new_state['address'] = self.address()
+        elif field == 'notes':
+            new_state['notes'] = rng.choice(NOTES)
+        else:
+            prefix = rng.choice(SOCIAL_PREFIXES)
+            new_state['social_media'] = f'{prefix}{index}_{rng.randint(1, 99)}'
+        changed = {name for name in VERSION_FIELDS if new_state[name] != state[name]}
+        return new_state, changed
+
+
+# 按与 versioning.record_version 相同的规则编码一条版本记录
+def encode_version(user_id, state, changed, ordinal, update_time, delta, interval):
+    snapshot = changed is None or not delta or (ordinal - 1) % interval == 0
+    if snapshot:
+        row = {field: state[field] for field in VERSION_FIELDS}
+        changed_fields = None
+    else:
+        row = {field: (state[field] if field in changed else None)
+               for field in VERSION_FIELDS}
+        row['username'] = state['username']
+        changed_fields = ','.join(sorted(changed)) or None
+    row.update(user_id=user_id, operator=state['operator'], update_time=update_time,
+               is_snapshot=snapshot, changed_fields=changed_fields)
+    return row
+
+
+def _fast_sqlite(engine):
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.close()
+
+
+# 生成数据并写入 uri 指向的数据库（表结构由 create_all 创建），返回统计信息
+def seed_database(uri, users, seed=42, search_index=False, log=print):
+    # 在调用时才读取配置：bench_routes.py 会先通过环境变量指定数据库，再加载 config
+    from config import Config
+
+    engine = create_engine(uri)
+    _fast_sqlite(engine)
+    User.metadata.create_all(engine)
+    delta = Config.VERSION_STORAGE_MODE == 'delta'
+    interval = Config.VERSION_SNAPSHOT_INTERVAL
+    factory = ContactFactory(seed)
+    started = time.perf_counter()
+    total_versions = 0
+
+    with engine.begin() as conn:
+        if conn.execute(select(User.id).limit(1)).first() is not None:
+            raise RuntimeError('目标数据库中已有联系人，请使用空数据库')
+
+    for offset in range(0, users, BATCH_SIZE):
+        indexes = range(offset, min(offset + BATCH_SIZE, users))
+        contacts = []
+        histories = []
+        for index in indexes:
+            contact = factory.contact(index)
+            time_cursor = contact['create_time']
+            history = [(dict(contact), None, time_cursor)]
+            state = contact
+            for _ in range(factory.edit_count()):
+                state, changed = factory.edit(state, index)
+                time_cursor += timedelta(seconds=factory.rng.randint(60, 30 * 86400))
+                history.append((state, changed, time_cursor))
+            contact = dict(state, create_time=contact['create_time'],
+                           update_time=time_cursor, version_count=len(history))
+            contacts.append(contact)
+            histories.append(history)
+
+        with engine.begin() as conn:
+            conn.execute(insert(User.__table__), contacts)
+            user_ids = dict(conn.execute(
+                select(User.username, User.id)
+                .where(User.username.in_([contact['username'] for contact in contacts]))
+            ).all())
+            version_rows = []
+            token_rows = []
+            for contact, history in zip(contacts, histories):
+                user_id = user_ids[contact['username']]
+                for ordinal, entry in enumerate(history, start=1):
+                    state, changed, update_time = entry
+                    version_rows.append(encode_version(user_id, state, changed, ordinal,
+                                                       update_time, delta, interval))
+                if search_index:
+                    token_rows.extend(build_token_rows(user_id, contact))
+            conn.execute(insert(UserVersion.__table__), version_rows)
+            if token_rows:
+                conn.execute(insert(UserSearchToken.__table__), token_rows)
+            total_versions += len(version_rows)
+        log(f"  已写入 {min(offset + BATCH_SIZE, users)} / {users} 个联系人")
+
+    with engine.begin() as conn:
+        conn.execute(insert(DataVersion.__table__).values(id=1, version=1))
+    engine.dispose()
+    return {
+        'users': users,
+        'versions': total_versions,
+        'seed': seed,
+        'search_index': search_index,
+        'version_storage_mode': Config.VERSION_STORAGE_MODE,
+        'seconds': round(time.perf_counter() - started, 1),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='生成基准测试数据')
+    parser.add_argument('--users', type=parse_users, default='10k',
+                        help='联系人数量：10k / 100k / 1m 或具体数字')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output', help='生成的 SQLite 文件路径')
+    parser.add_argument('--database-uri', help='写入已有的空数据库')
+    parser.add_argument('--search-index', action='store_true',
+                        help='同时生成检索索引（数据量较大）')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if not args.output and not args.database_uri:
+        print("❌ 请指定 --output 或 --database-uri")
+        return False
+    uri = args.database_uri or f"sqlite:///{os.path.abspath(args.output)}"
+    if args.output and os.path.exists(args.output):
+        print(f"❌ {args.output} 已存在")
+        return False
+
+    print(f"开始生成 {args.users} 个联系人（seed={args.seed}）...")
+    info = seed_database(uri, args.users, args.seed, args.search_index)
+    if args.output:
+        with open(args.output + '.json', 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+    print(f"✓ 共 {info['users']} 个联系人、{info['versions']} 条版本记录，"
+          f"用时 {info['seconds']} 秒")
+    return True
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,80 @@
+"""
+版本历史整理脚本 - 按保留策略删除旧的版本记录
+支持的策略（可同时启用，默认读取 config.py 中的 VERSION_RETENTION_* 配置）:
+1. --keep-last N        每个用户只保留最近 N 个版本
+2. --max-age-days X     删除早于 X 天的版本
+3. --thin-after-days D  早于 D 天的版本每天只保留最后一个
+无论哪种策略，每个用户最新的版本都会保留。
+
+删除按 VERSION_COMPACT_CHUNK_SIZE 分块提交，不会长时间锁住 user_version 表，
+可以在 Flask 应用运行期间执行（例如由 cron 定时运行）。
+进度保存在状态文件中，中断后再次运行会从上次的位置继续。
+
+使用方法:
+在backend目录下运行: python compact_versions.py --keep-last 50
+只查看会删除多少记录: python compact_versions.py --keep-last 50 --dry-run
+"""
+
+import argparse
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from retention import policy_enabled, policy_from_config, run_compaction
+
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'compact_versions.state.json')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='按保留策略整理版本历史')
+    parser.add_argument('--keep-last', type=int, help='每个用户最多保留的版本数')
+    parser.add_argument('--max-age-days', type=int, help='删除早于该天数的版本')
+    parser.add_argument('--thin-after-days', type=int,
+                        help='早于该天数的版本每天只保留最后一个')
+    parser.add_argument('--chunk-size', type=int, help='每个事务最多删除的版本数')
+    parser.add_argument('--state-file', default=STATE_FILE, help='进度状态文件')
+    parser.add_argument('--dry-run', action='store_true', help='只统计，不删除')
+    return parser.parse_args(argv)
+
+
+def compact_versions(args):
+    """执行版本历史整理"""
+    with app.app_context():
+        policy = policy_from_config(app.config)
+        for key in policy:
+            if getattr(args, key) is not None:
+                policy[key] = getattr(args, key)
+        if not policy_enabled(policy):
+            print("❌ 未配置任何保留策略，请在 config.py 中设置或通过命令行参数指定")
+            return False
+        chunk_size = args.chunk_size or app.config['VERSION_COMPACT_CHUNK_SIZE']
+
+        try:
+            print(f"开始整理版本历史{'（仅统计）' if args.dry_run else ''}...")
+            print(f"保留策略: {policy}")
+
+            result = run_compaction(db.session, policy, chunk_size, args.state_file,
+                                    args.dry_run)
+
+            action = "可删除" if args.dry_run else "已删除"
+            print(f"✓ {action} {result['deleted_rows']} 条版本记录")
+            print(f"✓ 预计回收约 {result['reclaimed_bytes'] / 1024:.1f} KB 数据")
+            print("\n✅ 版本历史整理完成！")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 整理失败: {str(e)}")
+            print("再次运行将从中断的位置继续。")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = compact_versions(parse_args(sys.argv[1:]))
+    sys.exit(0 if success else 1)
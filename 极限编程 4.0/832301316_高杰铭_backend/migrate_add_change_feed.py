@@ -0,0 +1,74 @@
+"""
+数据库迁移脚本 - 联系人增量同步（/api/user/changes）
+执行此脚本以:
+1. 在 user 表添加 change_seq 字段（最后一次修改时的数据版本号）及 (change_seq, id) 索引
+2. 创建 deleted_user 表（已删除联系人的删除记录）
+
+已有数据的 change_seq 为 0，会在客户端首次同步时全部返回。
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_change_feed.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import DeletedUser, User
+from sqlalchemy import inspect, text
+
+INDEX_NAME = 'ix_user_change_seq_id'
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            # 检查并添加 change_seq 字段
+            try:
+                db.session.execute(text("SELECT change_seq FROM user LIMIT 1"))
+                print("✓ change_seq 字段已存在")
+            except:
+                db.session.rollback()
+                db.session.execute(text(
+                    "ALTER TABLE user ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0"
+                ))
+                db.session.commit()
+                print("✓ 添加 change_seq 字段成功")
+
+            # 检查并创建增量同步索引
+            indexes = inspect(db.engine).get_indexes('user')
+            existing = {index['name'] for index in indexes}
+            if INDEX_NAME in existing:
+                print(f"✓ {INDEX_NAME} 索引已存在")
+            else:
+                index = next(i for i in User.__table__.indexes if i.name == INDEX_NAME)
+                index.create(bind=db.engine)
+                print(f"✓ 创建 {INDEX_NAME} 索引成功")
+
+            # 创建删除记录表（已存在时跳过）
+            DeletedUser.__table__.create(bind=db.engine, checkfirst=True)
+            print("✓ deleted_user 表已就绪")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,54 @@
+"""
+数据库迁移脚本 - 添加全局数据版本号表
+执行此脚本以创建 data_version 表并写入初始计数行，
+读接口据此返回 ETag，数据未变化时直接响应 304
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_data_version.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import DataVersion
+from data_version import COUNTER_ID
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            DataVersion.__table__.create(bind=db.engine, checkfirst=True)
+            print("✓ data_version 表已就绪")
+
+            # 写入唯一的计数行，避免多个进程第一次写操作时同时插入
+            if db.session.get(DataVersion, COUNTER_ID):
+                print("✓ 计数行已存在")
+            else:
+                db.session.add(DataVersion(id=COUNTER_ID, version=0))
+                db.session.commit()
+                print("✓ 写入计数行成功")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
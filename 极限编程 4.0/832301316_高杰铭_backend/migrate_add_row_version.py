@@ -0,0 +1,54 @@
+"""
+数据库迁移脚本 - 编辑联系人的乐观并发控制
+执行此脚本以:
+1. 在 user 表添加 row_version 字段（行版本号，每次修改加一，编辑时用于检测并发修改）
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_row_version.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from sqlalchemy import text
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            # 检查并添加 row_version 字段（已有数据从 1 开始）
+            try:
+                db.session.execute(text("SELECT row_version FROM user LIMIT 1"))
+                print("✓ row_version 字段已存在")
+            except:
+                db.session.rollback()
+                db.session.execute(text(
+                    "ALTER TABLE user ADD COLUMN row_version INTEGER NOT NULL DEFAULT 1"
+                ))
+                db.session.commit()
+                print("✓ 添加 row_version 字段成功")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
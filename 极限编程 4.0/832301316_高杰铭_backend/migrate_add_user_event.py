@@ -0,0 +1,45 @@
+"""
+数据库迁移脚本 - 添加联系人变更事件表
+执行此脚本以创建 user_event 表（发件箱），
+写接口在同一事务中写入事件，/api/user/stream 据此向各 worker 上的连接推送变更
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_user_event.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import UserEvent
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            UserEvent.__table__.create(bind=db.engine, checkfirst=True)
+            print("✓ user_event 表已就绪")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
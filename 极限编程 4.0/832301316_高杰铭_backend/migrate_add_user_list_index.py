@@ -0,0 +1,61 @@
+"""
+数据库迁移脚本 - 添加用户列表分页索引
+执行此脚本以在 user 表上创建 (is_favorite, create_time, id) 复合索引，
+供 /api/user/all 的游标分页使用
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_user_list_index.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import User
+from sqlalchemy import inspect, text
+
+INDEX_NAME = 'ix_user_favorite_create_time_id'
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            # 游标比较不匹配 NULL，先把历史数据中的空收藏状态补为 0
+            result = db.session.execute(
+                text("UPDATE user SET is_favorite = 0 WHERE is_favorite IS NULL"))
+            db.session.commit()
+            print(f"✓ 修复了 {result.rowcount} 条 is_favorite 为空的数据")
+
+            # 检查并创建复合索引
+            indexes = inspect(db.engine).get_indexes('user')
+            existing = {index['name'] for index in indexes}
+            if INDEX_NAME in existing:
+                print(f"✓ {INDEX_NAME} 索引已存在")
+            else:
+                index = next(i for i in User.__table__.indexes if i.name == INDEX_NAME)
+                index.create(bind=db.engine)
+                print(f"✓ 创建 {INDEX_NAME} 索引成功")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
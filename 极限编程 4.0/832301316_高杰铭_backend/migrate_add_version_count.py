@@ -0,0 +1,79 @@
+"""
+数据库迁移脚本 - 版本历史分页支持
+执行此脚本以:
+1. 在 user 表添加 version_count 字段（每个用户的版本记录数）并回填
+2. 在 user_version 表创建 (user_id, update_time, id) 复合索引
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_add_version_count.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import UserVersion
+from sqlalchemy import inspect, text
+
+INDEX_NAME = 'ix_user_version_user_time_id'
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            # 检查并添加 version_count 字段
+            try:
+                db.session.execute(text("SELECT version_count FROM user LIMIT 1"))
+                print("✓ version_count 字段已存在")
+            except:
+                db.session.rollback()
+                db.session.execute(text(
+                    "ALTER TABLE user ADD COLUMN version_count "
+                    "INTEGER NOT NULL DEFAULT 0"
+                ))
+                db.session.commit()
+                print("✓ 添加 version_count 字段成功")
+
+            # 回填版本计数
+            db.session.execute(text(
+                "UPDATE user SET version_count = "
+                "(SELECT COUNT(*) FROM user_version "
+                "WHERE user_version.user_id = user.id)"
+            ))
+            db.session.commit()
+            print("✓ 回填 version_count 成功")
+
+            # 检查并创建复合索引
+            indexes = inspect(db.engine).get_indexes('user_version')
+            existing = {index['name'] for index in indexes}
+            if INDEX_NAME in existing:
+                print(f"✓ {INDEX_NAME} 索引已存在")
+            else:
+                index = next(i for i in UserVersion.__table__.indexes
+                             if i.name == INDEX_NAME)
+                index.create(bind=db.engine)
+                print(f"✓ 创建 {INDEX_NAME} 索引成功")
+
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
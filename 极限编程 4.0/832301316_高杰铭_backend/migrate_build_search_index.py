@@ -0,0 +1,64 @@
+"""
+数据库迁移脚本 - 建立联系人检索索引
+执行此脚本以创建 user_search_token 表，并为已有联系人分批生成 n-gram 索引
+（之后的创建、编辑、删除会自动维护索引，无需再次运行）
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_build_search_index.py
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import User, UserSearchToken
+from search_index import index_user
+
+BATCH_SIZE = 500
+
+
+def migrate_database():
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            UserSearchToken.__table__.create(bind=db.engine, checkfirst=True)
+            print("✓ user_search_token 表已就绪")
+
+            # 按 id 分批重建索引，每批单独提交，避免长事务
+            last_id = 0
+            total = 0
+            while True:
+                users = (User.query.filter(User.id > last_id)
+                         .order_by(User.id).limit(BATCH_SIZE).all())
+                if not users:
+                    break
+                for user in users:
+                    index_user(db.session, user)
+                db.session.commit()
+                last_id = users[-1].id
+                total += len(users)
+                print(f"  已索引 {total} 个联系人")
+
+            print(f"✓ 共为 {total} 个联系人建立检索索引")
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,121 @@
+"""
+数据库迁移脚本 - 版本历史差量存储
+执行此脚本以:
+1. 在 user_version 表添加 is_snapshot、changed_fields 字段
+2. 按当前配置（VERSION_STORAGE_MODE / VERSION_SNAPSHOT_INTERVAL）重新编码已有版本记录：
+   每 VERSION_SNAPSHOT_INTERVAL 个版本保留一次完整快照，其余版本只保存变化的字段
+
+使用方法:
+1. 确保已经停止了Flask应用
+2. 在backend目录下运行: python migrate_delta_versions.py
+   如需恢复为每个版本都保存完整内容，运行: python migrate_delta_versions.py --full
+3. 重新启动Flask应用
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import User, UserVersion
+from sqlalchemy import select, text, update
+from versioning import CHAIN_COLUMNS, COLUMN_INDEX, VERSION_FIELDS, rebuild_chain
+
+BATCH_SIZE = 200
+
+
+# 按配置重新编码单个用户的版本链
+def reencode_user(user_id, full):
+    rows = db.session.execute(
+        select(*CHAIN_COLUMNS)
+        .where(UserVersion.user_id == user_id)
+        .order_by(UserVersion.id)
+    ).all()
+    interval = app.config['VERSION_SNAPSHOT_INTERVAL']
+    previous = None
+    for ordinal, row in enumerate(rebuild_chain(rows), start=1):
+        state = {field: row[COLUMN_INDEX[field]] for field in VERSION_FIELDS}
+        if full or previous is None or (ordinal - 1) % interval == 0:
+            values = dict(state, is_snapshot=True, changed_fields=None)
+        else:
+            changed = {field for field in VERSION_FIELDS
+                       if state[field] != previous[field]}
+            values = {field: (state[field] if field in changed else None)
+                      for field in VERSION_FIELDS}
+            values.update(username=state['username'], is_snapshot=False,
+                          changed_fields=','.join(sorted(changed)) or None)
+        db.session.execute(
+            update(UserVersion).where(UserVersion.id == row[0]).values(**values))
+        previous = state
+    return len(rows)
+
+
+def migrate_database(full=False):
+    """执行数据库迁移"""
+    with app.app_context():
+        try:
+            print("开始数据库迁移...")
+
+            # 检查并添加 is_snapshot / changed_fields 字段
+            try:
+                db.session.execute(text("SELECT is_snapshot FROM user_version LIMIT 1"))
+                print("✓ is_snapshot 字段已存在")
+            except:
+                db.session.rollback()
+                db.session.execute(text(
+                    "ALTER TABLE user_version "
+                    "ADD COLUMN is_snapshot BOOLEAN NOT NULL DEFAULT 1"
+                ))
+                db.session.commit()
+                print("✓ 添加 is_snapshot 字段成功")
+
+            try:
+                db.session.execute(
+                    text("SELECT changed_fields FROM user_version LIMIT 1"))
+                print("✓ changed_fields 字段已存在")
+            except:
+                db.session.rollback()
+                db.session.execute(text(
+                    "ALTER TABLE user_version ADD COLUMN changed_fields VARCHAR(100)"
+                ))
+                db.session.commit()
+                print("✓ 添加 changed_fields 字段成功")
+
+            full = full or app.config['VERSION_STORAGE_MODE'] != 'delta'
+            # 按用户 id 分批重新编码，每批单独提交，避免长事务
+            last_id = 0
+            total = 0
+            while True:
+                user_ids = db.session.scalars(
+                    select(User.id)
+                    .where(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not user_ids:
+                    break
+                for user_id in user_ids:
+                    total += reencode_user(user_id, full)
+                db.session.commit()
+                last_id = user_ids[-1]
+                print(f"  已处理 {total} 条版本记录")
+
+            mode = "完整快照" if full else "差量"
+            print(f"✓ 共 {total} 条版本记录已按{mode}方式重新编码")
+            print("\n✅ 数据库迁移完成！")
+            print("现在可以重新启动Flask应用了。")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 迁移失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = migrate_database(full='--full' in sys.argv[1:])
+    sys.exit(0 if success else 1)
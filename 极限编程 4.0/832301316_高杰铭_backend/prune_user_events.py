@@ -0,0 +1,65 @@
+"""
+维护脚本 - 清理旧的联系人变更事件
+/api/user/stream 只需要最近的事件（客户端断线重连时续读），
+此脚本删除早于 STREAM_EVENT_RETENTION_HOURS 小时的事件，防止 user_event 表无限增长。
+断线超过保留时间的客户端重连后会通过 /api/user/changes 增量同步，不会丢失数据。
+
+清理按 id 分批进行，每批单独提交，可在 Flask 应用运行期间执行
+（例如每小时由 cron 运行一次）。
+
+使用方法:
+在backend目录下运行: python prune_user_events.py
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from models import UserEvent
+from sqlalchemy import delete, select
+
+BATCH_SIZE = 5000
+
+
+def prune_user_events():
+    """执行事件清理"""
+    with app.app_context():
+        try:
+            retention = timedelta(hours=app.config['STREAM_EVENT_RETENTION_HOURS'])
+            cutoff = datetime.now() - retention
+            print(f"开始清理 {cutoff.strftime('%Y-%m-%d %H:%M:%S')} 之前的事件...")
+
+            total = 0
+            while True:
+                event_ids = db.session.scalars(
+                    select(UserEvent.id)
+                    .where(UserEvent.create_time < cutoff)
+                    .order_by(UserEvent.id)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not event_ids:
+                    break
+                db.session.execute(delete(UserEvent).where(UserEvent.id.in_(event_ids)))
+                db.session.commit()
+                total += len(event_ids)
+                print(f"  已清理 {total} 条")
+
+            print(f"✓ 共清理了 {total} 条事件")
+            print("\n✅ 事件清理完成！")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 清理失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = prune_user_events()
+    sys.exit(0 if success else 1)
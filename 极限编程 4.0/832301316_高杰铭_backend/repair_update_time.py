@@ -0,0 +1,68 @@
+"""
+数据修复脚本 - 补全 update_time 为空的联系人
+早期版本创建的联系人可能没有 update_time，此脚本将其设置为 create_time。
+（原先由 app.py 在每个 worker 启动时执行，现改为按需运行一次）
+
+修复按 id 分批进行，每批单独提交，可在 Flask 应用运行期间执行，重复运行也是安全的。
+
+使用方法:
+在backend目录下运行: python repair_update_time.py
+"""
+
+import sys
+import os
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from app import app, db
+from data_version import bump_data_version
+from models import User
+from sqlalchemy import select, update
+
+BATCH_SIZE = 500
+
+
+def repair_update_time():
+    """执行数据修复"""
+    with app.app_context():
+        try:
+            print("开始修复 update_time 为空的数据...")
+
+            last_id = 0
+            total = 0
+            while True:
+                user_ids = db.session.scalars(
+                    select(User.id)
+                    .where(User.id > last_id, User.update_time.is_(None))
+                    .order_by(User.id)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not user_ids:
+                    break
+                db.session.execute(
+                    update(User)
+                    .where(User.id.in_(user_ids), User.update_time.is_(None))
+                    .values(update_time=User.create_time)
+                )
+                bump_data_version(db.session, changed_ids=user_ids)
+                db.session.commit()
+                last_id = user_ids[-1]
+                total += len(user_ids)
+                print(f"  已修复 {total} 条")
+
+            print(f"✓ 共修复了 {total} 条update_time为空的数据")
+            print("\n✅ 数据修复完成！")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ 修复失败: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+        return True
+
+if __name__ == '__main__':
+    success = repair_update_time()
+    sys.exit(0 if success else 1)
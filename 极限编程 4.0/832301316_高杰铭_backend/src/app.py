@@ -1,13 +1,22 @@
-from flask import Flask, jsonify
+import os
+from flask import Flask, Response, jsonify
 from flask_migrate import Migrate
 from flask_cors import CORS
+from blocking_io import run_blocking
 from exts import db
 from controller.user import bp as user_bp
+from json_provider import EnvelopeJSONProvider
+from metrics import init_metrics, render_metrics
+from pool_stats import pool_status
+from sql_stats import init_sql_stats
 import config
 from sqlalchemy import text
 
 app = Flask(__name__)
 app.config.from_object(config.Config)
+# orjson 编码，输出与默认 provider 一致（浮点数格式除外，见 json_provider.py）；
+# 同时记录响应中的 code 供监控统计
+app.json = EnvelopeJSONProvider(app)
 
 # 初始化扩展
 db.init_app(app)
@@ -18,32 +27,51 @@ CORS(app, resources={r"/api/*": {
         "http://localhost:8000", 
         "http://127.0.0.1:8000",
         "http://8.138.190.252"  # 服务器前端的公网地址（若前端用了端口，需加端口，如:8080）
-    ]
+    ],
+    # 允许前端读取写操作返回的一致性令牌（读写分离，见 replica.py）
+    "expose_headers": ["X-Consistency-Token"]
 }})
 
 # 注册蓝图
 app.register_blueprint(user_bp)
 
-# 数据库初始化检查
-with app.app_context():
-    try:
-        db.session.execute(text('SELECT 1'))
-        print("数据库连接成功！")
-
-        from models import User
-        old_users = User.query.filter(User.update_time.is_(None)).all()
-        for user in old_users:
-            user.update_time = user.create_time
-        if old_users:
-            db.session.commit()
-            print(f"修复了 {len(old_users)} 条update_time为空的数据")
-    except Exception as e:
-        print(f"数据库连接失败：{str(e)}")
+# 每个请求的 SQL 条数与耗时统计（调试模式下写入 X-SQL-Count / X-SQL-Time 响应头）
+init_sql_stats(app)
+
+# 请求监控指标（跨 worker 进程汇总）
+metrics_registry = init_metrics(app)
+
+# 数据库连接检查（只执行 SELECT 1，不在导入时运行）
+# worker 启动时不再访问数据库：连接池在第一个请求时才建立连接，
+# 并通过 pool_pre_ping 检测失效连接（见 config.py）；
+# update_time 为空的历史数据请使用一次性脚本 repair_update_time.py 修复
+def check_database():
+    with app.app_context():
+        try:
+            db.session.execute(text('SELECT 1'))
+            print("数据库连接成功！")
+        except Exception as e:
+            print(f"数据库连接失败：{str(e)}")
 
 # 健康检查接口
 @app.route("/api/health")
 def health_check():
     return jsonify({"status": "ok"})
 
+# 连接池状态：返回处理本次请求的 worker 进程中各连接池的占用、溢出、等待与失效统计
+@app.route("/api/health/pool")
+def pool_health():
+    pools = {bind_key or "default": pool_status(engine)
+             for bind_key, engine in db.engines.items()}
+    return jsonify({"status": "ok", "pid": os.getpid(), "pools": pools})
+
+# Prometheus 监控指标：请求数、耗时分布、在途请求、数据库耗时、按 code 统计的响应数
+@app.route("/api/metrics")
+def metrics():
+    # 汇总时读取各进程的指标文件，异步部署时交给线程执行
+    return Response(run_blocking(render_metrics, metrics_registry),
+                    mimetype="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
+    check_database()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+异步部署入口（ASGI）
+
+与 app.py 使用同一个 Flask 应用和 user 蓝图，路由与 JSON 格式完全一致；
+区别在于数据库引擎改用异步驱动（aiomysql），每个请求作为事件循环上的一个任务，
+在等待数据库时不占用线程，单个进程即可同时处理大量请求。
+
+启动方式（在 src 目录下）:
+    gunicorn -c gunicorn_asgi_conf.py asgi:application
+或本地调试:
+    uvicorn asgi:application --port 5000
+"""
+
+import io
+import os
+import sys
+
+# 必须在导入 app 之前设置，config.py 据此切换异步驱动
+os.environ.setdefault('ADDRESS_BOOK_ASYNC', '1')
+
+from sqlalchemy.util import greenlet_spawn
+
+from app import app
+from exts import db
+
+
+def _build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = name if name == 'CONTENT_TYPE' else 'HTTP_' + name
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return bytes(body)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # 关闭连接池中的连接，进程才能干净退出
+            with app.app_context():
+                engines = list(db.engines.values())
+            for engine in engines:
+                await greenlet_spawn(engine.dispose)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+# ASGI 应用：在 greenlet 中执行 Flask 的 WSGI 处理流程，
+# 其中的数据库调用通过异步驱动让出事件循环；流式响应（导出）逐块取出并发送
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    environ = _build_environ(scope, await _read_body(receive))
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                              for name, value in headers]
+
+    result = await greenlet_spawn(app.wsgi_app, environ, start_response)
+    try:
+        chunks = iter(result)
+        chunk = await greenlet_spawn(next, chunks, None)
+        await send({'type': 'http.response.start',
+                    'status': started['status'],
+                    'headers': started['headers']})
+        while chunk is not None:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk,
+                            'more_body': True})
+            chunk = await greenlet_spawn(next, chunks, None)
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(result, 'close'):
+            await greenlet_spawn(result.close)
@@ -0,0 +1,42 @@
+import asyncio
+from itertools import islice
+
+from flask import current_app
+
+
+def _async_mode():
+    return bool(current_app.config.get('SQLALCHEMY_ASYNC'))
+
+
+# 执行阻塞的文件操作（写临时文件、读监控指标文件等）
+# 异步部署（asgi.py）中视图运行在事件循环线程的 greenlet 里，直接读写文件会卡住
+# 同一进程内的全部请求；这里交给线程池执行，等待期间让出事件循环。同步部署直接调用
+def run_blocking(func, *args):
+    if not _async_mode():
+        return func(*args)
+    from sqlalchemy.util import await_only
+    return await_only(asyncio.to_thread(func, *args))
+
+
+# 把需要在事件循环上迭代的数据（如数据库游标）交给 run_blocking 的线程逐行读取：
+# 线程中每取 batch_size 行回到事件循环执行一次，数据库调用仍走异步驱动
+# 同步部署原样返回；返回的迭代器只能在 run_blocking 的线程中使用
+def iter_from_loop(iterable, batch_size):
+    if not _async_mode():
+        return iterable
+    from sqlalchemy.util import greenlet_spawn
+
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+
+    def fetch():
+        return list(islice(iterator, batch_size))
+
+    def generate():
+        while True:
+            future = asyncio.run_coroutine_threadsafe(greenlet_spawn(fetch), loop)
+            batch = future.result()
+            if not batch:
+                return
+            yield from batch
+    return generate()
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+
+from models import User, UserVersion
+from search_index import unindex_users
+
+# 支持的批量操作及其名称（用于提示信息）
+BULK_ACTIONS = {
+    'delete': '删除',
+    'favorite': '收藏',
+    'unfavorite': '取消收藏',
+    'set_operator': '修改操作人',
+}
+# 按筛选条件批量操作时支持的条件
+FILTER_KEYS = ('is_favorite', 'operator', 'created_after', 'created_before')
+FILTER_TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+class BulkFilterError(ValueError):
+    pass
+
+
+def _parse_time(value):
+    for time_format in FILTER_TIME_FORMATS:
+        try:
+            return datetime.strptime(str(value), time_format)
+        except ValueError:
+            continue
+    raise BulkFilterError(
+        f'无效的时间「{value}」，格式应为 YYYY-MM-DD 或 YYYY-MM-DD HH:MM:SS！')
+
+
+# 把筛选条件转换为 WHERE 子句列表
+# 支持 is_favorite、operator、created_after（含）、created_before（不含）；
+# 不允许空条件，避免误操作全部联系人
+def filter_conditions(raw):
+    if not isinstance(raw, dict) or not raw:
+        raise BulkFilterError('筛选条件不能为空！')
+    unknown = set(raw) - set(FILTER_KEYS)
+    if unknown:
+        raise BulkFilterError(f"不支持的筛选条件：{', '.join(sorted(unknown))}")
+
+    conditions = []
+    if 'is_favorite' in raw:
+        conditions.append(User.is_favorite == bool(raw['is_favorite']))
+    if 'operator' in raw:
+        conditions.append(User.operator == str(raw['operator']))
+    if 'created_after' in raw:
+        conditions.append(User.create_time >= _parse_time(raw['created_after']))
+    if 'created_before' in raw:
+        conditions.append(User.create_time < _parse_time(raw['created_before']))
+    return conditions
+
+
+# 按 id 顺序取出 after_id 之后的一批符合条件的用户 id
+def select_filtered_ids(session, conditions, after_id, limit):
+    return list(session.scalars(
+        select(User.id)
+        .where(*conditions, User.id > after_id)
+        .order_by(User.id)
+        .limit(limit)
+    ))
+
+
+# 对一块用户执行批量操作，全部用集合式 SQL（由调用方提交事务）
+# 删除时检索索引、版本记录和用户各用一条 DELETE；其余操作是一条 UPDATE，
+# 收藏状态变化不记录版本历史
+def apply_action(session, action, user_ids, operator):
+    if action == 'delete':
+        unindex_users(session, user_ids)
+        session.execute(delete(UserVersion).where(UserVersion.user_id.in_(user_ids)))
+        session.execute(delete(User).where(User.id.in_(user_ids)))
+        return
+
+    values = {'operator': operator, 'update_time': datetime.now(),
+              'row_version': User.row_version + 1}
+    if action == 'favorite':
+        values['is_favorite'] = True
+    elif action == 'unfavorite':
+        values['is_favorite'] = False
+    session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
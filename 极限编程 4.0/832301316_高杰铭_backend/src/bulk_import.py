@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from models import User, UserVersion, UserSearchToken
+from search_index import build_token_rows
+
+TRUE_VALUES = (True, 1, '1', 'true', 'True', '是')
+
+
+# 规整单元格内容：转字符串、去空白，空串视为 None
+def clean_text(value):
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+# 规整导入的一行数据，返回字段字典
+def clean_row(raw, default_operator):
+    return {
+        'username': clean_text(raw.get('username')) or '',
+        'phone': clean_text(raw.get('phone')),
+        'email': clean_text(raw.get('email')),
+        'address': clean_text(raw.get('address')),
+        'social_media': clean_text(raw.get('social_media')),
+        'notes': clean_text(raw.get('notes')),
+        'is_favorite': raw.get('is_favorite') in TRUE_VALUES,
+        'operator': clean_text(raw.get('operator')) or default_operator,
+    }
+
+
+# 查出一批用户名/邮箱中已被占用的值（统一转小写比较，与 MySQL 的 _ci 排序规则一致）
+def find_taken(session, column, values):
+    if not values:
+        return set()
+    rows = session.scalars(select(column).where(column.in_(values)))
+    return {value.lower() for value in rows}
+
+
+# 用 executemany 批量写入一组已校验的联系人，同时写入初始版本与检索索引
+# 返回 {username: user_id}
+def insert_users(session, rows):
+    now = datetime.now()
+    session.execute(insert(User), [
+        dict(row, create_time=now, update_time=now, version_count=1) for row in rows
+    ])
+
+    usernames = [row['username'] for row in rows]
+    user_ids = dict(session.execute(
+        select(User.username, User.id).where(User.username.in_(usernames))
+    ).all())
+
+    session.execute(insert(UserVersion), [
+        dict(row, user_id=user_ids[row['username']], update_time=now, is_snapshot=True)
+        for row in rows
+    ])
+
+    token_rows = []
+    for row in rows:
+        token_rows.extend(build_token_rows(user_ids[row['username']], row))
+    if token_rows:
+        session.execute(insert(UserSearchToken), token_rows)
+    return user_ids
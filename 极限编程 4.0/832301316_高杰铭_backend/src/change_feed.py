@@ -0,0 +1,78 @@
+from sqlalchemy import and_, or_, select
+
+from models import DeletedUser, User
+from pagination import PaginationError, decode_cursor, encode_cursor
+from serializers import USER_COLUMNS, user_row_to_dict
+
+# 变更按 (change_seq, kind, id) 排序：同一个数据版本内先列出删除，再列出新增/修改
+KIND_DELETE = 0
+KIND_UPSERT = 1
+# 从头同步的起点，早于任何变更（迁移前的数据 change_seq 为 0）
+START_POSITION = (-1, KIND_UPSERT, 0)
+
+
+# 解析 since 游标，缺省时从头开始（首次同步即全量）
+def parse_since(raw):
+    if not raw:
+        return START_POSITION
+    seq, kind, last_id = decode_cursor(raw, 3)
+    try:
+        return int(seq), int(kind), int(last_id)
+    except (TypeError, ValueError):
+        raise PaginationError('无效的同步游标！')
+
+
+def encode_position(position):
+    return encode_cursor(list(position))
+
+
+# 位于数据版本 version 全部变更之后的游标
+# 客户端先取该游标再全量加载列表，之后从这里增量同步；
+# 两者之间发生的变更会重复收到一次，按 id 覆盖即可
+def latest_cursor(version):
+    return encode_cursor([version, KIND_UPSERT + 1, 0])
+
+
+# 生成“位于游标之后”的过滤条件（升序），两个表各自固定一个 kind，
+# 条件都能直接在 (change_seq, id) 索引上范围扫描
+def _after(seq_column, id_column, kind, position):
+    seq, last_kind, last_id = position
+    if kind > last_kind:
+        return seq_column >= seq
+    if kind < last_kind:
+        return seq_column > seq
+    return or_(seq_column > seq, and_(seq_column == seq, id_column > last_id))
+
+
+# 读取游标之后的一页变更，返回 (changes, next_position, has_more)
+# 用户表与删除记录表各取 limit + 1 行，合并排序后截断，结果与在两个表的并集上分页相同
+def read_changes(session, position, limit):
+    upserts = session.execute(
+        select(User.change_seq, *USER_COLUMNS)
+        .where(_after(User.change_seq, User.id, KIND_UPSERT, position))
+        .order_by(User.change_seq, User.id)
+        .limit(limit + 1)
+    ).all()
+    deletes = session.execute(
+        select(DeletedUser.change_seq, DeletedUser.user_id)
+        .where(_after(DeletedUser.change_seq, DeletedUser.user_id, KIND_DELETE,
+                      position))
+        .order_by(DeletedUser.change_seq, DeletedUser.user_id)
+        .limit(limit + 1)
+    ).all()
+
+    merged = [(row[0], KIND_UPSERT, row.id, row) for row in upserts]
+    merged.extend((seq, KIND_DELETE, user_id, None) for seq, user_id in deletes)
+    merged.sort(key=lambda item: item[:3])
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    changes = []
+    for seq, kind, user_id, row in merged:
+        if kind == KIND_DELETE:
+            changes.append({'type': 'delete', 'id': user_id, 'change_seq': seq})
+        else:
+            changes.append({'type': 'upsert', 'id': user_id, 'change_seq': seq,
+                            'data': user_row_to_dict(row[1:])})
+    next_position = merged[-1][:3] if merged else position
+    return changes, next_position, has_more
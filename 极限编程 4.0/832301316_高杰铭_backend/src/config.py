@@ -1,3 +1,7 @@
+import os
+import tempfile
+
+
 class Config:
     # 数据库配置
     HOSTNAME = "127.0.0.1"
@@ -7,10 +11,87 @@ class Config:
     DATABASE = "database_address_book"  # 数据库名称（确保已创建）
 
     # 数据库连接URI
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOSTNAME}:{PORT}/{DATABASE}?charset=utf8mb4&collation=utf8mb4_general_ci"
+    DEFAULT_DATABASE_URI = (
+        f"mysql+pymysql://{USERNAME}:{PASSWORD}@{HOSTNAME}:{PORT}/{DATABASE}"
+        "?charset=utf8mb4&collation=utf8mb4_general_ci"
+    )
+    # 可通过环境变量 ADDRESS_BOOK_DATABASE_URI 覆盖（如基准测试使用临时数据库）
+    SQLALCHEMY_DATABASE_URI = (os.environ.get("ADDRESS_BOOK_DATABASE_URI")
+                               or DEFAULT_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 关闭追踪修改
     SQLALCHEMY_ECHO = False  # 关闭SQL语句打印（减少日志干扰）
+    # 只读副本（逗号分隔的多个 URI），读接口发往副本，写操作发往主库；为空时全部使用主库
+    SQLALCHEMY_REPLICA_URIS = [
+        uri for uri in os.environ.get("ADDRESS_BOOK_REPLICA_URIS", "").split(",") if uri
+    ]
+    # 异步部署（asgi.py）时设置 ADDRESS_BOOK_ASYNC=1，改用 aiomysql 驱动
+    SQLALCHEMY_ASYNC = os.environ.get("ADDRESS_BOOK_ASYNC") == "1"
+
+    # 连接池配置（每个 worker 进程一个连接池，可通过环境变量覆盖）
+    # 同步部署下每个 worker 同时处理的请求数等于线程数，连接池大小默认与之一致；
+    # gunicorn_conf.py / uwsgi.ini 会把线程数写入 ADDRESS_BOOK_WORKER_THREADS
+    WORKER_THREADS = int(os.environ.get("ADDRESS_BOOK_WORKER_THREADS", "2"))
+    SQLALCHEMY_POOL_SIZE = int(os.environ.get("ADDRESS_BOOK_POOL_SIZE", WORKER_THREADS))
+    # 留给后台任务等的溢出连接
+    SQLALCHEMY_POOL_MAX_OVERFLOW = int(
+        os.environ.get("ADDRESS_BOOK_POOL_MAX_OVERFLOW", "2"))
+    # 借连接最长等待秒数
+    SQLALCHEMY_POOL_TIMEOUT = int(os.environ.get("ADDRESS_BOOK_POOL_TIMEOUT", "10"))
+    # 需小于 MySQL 的 wait_timeout
+    SQLALCHEMY_POOL_RECYCLE = int(os.environ.get("ADDRESS_BOOK_POOL_RECYCLE", "3600"))
+    # 借出连接时先做轻量检测
+    SQLALCHEMY_POOL_PRE_PING = os.environ.get("ADDRESS_BOOK_POOL_PRE_PING", "1") == "1"
+
+    # 监控指标配置：每个 worker 进程把指标写入该目录下自己的文件，
+    # /api/metrics 汇总所有进程。多个应用实例不要共用同一目录；
+    # gunicorn 启动时会清空该目录（见 gunicorn_conf.py）
+    METRICS_DIR = (os.environ.get("ADDRESS_BOOK_METRICS_DIR")
+                   or os.path.join(tempfile.gettempdir(), "address_book_metrics"))
+    METRICS_FLUSH_INTERVAL = 1.0  # 写入间隔（秒），其他 worker 的指标最多延迟这么久
+
+    # SQL 统计配置：每个请求执行的 SQL 条数超出预算、
+    # 或同一条 SQL 重复执行多次（N+1）时记录警告日志
+    SQL_STATEMENT_BUDGET = 20  # 默认每个请求的 SQL 条数预算
+    SQL_STATEMENT_BUDGETS = {  # 单独设置的路由预算，None 表示不检查
+        "user.bulk_create_users": None,  # 按块写入，出错时逐行重试
+        "user.bulk_action": None,  # 按块执行，语句数随用户数增长
+        "user.user_stream": None,  # 在保持连接期间轮询事件表
+    }
+    SQL_REPEAT_THRESHOLD = 5  # 同一条 SQL 在一个请求中执行达到该次数即视为 N+1
 
     # Flask配置
     DEBUG = True  # 开发模式
-    SECRET_KEY = "123456"  # 会话密钥（生产环境需修改）
\ No newline at end of file
+    SECRET_KEY = "123456"  # 会话密钥（生产环境需修改）
+
+    # 分页配置
+    USER_PAGE_SIZE = 20  # 默认每页条数
+    USER_PAGE_SIZE_MAX = 100  # 每页条数上限
+    CHANGE_FEED_PAGE_SIZE = 500  # 增量同步默认每页变更数
+    CHANGE_FEED_PAGE_SIZE_MAX = 2000  # 增量同步每页变更数上限
+
+    # 实时推送（/api/user/stream）配置：每个 SSE 连接最多保持 STREAM_HOLD_SECONDS 秒，
+    # 期间每隔 STREAM_POLL_INTERVAL 秒查询事件表，结束后浏览器按 STREAM_RETRY_MS
+    # 带上 Last-Event-ID 自动重连。异步部署在事件循环上等待，不占用线程；
+    # 同步 worker 不保持连接，只返回 ready 事件（push 为 false），
+    # 前端据此改用定时增量同步
+    STREAM_HOLD_SECONDS = 55.0 if SQLALCHEMY_ASYNC else 0.0
+    STREAM_POLL_INTERVAL = 1.0
+    STREAM_RETRY_MS = 2000
+    STREAM_BATCH_SIZE = 200  # 每次查询最多读取的事件数
+    STREAM_EVENT_RETENTION_HOURS = 24  # prune_user_events.py 清理早于该时间的事件
+
+    # 批量导入配置
+    BULK_CREATE_MAX_ROWS = 5000  # 单次请求最多导入的行数
+    BULK_CHUNK_SIZE = 500  # 每个事务写入的行数
+    BULK_ACTION_MAX_IDS = 1000  # 批量操作（如批量收藏）单次最多处理的用户数
+
+    # 版本历史存储配置
+    # delta: 只保存变化的字段；full: 每个版本保存全部字段
+    VERSION_STORAGE_MODE = "delta"
+    VERSION_SNAPSHOT_INTERVAL = 10  # 差量模式下每隔多少个版本保存一次完整快照
+
+    # 版本历史保留策略（None 表示不启用该策略），由 compact_versions.py 执行
+    VERSION_RETENTION_KEEP_LAST = None  # 每个用户最多保留的版本数
+    VERSION_RETENTION_MAX_AGE_DAYS = None  # 删除早于该天数的版本
+    VERSION_RETENTION_THIN_AFTER_DAYS = None  # 早于该天数的版本每天只保留最后一个
+    VERSION_COMPACT_CHUNK_SIZE = 500  # 每个事务最多删除的版本数
\ No newline at end of file
@@ -1,10 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import (Blueprint, request, jsonify, current_app, Response, abort,
+                   stream_with_context)
 from exts import db
 from models import User, UserVersion
+from pagination import (PaginationError, encode_cursor, decode_cursor, get_page_size,
+                        keyset_after)
+from search_index import index_user, reindex_fields, unindex_users, find_users
+from bulk_import import clean_text, clean_row, find_taken, insert_users
+from bulk_actions import (BULK_ACTIONS, BulkFilterError, apply_action,
+                          filter_conditions, select_filtered_ids)
+from exporter import iter_export_rows, generate_csv, generate_xlsx, xlsx_available
+from data_version import bump_data_version, conditional_get, get_data_version
+from change_feed import encode_position, latest_cursor, parse_since, read_changes
+from user_events import (event_message, latest_event_id, pause, publish_events,
+                         read_events, sse_message)
+from replica import read_replica, attach_consistency_token
+from serializers import USER_COLUMNS, user_row_to_dict, version_row_to_dict
+from versioning import (CHAIN_COLUMNS, VERSION_FIELDS, record_version, materialize,
+                        remove_version, snapshot_due)
+from sqlalchemy import delete, false, func, not_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime
+from urllib.parse import quote
+import re
+import time
 import traceback
 
 bp = Blueprint('user', __name__, url_prefix='/api/user')
+# 写操作的响应带上一致性令牌，之后的读请求据此决定能否使用只读副本
+bp.after_request(attach_consistency_token)
 
 # 创建用户
 @bp.route('/create', methods=['POST'])
@@ -23,12 +47,7 @@ def create_user():
         if not username:
             return jsonify({'code': 400, 'message': '用户名不能为空！'})
 
-        if User.query.filter_by(username=username).first():
-            return jsonify({'code': 400, 'message': f'用户名「{username}」已存在！'})
-
-        if email and User.query.filter_by(email=email).first():
-            return jsonify({'code': 400, 'message': f'邮箱「{email}」已被使用！'})
-
+        # 用户名/邮箱唯一性由数据库唯一约束保证，冲突时在 flush 处抛出 IntegrityError
         new_user = User(
             username=username,
             phone=phone,
@@ -37,23 +56,25 @@ def create_user():
             social_media=social_media,
             notes=notes,
             is_favorite=is_favorite,
-            operator=operator
+            operator=operator,
+            version_count=1
         )
         db.session.add(new_user)
         db.session.flush()
 
-        initial_version = UserVersion(
-            user_id=new_user.id,
-            username=username,
-            phone=phone,
-            email=email,
-            address=address,
-            social_media=social_media,
-            notes=notes,
-            is_favorite=is_favorite,
-            operator=operator
-        )
-        db.session.add(initial_version)
+        # 初始版本总是完整快照
+        record_version(db.session, new_user.id, {
+            'username': username,
+            'phone': phone,
+            'email': email,
+            'address': address,
+            'social_media': social_media,
+            'notes': notes,
+            'is_favorite': is_favorite
+        }, None, operator, 1)
+        index_user(db.session, new_user)
+        bump_data_version(db.session, changed_ids=[new_user.id])
+        publish_events(db.session, 'create', [new_user.id], operator)
         db.session.commit()
 
         return jsonify({
@@ -62,22 +83,353 @@ def create_user():
             'data': new_user.to_dict()
         })
 
+    except IntegrityError as e:
+        db.session.rollback()
+        message = _duplicate_message(e, username, email, '已存在')
+        return jsonify({'code': 400, 'message': message})
     except Exception as e:
         db.session.rollback()
         traceback.print_exc()
         return jsonify({'code': 500, 'message': f'创建失败：{str(e)}'})
 
+
+# 从唯一约束冲突的错误信息中解析出冲突的列名
+# MySQL: Duplicate entry 'x' for key 'user.username'
+# SQLite: UNIQUE constraint failed: user.username
+# PostgreSQL: Key (username)=(x) already exists
+DUPLICATE_KEY_PATTERNS = (
+    re.compile(r"for key '(?:\w+\.)?(\w+)'"),
+    re.compile(r'UNIQUE constraint failed: \w+\.(\w+)'),
+    re.compile(r'Key \((\w+)\)='),
+)
+
+
+# 把唯一约束冲突转换为与原先预查询一致的提示信息
+def _duplicate_message(error, username, email, username_taken):
+    detail = str(error.orig)
+    column = None
+    for pattern in DUPLICATE_KEY_PATTERNS:
+        match = pattern.search(detail)
+        if match:
+            column = match.group(1)
+            break
+    if column == 'email':
+        return f'邮箱「{email}」已被使用！'
+    if column == 'username':
+        return f'用户名「{username}」{username_taken}！'
+    return '用户名或邮箱已被使用！'
+
+# 批量创建用户（Excel 导入使用）
+# 用户名/邮箱唯一性用 IN 查询集中校验，写入按块 executemany，每块一个事务
+@bp.route('/bulk-create', methods=['POST'])
+def bulk_create_users():
+    data = request.get_json(silent=True) or {}
+    raw_rows = data.get('users')
+    if not isinstance(raw_rows, list) or not raw_rows:
+        return jsonify({'code': 400, 'message': '导入数据不能为空！'})
+
+    max_rows = current_app.config['BULK_CREATE_MAX_ROWS']
+    if len(raw_rows) > max_rows:
+        return jsonify({'code': 400, 'message': f'单次最多导入 {max_rows} 条数据！'})
+
+    default_operator = clean_text(data.get('operator')) or 'system'
+    results = []
+    valid = []
+    seen_usernames = set()
+    seen_emails = set()
+    for index, raw in enumerate(raw_rows):
+        raw = raw if isinstance(raw, dict) else {}
+        row = clean_row(raw, default_operator)
+        result = {'row': raw.get('row') or index + 1, 'username': row['username'],
+                  'success': False}
+        results.append(result)
+
+        username_key = row['username'].lower()
+        email_key = row['email'].lower() if row['email'] else None
+        if not row['username']:
+            _mark_failed(result, '姓名不能为空')
+        elif username_key in seen_usernames:
+            _mark_failed(result, f'用户名「{row["username"]}」在导入数据中重复！')
+        elif email_key and email_key in seen_emails:
+            _mark_failed(result, f'邮箱「{row["email"]}」在导入数据中重复！')
+        else:
+            seen_usernames.add(username_key)
+            if email_key:
+                seen_emails.add(email_key)
+            valid.append((row, result))
+
+    chunk_size = current_app.config['BULK_CHUNK_SIZE']
+    for start in range(0, len(valid), chunk_size):
+        _bulk_create_chunk(valid[start:start + chunk_size])
+
+    success_count = sum(1 for result in results if result['success'])
+    fail_count = len(results) - success_count
+    return jsonify({
+        'code': 200,
+        'message': f'导入完成！成功: {success_count}, 失败: {fail_count}',
+        'data': {
+            'success_count': success_count,
+            'fail_count': fail_count,
+            'results': results
+        }
+    })
+
+
+# 记录导入失败的行，提示格式与前端导入报告一致：第N行 (姓名): 原因
+def _mark_failed(result, error):
+    result['message'] = f"第{result['row']}行 ({result['username'] or '未知'}): {error}"
+
+
+# 校验并写入一块导入数据（一个事务）
+def _bulk_create_chunk(chunk):
+    usernames = [row['username'] for row, _ in chunk]
+    emails = [row['email'] for row, _ in chunk if row['email']]
+    taken_usernames = find_taken(db.session, User.username, usernames)
+    taken_emails = find_taken(db.session, User.email, emails)
+
+    pending = []
+    for row, result in chunk:
+        if row['username'].lower() in taken_usernames:
+            _mark_failed(result, f'用户名「{row["username"]}」已存在！')
+        elif row['email'] and row['email'].lower() in taken_emails:
+            _mark_failed(result, f'邮箱「{row["email"]}」已被使用！')
+        else:
+            pending.append((row, result))
+    if not pending:
+        return
+
+    try:
+        user_ids = insert_users(db.session, [row for row, _ in pending])
+        bump_data_version(db.session, changed_ids=list(user_ids.values()))
+        created = {}
+        for row, _ in pending:
+            created.setdefault(row['operator'], []).append(user_ids[row['username']])
+        for operator, created_ids in created.items():
+            publish_events(db.session, 'create', created_ids, operator)
+        db.session.commit()
+    except IntegrityError:
+        # 校验之后被并发请求抢先写入，逐行重试以定位冲突的行
+        db.session.rollback()
+        if len(pending) > 1:
+            for item in pending:
+                _bulk_create_chunk([item])
+        else:
+            _mark_failed(pending[0][1], '用户名或邮箱已被占用！')
+        return
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        for _, result in pending:
+            _mark_failed(result, f'创建失败：{str(e)}')
+        return
+
+    for row, result in pending:
+        result['success'] = True
+        result['id'] = user_ids[row['username']]
+
+# 用户列表的排序列，与 ix_user_favorite_create_time_id 索引一致
+USER_LIST_ORDER = (User.is_favorite, User.create_time, User.id)
+CURSOR_TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
 # 获取所有用户（收藏的排在前面）
+# 带 limit 或 cursor 参数时按游标分页返回，否则返回全部（兼容旧前端）
 @bp.route('/all', methods=['GET'])
+@read_replica
+@conditional_get
 def get_all_users():
-    users = User.query.order_by(User.is_favorite.desc(), User.create_time.desc()).all()
+    # 只查询需要的列并直接转成字典，跳过 ORM 对象构建
+    stmt = (select(*USER_COLUMNS)
+            .order_by(*[column.desc() for column in USER_LIST_ORDER]))
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return jsonify({
+            'code': 200,
+            'data': [user_row_to_dict(row) for row in db.session.execute(stmt)]
+        })
+
+    try:
+        page_size = get_page_size(current_app.config['USER_PAGE_SIZE'],
+                                  current_app.config['USER_PAGE_SIZE_MAX'])
+        cursor = request.args.get('cursor')
+        if cursor:
+            is_favorite, create_time, last_id = decode_cursor(cursor, 3)
+            try:
+                # 布尔列只能与 0/1 做大小比较
+                values = (int(bool(is_favorite)),
+                          datetime.strptime(create_time, CURSOR_TIME_FORMAT),
+                          int(last_id))
+            except (TypeError, ValueError):
+                raise PaginationError('无效的分页游标！')
+            stmt = stmt.where(keyset_after(USER_LIST_ORDER, values))
+    except PaginationError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+
+    # 多取一条用于判断是否还有下一页
+    rows = db.session.execute(stmt.limit(page_size + 1)).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([
+            int(bool(last.is_favorite)),
+            last.create_time.strftime(CURSOR_TIME_FORMAT),
+            last.id
+        ])
+    return jsonify({
+        'code': 200,
+        'data': [user_row_to_dict(row) for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    })
+
+# 搜索用户（服务端 n-gram 倒排索引，按相关度排序并游标分页）
+# 只有单字的关键词（如姓氏“张”）按新建顺序返回，一页可能不足 limit 条，
+# 按 has_more 继续加载
+@bp.route('/search', methods=['GET'])
+@read_replica
+def search_users():
+    keyword = (request.args.get('q') or '').strip()
+    if not keyword:
+        return jsonify({'code': 400, 'message': '搜索关键词不能为空！'})
+
+    try:
+        page_size = get_page_size(current_app.config['USER_PAGE_SIZE'],
+                                  current_app.config['USER_PAGE_SIZE_MAX'])
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            last_score, last_id = decode_cursor(cursor, 2)
+            try:
+                after = (int(last_score), int(last_id))
+            except (TypeError, ValueError):
+                raise PaginationError('无效的分页游标！')
+    except PaginationError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+
+    hits, next_after = find_users(db.session, keyword, USER_COLUMNS, page_size, after)
+    return jsonify({
+        'code': 200,
+        'data': [user_row_to_dict(row) for row, _ in hits],
+        'next_cursor': encode_cursor(list(next_after)) if next_after else None,
+        'has_more': next_after is not None
+    })
+
+# 增量同步：返回 since 游标之后新增、修改或删除的联系人，按 (change_seq, id) 顺序分页
+# 新增/修改为 {"type": "upsert", "data": {...}}，
+# 删除为 {"type": "delete", "id": ...}（墓碑）；
+# 不带 since 时从头开始（首次全量同步），
+# 带 latest=1 时只返回当前位置的游标，不返回数据。
+# next_cursor 总会返回，作为下一次请求的 since；
+# 没有新变更时数据版本不变，带 ETag 的轮询直接得到 304
+@bp.route('/changes', methods=['GET'])
+@read_replica
+@conditional_get
+def user_changes():
+    if request.args.get('latest') in ('1', 'true'):
+        version = get_data_version(db.session)
+        return jsonify({'code': 200, 'data': [], 'next_cursor': latest_cursor(version),
+                        'has_more': False})
+
+    try:
+        page_size = get_page_size(current_app.config['CHANGE_FEED_PAGE_SIZE'],
+                                  current_app.config['CHANGE_FEED_PAGE_SIZE_MAX'])
+        position = parse_since(request.args.get('since'))
+    except PaginationError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+
+    changes, next_position, has_more = read_changes(db.session, position, page_size)
     return jsonify({
         'code': 200,
-        'data': [user.to_dict() for user in users]
+        'data': changes,
+        'next_cursor': encode_position(next_position),
+        'has_more': has_more
     })
 
+# 实时推送（Server-Sent Events）：新增、修改、删除、收藏联系人时向客户端推送事件，
+# 客户端据此调用 /changes 增量同步
+# 各 worker 通过 user_event 表（发件箱）共享事件，不依赖进程内状态；
+# 每个连接最多保持 STREAM_HOLD_SECONDS 秒，之后浏览器按 retry 间隔带上 Last-Event-ID
+# 自动重连续读，同步 worker 不会被长连接占满。
+# 首次连接（没有 Last-Event-ID）先收到 ready 事件，只推送此后的变更；
+# ready 事件的 push 为 false 表示同步部署（STREAM_HOLD_SECONDS 为 0），连接会立即结束，
+# 客户端应关闭 EventSource 改为定时调用 /changes，
+# 否则每隔 retry 毫秒重连一次，相当于高频轮询
+@bp.route('/stream', methods=['GET'])
+def user_stream():
+    raw_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(raw_id) if raw_id else None
+    except ValueError:
+        return jsonify({'code': 400, 'message': '无效的事件 id！'})
+    hold = current_app.config['STREAM_HOLD_SECONDS']
+    interval = current_app.config['STREAM_POLL_INTERVAL']
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    retry = current_app.config['STREAM_RETRY_MS']
+
+    def generate(after_id):
+        yield f'retry: {retry}\n\n'
+        if after_id is None:
+            after_id = latest_event_id(db.session)
+            ready = {'last_event_id': after_id, 'push': hold > 0}
+            yield sse_message('ready', ready, after_id)
+        deadline = time.monotonic() + hold
+        while True:
+            rows = read_events(db.session, after_id, batch_size)
+            # 结束只读事务并归还连接：等待期间不占用连接池，
+            # 下一次查询也能读到新提交的事件
+            db.session.rollback()
+            for row in rows:
+                yield event_message(row)
+            if rows:
+                after_id = rows[-1].id
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if len(rows) < batch_size:
+                pause(min(interval, remaining))
+
+    response = Response(stream_with_context(generate(last_event_id)),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 关闭 Nginx 的响应缓冲，事件才能立即到达浏览器
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# 导出用户（服务端流式生成 CSV / XLSX，内存占用与联系人数量无关）
+@bp.route('/export', methods=['GET'])
+@read_replica
+def export_users():
+    export_format = (request.args.get('format') or 'xlsx').lower()
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({'code': 400, 'message': '导出格式只支持 csv 或 xlsx！'})
+
+    if export_format == 'csv':
+        body = generate_csv(iter_export_rows(db.session))
+        # Werkzeug 会自动为 text/* 类型加上 charset=utf-8
+        mimetype = 'text/csv'
+    else:
+        if not xlsx_available():
+            return jsonify({
+                'code': 500,
+                'message': ('服务器未安装 XlsxWriter，暂不支持导出 xlsx，'
+                            '请使用 csv 格式！')
+            })
+        body = generate_xlsx(iter_export_rows(db.session))
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    filename = f'联系人列表_{datetime.now().strftime("%Y-%m-%d")}.{export_format}'
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = (
+        f"attachment; filename=contacts.{export_format}; "
+        f"filename*=UTF-8''{quote(filename)}"
+    )
+    return response
+
 # 获取单个用户
 @bp.route('/<int:user_id>', methods=['GET'])
+@read_replica
+@conditional_get
 def get_user(user_id):
     user = User.query.get_or_404(user_id)
     return jsonify({
@@ -85,7 +437,41 @@ def get_user(user_id):
         'data': user.to_dict()
     })
 
+# 客户端编辑时看到的行版本号：If-Match: "r<n>" 请求头，或请求体中的 row_version；
+# 都没有时返回 None
+def _expected_row_version(data):
+    for tag in request.if_match:
+        if tag.startswith('r') and tag[1:].isdigit():
+            return int(tag[1:])
+    value = data.get('row_version')
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError('row_version 不能是布尔值')
+    return int(value)
+
+# 写操作的响应带上行版本号 ETag，客户端可以直接用于下一次 If-Match
+def _with_row_version(response, row_version):
+    response.set_etag(f'r{row_version}')
+    return response
+
+# 编辑冲突：联系人已被其他人修改，返回 409 与当前内容，由客户端合并后重新提交
+def _edit_conflict(user_id):
+    user = db.session.get(User, user_id)
+    if user is None:
+        abort(404)
+    response = jsonify({
+        'code': 409,
+        'message': f'用户「{user.username}」已被其他人修改，请确认最新内容后重新提交！',
+        'data': user.to_dict()
+    })
+    response.status_code = 409
+    return _with_row_version(response, user.row_version)
+
 # 更新用户
+# 乐观并发控制：带上行版本号时，与当前版本不一致直接返回 409；
+# 读取与写入之间被并发修改时，UPDATE 的 WHERE row_version 条件不命中，同样返回 409
+# （不需要 SELECT ... FOR UPDATE）
 @bp.route('/edit/<int:user_id>', methods=['PUT'])
 def edit_user(user_id):
     user = User.query.get_or_404(user_id)
@@ -103,11 +489,13 @@ def edit_user(user_id):
         if not new_username:
             return jsonify({'code': 400, 'message': '用户名不能为空！'})
 
-        if User.query.filter(User.username == new_username, User.id != user_id).first():
-            return jsonify({'code': 400, 'message': f'用户名「{new_username}」已被使用！'})
-
-        if new_email and User.query.filter(User.email == new_email, User.id != user_id).first():
-            return jsonify({'code': 400, 'message': f'邮箱「{new_email}」已被使用！'})
+        try:
+            expected_row_version = _expected_row_version(data)
+        except (TypeError, ValueError):
+            return jsonify({'code': 400, 'message': '行版本号格式不正确！'})
+        if (expected_row_version is not None
+                and expected_row_version != user.row_version):
+            return _edit_conflict(user_id)
 
         old_username = user.username
         old_phone = user.phone
@@ -116,6 +504,7 @@ def edit_user(user_id):
         old_social_media = user.social_media
         old_notes = user.notes
         old_is_favorite = user.is_favorite
+        version_count = user.version_count
 
         # 检测是否只有收藏状态发生变化
         only_favorite_changed = (
@@ -127,6 +516,26 @@ def edit_user(user_id):
             old_notes == new_notes and
             old_is_favorite != new_is_favorite
         )
+        new_values = {
+            'username': new_username,
+            'phone': new_phone,
+            'email': new_email,
+            'address': new_address,
+            'social_media': new_social_media,
+            'notes': new_notes,
+            'is_favorite': new_is_favorite
+        }
+        old_values = {
+            'username': old_username,
+            'phone': old_phone,
+            'email': old_email,
+            'address': old_address,
+            'social_media': old_social_media,
+            'notes': old_notes,
+            'is_favorite': old_is_favorite
+        }
+        changed = {field for field in new_values
+                   if new_values[field] != old_values[field]}
 
         user.username = new_username
         user.phone = new_phone
@@ -140,62 +549,254 @@ def edit_user(user_id):
 
         # 只有在非单纯收藏状态变化时才记录版本
         if not only_favorite_changed:
-            new_version = UserVersion(
-                user_id=user.id,
-                username=new_username,
-                phone=new_phone,
-                email=new_email,
-                address=new_address,
-                social_media=new_social_media,
-                notes=new_notes,
-                is_favorite=new_is_favorite,
-                operator=operator
-            )
-            db.session.add(new_version)
+            record_version(db.session, user.id, new_values, changed, operator,
+                           version_count + 1)
+            user.version_count = User.version_count + 1  # 在 UPDATE 语句中原子加一
+            index_user(db.session, user)
 
+        bump_data_version(db.session, changed_ids=[user.id])
+        event = 'favorite' if only_favorite_changed else 'update'
+        publish_events(db.session, event, [user.id], operator)
         db.session.commit()
-        return jsonify({
+        return _with_row_version(jsonify({
             'code': 200,
             'message': f'用户「{new_username}」更新成功！',
             'data': user.to_dict()
-        })
+        }), user.row_version)
+
+    except StaleDataError:
+        db.session.rollback()
+        return _edit_conflict(user_id)
+    except IntegrityError as e:
+        db.session.rollback()
+        message = _duplicate_message(e, new_username, new_email, '已被使用')
+        return jsonify({'code': 400, 'message': message})
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'code': 500, 'message': f'更新失败：{str(e)}'})
+
+# 部分更新的文本字段：必须是字符串或 null，去掉首尾空白后为空时存为 None
+def _patch_text(data, field):
+    value = data.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'字段 {field} 必须是字符串！')
+    return clean_text(value)
+
+# 校验并规整部分更新的字段；收藏状态必须是 JSON 布尔值（"false"、0 等不会被当作收藏）
+def _patch_values(data):
+    values = {}
+    for field in VERSION_FIELDS:
+        if field not in data:
+            continue
+        if field == 'is_favorite':
+            if not isinstance(data[field], bool):
+                raise ValueError('字段 is_favorite 必须是布尔值！')
+            values[field] = data[field]
+        else:
+            values[field] = _patch_text(data, field)
+    return values
 
+# 部分更新用户：请求体只包含要修改的字段，
+# 例如 {"phone": "13800000000", "row_version": 3}
+# UPDATE 只写入实际变化的列，未修改的字段（如很长的备注）既不需要上传也不会被重写；
+# 只有收藏状态变化时不记录版本，否则按变化的字段记录版本，并只重建这些字段的检索索引
+# 与 edit_user 相同，支持 If-Match / row_version 乐观并发控制
+@bp.route('/<int:user_id>', methods=['PATCH'])
+def patch_user(user_id):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'code': 400, 'message': '请求内容格式不正确！'})
+    try:
+        new_values = _patch_values(data)
+        operator = _patch_text(data, 'operator') or 'system'
+    except ValueError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+    if not new_values:
+        return jsonify({'code': 400, 'message': '没有需要更新的字段！'})
+    if 'username' in new_values and not new_values['username']:
+        return jsonify({'code': 400, 'message': '用户名不能为空！'})
+    try:
+        expected_row_version = _expected_row_version(data)
+    except (TypeError, ValueError):
+        return jsonify({'code': 400, 'message': '行版本号格式不正确！'})
+
+    # 只读取比较所需的列
+    fields = ['username'] + [field for field in new_values if field != 'username']
+    current = db.session.execute(
+        select(User.row_version, User.version_count,
+               *[getattr(User, field) for field in fields])
+        .where(User.id == user_id)
+    ).first()
+    if current is None:
+        abort(404)
+    if expected_row_version is not None and expected_row_version != current.row_version:
+        return _edit_conflict(user_id)
+
+    changed = {field for field, value in new_values.items()
+               if value != getattr(current, field)}
+    if not changed:
+        user = db.session.get(User, user_id)
+        return _with_row_version(jsonify({
+            'code': 200,
+            'message': f'用户「{user.username}」没有变化',
+            'data': user.to_dict()
+        }), user.row_version)
+
+    record = bool(changed - {'is_favorite'})
+    ordinal = current.version_count + 1
+    try:
+        version_values = {field: new_values[field] for field in changed}
+        version_values.setdefault('username', current.username)
+        if record and snapshot_due(ordinal):
+            # 完整快照需要全部字段，未修改的字段从数据库读取
+            rest = [field for field in VERSION_FIELDS if field not in version_values]
+            if rest:
+                row = db.session.execute(
+                    select(*[getattr(User, field) for field in rest])
+                    .where(User.id == user_id)
+                ).one()
+                version_values.update(zip(rest, row))
+
+        update_values = {field: new_values[field] for field in changed}
+        update_values.update(operator=operator, update_time=datetime.now(),
+                             row_version=User.row_version + 1)
+        if record:
+            update_values['version_count'] = User.version_count + 1
+        # WHERE 中校验读取时的行版本号，期间被并发修改则不更新任何行
+        stmt = (update(User)
+                .where(User.id == user_id, User.row_version == current.row_version)
+                .values(**update_values)
+                .execution_options(synchronize_session=False))
+        if db.engine.dialect.update_returning:
+            row = db.session.execute(stmt.returning(*USER_COLUMNS)).first()
+        elif db.session.execute(stmt).rowcount:
+            row = db.session.execute(
+                select(*USER_COLUMNS).where(User.id == user_id)
+            ).first()
+        else:
+            row = None
+        if row is None:
+            db.session.rollback()
+            return _edit_conflict(user_id)
+
+        if record:
+            record_version(db.session, user_id, version_values, changed, operator,
+                           ordinal)
+        reindex_fields(db.session, user_id,
+                       {field: new_values[field] for field in changed})
+        bump_data_version(db.session, changed_ids=[user_id])
+        event = 'favorite' if changed == {'is_favorite'} else 'update'
+        publish_events(db.session, event, [user_id], operator)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        username = new_values.get('username', current.username)
+        return jsonify({'code': 400, 'message': _duplicate_message(
+            e, username, new_values.get('email'), '已被使用')})
     except Exception as e:
         db.session.rollback()
         traceback.print_exc()
         return jsonify({'code': 500, 'message': f'更新失败：{str(e)}'})
 
+    user = user_row_to_dict(row)
+    return _with_row_version(jsonify({
+        'code': 200,
+        'message': f'用户「{user["username"]}」更新成功！',
+        'data': user
+    }), user['row_version'])
+
 # 删除用户
 @bp.route('/delete/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
+    username = user.username
+    data = request.get_json(silent=True) or {}
+    operator = clean_text(data.get('operator')) or 'system'
     try:
-        db.session.delete(user)
+        # 用批量 DELETE 删除版本记录，不经过 versions 关系逐条加载再逐条删除
+        unindex_users(db.session, [user_id])
+        db.session.execute(delete(UserVersion).where(UserVersion.user_id == user_id))
+        db.session.execute(delete(User).where(User.id == user_id))
+        bump_data_version(db.session, deleted_ids=[user_id])
+        publish_events(db.session, 'delete', [user_id], operator)
         db.session.commit()
         return jsonify({
             'code': 200,
-            'message': f'用户「{user.username}」已成功删除！'
+            'message': f'用户「{username}」已成功删除！'
         })
     except Exception as e:
         db.session.rollback()
         return jsonify({'code': 500, 'message': f'删除失败：{str(e)}'})
 
+# 版本历史的排序列，与 ix_user_version_user_time_id 索引一致
+VERSION_LIST_ORDER = (UserVersion.update_time, UserVersion.id)
+
+
 # 获取版本历史
+# 带 limit 或 cursor 参数时按 (update_time, id) 游标分页；
+# total 取自 user.version_count，无需 COUNT
 @bp.route('/versions/<int:user_id>', methods=['GET'])
+@read_replica
+@conditional_get
 def user_versions(user_id):
-    User.query.get_or_404(user_id)  # 验证用户存在
-    versions = UserVersion.query.filter_by(user_id=user_id).order_by(UserVersion.update_time.desc()).all()
+    user = User.query.get_or_404(user_id)  # 验证用户存在
+    stmt = (select(*CHAIN_COLUMNS)
+            .where(UserVersion.user_id == user_id)
+            .order_by(*[column.desc() for column in VERSION_LIST_ORDER]))
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        return jsonify({
+            'code': 200,
+            'data': _version_dicts(user_id, db.session.execute(stmt).all()),
+            'total': user.version_count
+        })
+
+    try:
+        page_size = get_page_size(current_app.config['USER_PAGE_SIZE'],
+                                  current_app.config['USER_PAGE_SIZE_MAX'])
+        cursor = request.args.get('cursor')
+        if cursor:
+            update_time, last_id = decode_cursor(cursor, 2)
+            try:
+                values = (datetime.strptime(update_time, CURSOR_TIME_FORMAT),
+                          int(last_id))
+            except (TypeError, ValueError):
+                raise PaginationError('无效的分页游标！')
+            stmt = stmt.where(keyset_after(VERSION_LIST_ORDER, values))
+    except PaginationError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+
+    rows = db.session.execute(stmt.limit(page_size + 1)).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.update_time.strftime(CURSOR_TIME_FORMAT),
+                                     last.id])
     return jsonify({
         'code': 200,
-        'data': [version.to_dict() for version in versions]
+        'data': _version_dicts(user_id, rows),
+        'total': user.version_count,
+        'next_cursor': next_cursor,
+        'has_more': has_more
     })
 
+# 差量版本透明地重建为完整内容后再序列化
+def _version_dicts(user_id, rows):
+    return [version_row_to_dict(row) for row in materialize(db.session, user_id, rows)]
+
 # 删除版本记录
 @bp.route('/versions/delete/<int:version_id>', methods=['DELETE'])
 def delete_version(version_id):
     version = UserVersion.query.get_or_404(version_id)
     try:
-        db.session.delete(version)
+        db.session.execute(
+            update(User).where(User.id == version.user_id)
+            .values(version_count=User.version_count - 1)
+        )
+        remove_version(db.session, version)
+        bump_data_version(db.session)
         db.session.commit()
         return jsonify({
             'code': 200,
@@ -206,32 +807,187 @@ def delete_version(version_id):
         traceback.print_exc()
         return jsonify({'code': 500, 'message': f'删除失败：{str(e)}'})
 
+# 在一条 UPDATE 中翻转收藏状态，返回翻转后的行
+# 方言支持 UPDATE ... RETURNING 时在同一次往返中读回；否则在同一事务中按主键再查一次
+# （UPDATE 已锁住这些行，读到的就是本次写入的结果）。并发点击不会丢失更新
+def _toggle_favorites(user_ids, operator):
+    stmt = (update(User)
+            .where(User.id.in_(user_ids))
+            .values(is_favorite=not_(func.coalesce(User.is_favorite, false())),
+                    operator=operator,
+                    update_time=datetime.now(),
+                    row_version=User.row_version + 1)
+            .execution_options(synchronize_session=False))
+    if db.engine.dialect.update_returning:
+        return db.session.execute(stmt.returning(*USER_COLUMNS)).all()
+    db.session.execute(stmt)
+    return db.session.execute(select(*USER_COLUMNS).where(User.id.in_(user_ids))).all()
+
 # 切换收藏状态
 @bp.route('/toggle-favorite/<int:user_id>', methods=['POST'])
 def toggle_favorite(user_id):
-    user = User.query.get_or_404(user_id)
+    # 获取操作人信息 - 允许空body
+    data = request.get_json(silent=True) or {}
+    operator = data.get('operator', 'system') if data else 'system'
     try:
-        # 获取操作人信息 - 允许空body
-        try:
-            data = request.get_json(silent=True) or {}
-        except:
-            data = {}
-        operator = data.get('operator', 'system') if data else 'system'
-        
-        user.is_favorite = not user.is_favorite
-        user.operator = operator
-        user.update_time = datetime.now()
-        
+        rows = _toggle_favorites([user_id], operator)
         # 收藏/取消收藏操作不记录版本历史
+        if rows:
+            bump_data_version(db.session, changed_ids=[row.id for row in rows])
+            publish_events(db.session, 'favorite', [row.id for row in rows], operator)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'code': 500, 'message': f'操作失败：{str(e)}'})
+
+    if not rows:
+        abort(404)
+    user = user_row_to_dict(rows[0])
+    status = '已收藏' if user['is_favorite'] else '已取消收藏'
+    return jsonify({
+        'code': 200,
+        'message': f'用户「{user["username"]}」{status}！',
+        'data': user
+    })
+
+# 解析批量操作的 id 列表（去重并保持顺序）；
+# 格式不正确或超过 BULK_ACTION_MAX_IDS 时抛出 ValueError，消息可直接返回
+def _parse_user_ids(raw_ids):
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise ValueError('请选择要操作的用户！')
+    try:
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in raw_ids))
+    except (TypeError, ValueError):
+        raise ValueError('用户 id 格式不正确！')
+    max_ids = current_app.config['BULK_ACTION_MAX_IDS']
+    if len(user_ids) > max_ids:
+        raise ValueError(f'单次最多操作 {max_ids} 个用户！')
+    return user_ids
+
+# 批量切换收藏状态：{"ids": [1, 2, 3], "operator": "..."}，每个用户各自翻转
+@bp.route('/toggle-favorite', methods=['POST'])
+def toggle_favorites():
+    data = request.get_json(silent=True) or {}
+    try:
+        user_ids = _parse_user_ids(data.get('ids'))
+    except ValueError as e:
+        return jsonify({'code': 400, 'message': str(e)})
+    operator = (data.get('operator') or '').strip() or 'system'
+
+    try:
+        rows = _toggle_favorites(user_ids, operator)
+        if rows:
+            bump_data_version(db.session, changed_ids=[row.id for row in rows])
+            publish_events(db.session, 'favorite', [row.id for row in rows], operator)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({'code': 500, 'message': f'操作失败：{str(e)}'})
+
+    # 按请求中的顺序返回，不存在的 id 单独列出
+    users = {row.id: user_row_to_dict(row) for row in rows}
+    return jsonify({
+        'code': 200,
+        'message': f'已切换 {len(users)} 个用户的收藏状态！',
+        'data': [users[user_id] for user_id in user_ids if user_id in users],
+        'missing': [user_id for user_id in user_ids if user_id not in users]
+    })
+
+# 批量操作：{"action": "delete" | "favorite" | "unfavorite" | "set_operator",
+#           "ids": [...] 或 "filter": {...}, "operator": "..."}
+# 每 BULK_CHUNK_SIZE 个用户一个事务，用集合式 SQL 执行，返回每个 id 的结果；
+# set_operator 把操作人改为 operator
+# 按 filter 操作时按 id 顺序处理，每次请求最多 BULK_ACTION_MAX_IDS 个，
+# 还有剩余时返回 next_after_id，作为下一次请求的 after_id 继续处理
+@bp.route('/bulk', methods=['POST'])
+def bulk_action():
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in BULK_ACTIONS:
+        return jsonify({'code': 400, 'message': '不支持的批量操作！'})
+    operator = clean_text(data.get('operator'))
+    if action == 'set_operator' and not operator:
+        return jsonify({'code': 400, 'message': '请填写新的操作人！'})
+    operator = operator or 'system'
+    if ('ids' in data) == ('filter' in data):
+        return jsonify({'code': 400, 'message': '请指定 ids 或 filter 其中之一！'})
+
+    chunk_size = current_app.config['BULK_CHUNK_SIZE']
+    results = []
+    next_after_id = None
+    if 'ids' in data:
+        try:
+            user_ids = _parse_user_ids(data['ids'])
+        except ValueError as e:
+            return jsonify({'code': 400, 'message': str(e)})
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            _bulk_action_chunk(action, chunk, operator, results)
+    else:
+        try:
+            conditions = filter_conditions(data['filter'])
+            after_id = int(data.get('after_id') or 0)
+        except (BulkFilterError, TypeError, ValueError) as e:
+            if not isinstance(e, BulkFilterError):
+                return jsonify({'code': 400, 'message': 'after_id 格式不正确！'})
+            return jsonify({'code': 400, 'message': str(e)})
+        max_ids = current_app.config['BULK_ACTION_MAX_IDS']
+        while len(results) < max_ids:
+            chunk = select_filtered_ids(db.session, conditions, after_id,
+                                        min(chunk_size, max_ids - len(results)))
+            if not chunk:
+                break
+            _bulk_action_chunk(action, chunk, operator, results)
+            after_id = chunk[-1]
+        if (len(results) >= max_ids
+                and select_filtered_ids(db.session, conditions, after_id, 1)):
+            next_after_id = after_id
+
+    success_count = sum(1 for result in results if result['success'])
+    fail_count = len(results) - success_count
+    return jsonify({
+        'code': 200,
+        'message': (f'批量{BULK_ACTIONS[action]}完成！'
+                    f'成功: {success_count}, 失败: {fail_count}'),
+        'data': {
+            'success_count': success_count,
+            'fail_count': fail_count,
+            'results': results,
+            'next_after_id': next_after_id
+        }
+    })
+
+
+# 批量操作对应的推送事件类型
+BULK_EVENTS = {'delete': 'delete', 'favorite': 'favorite', 'unfavorite': 'favorite',
+               'set_operator': 'update'}
+
+
+# 对一块用户执行批量操作（一个事务），结果追加到 results
+def _bulk_action_chunk(action, chunk, operator, results):
+    try:
+        existing = set(db.session.scalars(select(User.id).where(User.id.in_(chunk))))
+        if existing:
+            user_ids = [user_id for user_id in chunk if user_id in existing]
+            apply_action(db.session, action, user_ids, operator)
+            if action == 'delete':
+                bump_data_version(db.session, deleted_ids=user_ids)
+            else:
+                bump_data_version(db.session, changed_ids=user_ids)
+            publish_events(db.session, BULK_EVENTS[action], user_ids, operator)
         db.session.commit()
-        
-        status = '已收藏' if user.is_favorite else '已取消收藏'
-        return jsonify({
-            'code': 200,
-            'message': f'用户「{user.username}」{status}！',
-            'data': user.to_dict()
-        })
     except Exception as e:
         db.session.rollback()
         traceback.print_exc()
-        return jsonify({'code': 500, 'message': f'操作失败：{str(e)}'})
\ No newline at end of file
+        message = f'操作失败：{str(e)}'
+        results.extend({'id': user_id, 'success': False, 'message': message}
+                       for user_id in chunk)
+        return
+
+    for user_id in chunk:
+        if user_id in existing:
+            results.append({'id': user_id, 'success': True})
+        else:
+            results.append({'id': user_id, 'success': False, 'message': '用户不存在'})
@@ -0,0 +1,76 @@
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, has_app_context, make_response, request
+from sqlalchemy import insert, select, update
+
+from exts import db
+from models import DataVersion, DeletedUser, User
+
+COUNTER_ID = 1
+
+
+# 数据版本号加一（在写操作提交前调用，与业务写入处于同一事务）
+# changed_ids：本次新增或修改的联系人，change_seq 记为新的版本号；
+# deleted_ids：本次删除的联系人，写入删除记录
+# 版本号行在提交前一直被本事务锁住，因此 change_seq 的大小顺序与提交顺序一致，
+# 增量同步按它续传不会漏数据
+def bump_data_version(session, changed_ids=(), deleted_ids=()):
+    now = datetime.now().replace(microsecond=0)
+    result = session.execute(
+        update(DataVersion)
+        .where(DataVersion.id == COUNTER_ID)
+        .values(version=DataVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        session.execute(insert(DataVersion).values(id=COUNTER_ID, version=1))
+    # 用子查询取新版本号，不需要额外读回
+    version = (select(DataVersion.version)
+               .where(DataVersion.id == COUNTER_ID)
+               .scalar_subquery())
+    if changed_ids:
+        # 显式保留 update_time，避免触发列上的 onupdate
+        session.execute(
+            update(User).where(User.id.in_(changed_ids))
+            .values(change_seq=version, update_time=User.update_time),
+            execution_options={'synchronize_session': False}
+        )
+    if deleted_ids:
+        session.execute(insert(DeletedUser).values([
+            {'user_id': user_id, 'change_seq': version, 'delete_time': now}
+            for user_id in deleted_ids
+        ]))
+    # 配置了只读副本时，新版本号在提交后作为一致性令牌返回给客户端（见 replica.py）
+    if has_app_context() and current_app.config.get('SQLALCHEMY_REPLICA_URIS'):
+        session.info['pending_token'] = session.scalar(
+            select(DataVersion.version).where(DataVersion.id == COUNTER_ID)
+        )
+
+
+# 读取当前数据版本号（按主键查询单行，不访问 user 表）
+def get_data_version(session):
+    version = session.scalar(
+        select(DataVersion.version).where(DataVersion.id == COUNTER_ID))
+    return version or 0
+
+
+# 条件 GET 装饰器：If-None-Match 命中当前版本号时直接返回 304
+# 只使用 ETag 作为校验器，不发送也不接受 Last-Modified：秒级的修改时间无法区分
+# 同一秒内的两次写入，按 If-Modified-Since 判断会得到过期的 304
+def conditional_get(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = f'v{get_data_version(db.session)}'
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        # 允许浏览器缓存，但每次使用前都要带上 ETag 重新验证
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,171 @@
+import csv
+import io
+import os
+import tempfile
+
+from sqlalchemy import select
+
+from blocking_io import iter_from_loop, run_blocking
+from models import User
+
+# 导出列与前端原有 Excel 导出保持一致
+EXPORT_HEADERS = ['ID', '姓名', '电话', '邮箱', '地址', '社交媒体', '备注', '收藏',
+                  '创建时间', '最后更新']
+EXPORT_COLUMN_WIDTHS = [5, 15, 15, 25, 30, 20, 30, 8, 20, 20]
+# 服务端游标每次取回的行数
+YIELD_PER = 1000
+# CSV 每累计多少行向客户端输出一次
+CSV_FLUSH_ROWS = 500
+# 临时文件分块读取大小
+FILE_CHUNK_SIZE = 64 * 1024
+# xlsx 每个工作表最多 1,048,576 行（含表头），超出后续写到新的工作表
+XLSX_MAX_ROWS = 1_048_576
+XLSX_SHEET_NAME = '联系人列表'
+
+
+def _format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+# 通过服务端游标（yield_per）逐行读取联系人，内存占用与总行数无关
+def iter_export_rows(session):
+    stmt = (
+        select(User.username, User.phone, User.email, User.address, User.social_media,
+               User.notes, User.is_favorite, User.create_time, User.update_time)
+        .order_by(User.is_favorite.desc(), User.create_time.desc(), User.id.desc())
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for index, row in enumerate(session.execute(stmt), start=1):
+        yield [
+            index,
+            row.username,
+            row.phone or '',
+            row.email or '',
+            row.address or '',
+            row.social_media or '',
+            row.notes or '',
+            '是' if row.is_favorite else '否',
+            _format_time(row.create_time),
+            _format_time(row.update_time),
+        ]
+
+
+# 逐块生成 CSV 文本（带 BOM，Excel 可直接识别 UTF-8）
+def generate_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_HEADERS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+# 检查服务器是否安装了 xlsx 写入库（XlsxWriter 或 openpyxl）
+def xlsx_available():
+    for module in ('xlsxwriter', 'openpyxl'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+# 以常量内存模式写 xlsx：行数据边读边落盘，写完后分块输出临时文件
+# 临时文件的读写通过 run_blocking 执行，异步部署时不阻塞事件循环
+def generate_xlsx(rows):
+    path = run_blocking(_make_temp_file)
+    try:
+        run_blocking(_write_xlsx, path, iter_from_loop(rows, YIELD_PER))
+        with open(path, 'rb') as f:
+            while True:
+                chunk = run_blocking(f.read, FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        run_blocking(os.remove, path)
+
+
+def _make_temp_file():
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    return path
+
+
+def _write_xlsx(path, rows):
+    try:
+        _write_xlsx_xlsxwriter(path, rows)
+    except ImportError:
+        _write_xlsx_openpyxl(path, rows)
+
+
+# 把数据行分配到各个工作表，依次产出 (工作表序号, 表内行号, 行数据)
+# 每个工作表的第 0 行是表头，写满 XLSX_MAX_ROWS 行后换到下一个工作表
+def _sheet_rows(rows):
+    sheet = 0
+    row_no = 0
+    yield sheet, row_no, EXPORT_HEADERS
+    for row in rows:
+        row_no += 1
+        if row_no == XLSX_MAX_ROWS:
+            sheet += 1
+            row_no = 1
+            yield sheet, 0, EXPORT_HEADERS
+        yield sheet, row_no, row
+
+
+def _sheet_name(sheet):
+    return XLSX_SHEET_NAME if sheet == 0 else f'{XLSX_SHEET_NAME} {sheet + 1}'
+
+
+# 联系人字段是用户输入的内容：关闭字符串自动转换，以“=”开头的文本不会成为公式，
+# 网址也不会变成超链接（Excel 单个工作表最多 65,530 个链接）
+def _write_xlsx_xlsxwriter(path, rows):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    worksheets = []
+    for sheet, row_no, row in _sheet_rows(rows):
+        if sheet == len(worksheets):
+            worksheet = workbook.add_worksheet(_sheet_name(sheet))
+            for col, width in enumerate(EXPORT_COLUMN_WIDTHS):
+                worksheet.set_column(col, col, width)
+            worksheets.append(worksheet)
+        worksheets[sheet].write_row(row_no, 0, row)
+    workbook.close()
+
+
+def _write_xlsx_openpyxl(path, rows):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheets = []
+    for sheet, _, row in _sheet_rows(rows):
+        if sheet == len(worksheets):
+            worksheet = workbook.create_sheet(_sheet_name(sheet))
+            for col, width in enumerate(EXPORT_COLUMN_WIDTHS, start=1):
+                worksheet.column_dimensions[get_column_letter(col)].width = width
+            worksheets.append(worksheet)
+        worksheet = worksheets[sheet]
+        cells = []
+        for value in row:
+            # openpyxl 把以“=”开头的字符串当作公式，强制按文本写入
+            if isinstance(value, str) and value.startswith('='):
+                cell = WriteOnlyCell(worksheet, value)
+                cell.data_type = 's'
+                value = cell
+            cells.append(value)
+        worksheet.append(cells)
+    workbook.save(path)
@@ -1,3 +1,87 @@
-from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy import SQLAlchemy as _SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
 
-db = SQLAlchemy()
\ No newline at end of file
+from pool_stats import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
+from sql_stats import track_statements
+
+# 异步部署（asgi.py）时各数据库使用的异步驱动
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+# 连接池配置项与 create_engine 参数的对应关系
+POOL_OPTIONS = {
+    'SQLALCHEMY_POOL_PRE_PING': 'pool_pre_ping',
+    'SQLALCHEMY_POOL_RECYCLE': 'pool_recycle',
+}
+# 只适用于 QueuePool 的参数（内存 SQLite 使用 StaticPool，不设置这些参数）
+QUEUE_POOL_OPTIONS = {
+    'SQLALCHEMY_POOL_SIZE': 'pool_size',
+    'SQLALCHEMY_POOL_MAX_OVERFLOW': 'max_overflow',
+    'SQLALCHEMY_POOL_TIMEOUT': 'pool_timeout',
+}
+
+# 只读副本在 SQLALCHEMY_BINDS 中的名称前缀
+REPLICA_BIND_PREFIX = 'replica_'
+
+
+# 读写分离会话：session.info['replica'] 指定了只读副本时，SELECT 发往副本，
+# 其余语句（以及 flush）仍然发往主库
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get('replica')
+        if (replica is not None and bind is None and not self._flushing
+                and getattr(clause, 'is_select', False)):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class SQLAlchemy(_SQLAlchemy):
+    # SQLALCHEMY_REPLICA_URIS 中的每个只读副本注册为一个 bind
+    # （replica_0、replica_1 ...）
+    def init_app(self, app):
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        for index, uri in enumerate(app.config.get('SQLALCHEMY_REPLICA_URIS') or ()):
+            binds.setdefault(f'{REPLICA_BIND_PREFIX}{index}', uri)
+        app.config['SQLALCHEMY_BINDS'] = binds
+        super().init_app(app)
+
+    # 当前应用的只读副本引擎
+    def replica_engines(self):
+        return [engine for key, engine in self.engines.items()
+                if key and key.startswith(REPLICA_BIND_PREFIX)]
+
+    # 按 SQLALCHEMY_POOL_* 配置连接池，并换用带等待时间统计的连接池
+    # SQLALCHEMY_ENGINE_OPTIONS 中显式给出的参数优先
+    def _apply_driver_defaults(self, options, app):
+        explicit = set(options)
+        super()._apply_driver_defaults(options, app)
+        config_options = dict(POOL_OPTIONS)
+        if 'poolclass' not in options:
+            async_pool = app.config.get('SQLALCHEMY_ASYNC')
+            options['poolclass'] = TimedAsyncQueuePool if async_pool else TimedQueuePool
+            config_options.update(QUEUE_POOL_OPTIONS)
+        for key, option in config_options.items():
+            if option not in explicit and app.config.get(key) is not None:
+                options[option] = app.config[key]
+
+    # SQLALCHEMY_ASYNC 开启时改用异步驱动建引擎，返回异步引擎的同步外观：
+    # 原有的同步代码在 greenlet 中运行，数据库 I/O 交给事件循环等待
+    def _make_engine(self, bind_key, options, app):
+        if app.config.get('SQLALCHEMY_ASYNC'):
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            options = dict(options)
+            url = make_url(options.pop('url'))
+            url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+            engine = create_async_engine(url, **options).sync_engine
+        else:
+            engine = super()._make_engine(bind_key, options, app)
+        instrument_engine(engine)
+        track_statements(engine)
+        return engine
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,46 @@
+import os
+import sys
+
+# 项目目录
+chdir = '/www/wwwroot/homework1_jixianbiancheng/homework1/832301316_高杰铭_backend/src'
+
+# 指定进程数
+workers = 4
+
+#启动用户
+user = 'www'
+
+# 启动模式（异步部署：每个进程一个事件循环，见 asgi.py）
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# 启用异步数据库驱动；每个进程同时处理的请求不受线程数限制，连接池相应调大
+raw_env = ['ADDRESS_BOOK_ASYNC=1', 'ADDRESS_BOOK_POOL_SIZE=10']
+
+# 绑定的ip与端口
+bind = '0.0.0.0:5000'
+
+# 设置进程文件目录（用于停止服务和重启服务，请勿删除）
+pidfile = ('/www/wwwroot/homework1_jixianbiancheng/homework1/'
+           '832301316_高杰铭_backend/src/gunicorn_asgi.pid')
+
+# 设置访问日志和错误信息日志路径
+accesslog = '/www/wwwlogs/python/src/gunicorn_acess.log'
+errorlog = '/www/wwwlogs/python/src/gunicorn_error.log'
+
+# 日志级别，这个日志级别指的是错误日志的级别，而访问日志的级别无法设置
+# debug:调试级别，记录的信息最多；
+# info:普通级别；
+# warning:警告消息；
+# error:错误消息；
+# critical:严重错误消息；
+loglevel = 'info'
+
+# 自定义设置项请写到该处
+# 最好以上面相同的格式 <注释 + 换行 + key = value> 进行书写，
+# PS: gunicorn 的配置文件是python扩展形式，即".py"文件，需要注意遵从python语法，
+# 如：loglevel的等级是字符串作为配置的，需要用引号包裹起来
+
+# 启动时清空监控指标目录，与同步部署共用 gunicorn_conf.py 中的钩子
+# （gunicorn 按文件路径加载配置，需要先把本目录加入 sys.path）
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from gunicorn_conf import on_starting  # noqa: E402,F401
@@ -7,6 +7,9 @@ workers = 4
 # 指定每个进程开启的线程数
 threads = 2
 
+# 把线程数传给应用，连接池大小据此自动设置（见 config.py）
+raw_env = [f'ADDRESS_BOOK_WORKER_THREADS={threads}']
+
 #启动用户
 user = 'www'
 
@@ -34,4 +37,17 @@ loglevel = 'info'
 # 自定义设置项请写到该处
 # 最好以上面相同的格式 <注释 + 换行 + key = value> 进行书写， 
 # PS: gunicorn 的配置文件是python扩展形式，即".py"文件，需要注意遵从python语法，
-# 如：loglevel的等级是字符串作为配置的，需要用引号包裹起来
\ No newline at end of file
+# 如：loglevel的等级是字符串作为配置的，需要用引号包裹起来
+
+# 访问日志格式：在默认格式末尾加上请求耗时（微秒），
+# benchmarks/replay_access_log.py 回放时据此对比生产环境的延迟
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+
+# 启动时清空监控指标目录，避免上次运行留下的计数被重复汇总
+# （见 config.py 中的 METRICS_DIR）
+def on_starting(server):
+    import shutil
+    import sys
+    sys.path.insert(0, chdir)
+    import config
+    shutil.rmtree(config.Config.METRICS_DIR, ignore_errors=True)
@@ -0,0 +1,74 @@
+import re
+from json.encoder import encode_basestring_ascii
+
+from flask import g, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+# 标准库 json 在 ensure_ascii 模式下会把 0x7f 及以上的字符转义为 \uXXXX（小写十六进制，
+# 超出 BMP 的字符转为代理对）。对 0x100-0xffff 的字符，str.encode 的 backslashreplace
+# 结果与之完全相同；只有出现 DEL、0x80-0xff 或 BMP 以外的字符时才需要逐段转义。
+# 这些字符在 UTF-8 中的首字节分别是下面几个，用 bytes.find（memchr）即可快速判断
+SLOW_PATH_BYTES = (
+    b'\x7f', b'\xc2', b'\xc3', b'\xf0', b'\xf1', b'\xf2', b'\xf3', b'\xf4',
+)
+NON_ASCII_RUN = re.compile('[\x7f-\U0010ffff]+')
+
+
+def _escape_non_ascii(match):
+    return encode_basestring_ascii(match.group())[1:-1]
+
+
+def _to_ascii_json(raw):
+    if any(raw.find(marker) != -1 for marker in SLOW_PATH_BYTES):
+        return NON_ASCII_RUN.sub(_escape_non_ascii, raw.decode('utf-8'))
+    return raw.decode('utf-8').encode('ascii', 'backslashreplace').decode('ascii')
+
+
+# 使用 orjson 编码的 JSON provider，不含浮点数时输出与 Flask 默认 provider 逐字节一致：
+# 排序键、ensure_ascii 转义、调试模式下的 2 空格缩进均保持不变；
+# 遇到 orjson 不支持或格式无法对齐的参数时退回默认实现
+# 浮点数与默认实现的差异（为此逐个检查数据会抵消提速，因此不做回退）：
+# - 科学计数法的指数不补零、不带正号：1e-07 输出为 1e-7，1e+16 输出为 1e16（数值相同）
+# - NaN / Infinity 输出为 null；默认实现输出不合法的 NaN / Infinity，浏览器无法解析
+# 接口返回的数据中只有连接池统计含浮点数（已保留 3 位小数，不会出现以上两种情况）
+class FastJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(kwargs)
+        if option is not None:
+            try:
+                raw = orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+            else:
+                return _to_ascii_json(raw) if self.ensure_ascii else raw.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    # 只处理 response() 生成的两种参数组合，其余情况返回 None
+    def _orjson_option(self, kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return None
+        # 日期、dataclass 交给 Flask 的 default 处理，保持 http_date 等格式
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs == {'indent': 2}:
+            return option | orjson.OPT_INDENT_2
+        if kwargs == {'separators': (',', ':')}:
+            return option
+        return None
+
+
+# 在 FastJSONProvider 基础上记录统一响应格式 {'code', 'message', 'data'} 中的 code，
+# 供 /api/metrics 按 code 统计（接口出错时 HTTP 状态码仍是 200，只能从 code 区分）
+class EnvelopeJSONProvider(FastJSONProvider):
+    def response(self, *args, **kwargs):
+        if len(args) == 1 and isinstance(args[0], dict) and has_request_context():
+            code = args[0].get('code')
+            if code is not None:
+                g.envelope_code = code
+        return super().response(*args, **kwargs)
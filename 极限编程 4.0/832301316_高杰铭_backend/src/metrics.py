@@ -0,0 +1,278 @@
+import glob
+import json
+import os
+import threading
+import time
+
+from flask import g, request
+
+from sql_stats import request_sql_stats
+
+# 请求耗时直方图的桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 单个请求累计数据库耗时直方图的桶（秒）
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# 单个请求执行 SQL 条数直方图的桶
+DB_STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+METRIC_HELP = {
+    'address_book_http_requests_total': (
+        'counter', '按路由、方法和 HTTP 状态码统计的请求数'),
+    'address_book_http_request_duration_seconds': ('histogram', '请求处理耗时'),
+    'address_book_http_requests_in_flight': ('gauge', '正在处理的请求数'),
+    'address_book_db_time_seconds': ('histogram', '单个请求中执行 SQL 的累计耗时'),
+    'address_book_db_statements': ('histogram', '单个请求中执行的 SQL 条数'),
+    'address_book_api_responses_total': (
+        'counter', '按统一响应格式中的 code 统计的响应数'),
+}
+
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+
+# 单个 worker 进程内的指标，定期写入 METRICS_DIR/metrics_<pid>.json；
+# /api/metrics 读取目录下所有进程的文件并汇总，从而跨 gunicorn / uwsgi 多进程聚合
+class MetricsRegistry:
+    def __init__(self, directory, flush_interval):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pid = None
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.dirty = False
+        self.flusher = None
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f'metrics_{os.getpid()}.json')
+
+    # 首次记录时（fork 之后）初始化并启动写文件的后台线程；
+    # 请求线程（异步部署时是事件循环）中不做任何文件操作
+    def _ensure_process(self):
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.counters, self.gauges, self.histograms = {}, {}, {}
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    # 同一 pid 的旧进程留下的文件改名保留，其计数继续参与汇总
+    def _prepare_directory(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            dead_path = self.path[:-len('.json')] + f'_{time.time_ns()}.dead.json'
+            os.replace(self.path, dead_path)
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self._ensure_process()
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+            self.dirty = True
+
+    def add_gauge(self, name, labels, value):
+        with self.lock:
+            self._ensure_process()
+            key = (name, labels)
+            self.gauges[key] = self.gauges.get(key, 0) + value
+            self.dirty = True
+
+    def observe(self, name, labels, value, buckets):
+        with self.lock:
+            self._ensure_process()
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets), 'counts': [0] * len(buckets),
+                    'sum': 0.0, 'count': 0,
+                }
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['counts'][index] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+            self.dirty = True
+
+    def _dump(self):
+        return {
+            'pid': self.pid,
+            'counters': _rows(self.counters),
+            'gauges': _rows(self.gauges),
+            'histograms': _rows(self.histograms),
+        }
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty or self.pid != os.getpid():
+                return
+            data = json.dumps(self._dump())
+            self.dirty = False
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _flush_loop(self):
+        try:
+            self._prepare_directory()
+        except OSError:
+            pass
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    # 汇总所有进程的指标：计数与直方图累加（包括已退出的进程），
+    # 在途请求数只统计仍在运行的进程；当前进程使用内存中的最新数据
+    def collect(self):
+        with self.lock:
+            self._ensure_process()
+            snapshots = [self._dump()]
+        for path in glob.glob(os.path.join(self.directory, 'metrics_*.json')):
+            if path == self.path:
+                continue
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if path.endswith('.dead.json') or not _pid_alive(snapshot['pid']):
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, value in snapshot['gauges']:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+            for name, labels, value in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, {
+                    'buckets': value['buckets'], 'counts': [0] * len(value['buckets']),
+                    'sum': 0.0, 'count': 0,
+                })
+                merged['counts'] = [a + b for a, b in
+                                    zip(merged['counts'], value['counts'])]
+                merged['sum'] += value['sum']
+                merged['count'] += value['count']
+        return counters, gauges, histograms
+
+
+# {(name, labels): value} 转为可写入 JSON 的 [[name, labels, value], ...]
+def _rows(metrics):
+    return [[name, labels, value] for (name, labels), value in metrics.items()]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+# 生成 Prometheus 文本格式（text/plain; version=0.0.4）
+def render_metrics(registry):
+    counters, gauges, histograms = registry.collect()
+    by_name = {}
+    for source in (counters, gauges, histograms):
+        for name, labels in source:
+            by_name.setdefault(name, []).append(labels)
+
+    lines = []
+    for name in sorted(by_name):
+        metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels in sorted(by_name[name]):
+            key = (name, labels)
+            if key in histograms:
+                histogram = histograms[key]
+                cumulative = 0
+                for bound, count in zip(histogram['buckets'], histogram['counts']):
+                    cumulative += count
+                    bucket = _format_labels(labels, [('le', repr(float(bound)))])
+                    lines.append(f'{name}_bucket{bucket} {cumulative}')
+                total, count = repr(float(histogram['sum'])), histogram['count']
+                bucket = _format_labels(labels, [('le', '+Inf')])
+                lines.append(f'{name}_bucket{bucket} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+            else:
+                value = counters.get(key, gauges.get(key))
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+
+# 在应用上注册请求钩子；指标写入 app.config['METRICS_DIR']
+def init_metrics(app):
+    registry = MetricsRegistry(app.config['METRICS_DIR'],
+                               app.config['METRICS_FLUSH_INTERVAL'])
+    app.extensions['metrics'] = registry
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        registry.add_gauge('address_book_http_requests_in_flight',
+                           _labels(endpoint=_endpoint()), 1)
+
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    # teardown 在流式响应结束、或视图抛出异常后同样会执行
+    @app.teardown_request
+    def finish_request_metrics(exception):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        endpoint = _endpoint()
+        method = request.method
+        status = 500 if exception is not None else g.get('metrics_status', 500)
+        registry.add_gauge('address_book_http_requests_in_flight',
+                           _labels(endpoint=endpoint), -1)
+        registry.inc('address_book_http_requests_total',
+                     _labels(endpoint=endpoint, method=method, status=status))
+        registry.observe('address_book_http_request_duration_seconds',
+                         _labels(endpoint=endpoint, method=method),
+                         time.perf_counter() - started, LATENCY_BUCKETS)
+        sql_stats = request_sql_stats()
+        if sql_stats is not None:
+            registry.observe('address_book_db_time_seconds', _labels(endpoint=endpoint),
+                             sql_stats.time, DB_TIME_BUCKETS)
+            registry.observe('address_book_db_statements', _labels(endpoint=endpoint),
+                             sql_stats.count, DB_STATEMENT_BUCKETS)
+        code = g.get('envelope_code')
+        if code is not None:
+            registry.inc('address_book_api_responses_total',
+                         _labels(endpoint=endpoint, code=code))
+
+    return registry
@@ -1,9 +1,16 @@
 from exts import db
 from datetime import datetime
+from sqlalchemy.dialects import mysql
 
 # 用户主表
 class User(db.Model):
     __tablename__ = "user"
+    __table_args__ = (
+        # 列表分页排序 (is_favorite desc, create_time desc, id desc) 对应的复合索引
+        db.Index('ix_user_favorite_create_time_id', 'is_favorite', 'create_time', 'id'),
+        # 增量同步按 (change_seq, id) 顺序读取变更
+        db.Index('ix_user_change_seq_id', 'change_seq', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
     phone = db.Column(db.String(20))
@@ -15,6 +22,16 @@ class User(db.Model):
     operator = db.Column(db.String(50), default="system")  # 新增：操作人
     create_time = db.Column(db.DateTime, default=datetime.now)
     update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    # 版本记录数（冗余计数）
+    version_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # 行版本号（乐观锁），每次修改加一
+    row_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # 最后一次修改时的数据版本号（增量同步用）
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+
+    # 乐观锁：ORM 更新时在 WHERE 中校验 row_version 并自动加一，
+    # 行已被并发修改时抛出 StaleDataError
+    __mapper_args__ = {'version_id_col': row_version}
 
     versions = db.relationship('UserVersion', backref='user', lazy=True, cascade="all, delete-orphan")
 
@@ -30,12 +47,18 @@ class User(db.Model):
             'is_favorite': self.is_favorite,
             'operator': self.operator,
             'create_time': self.create_time.strftime('%Y-%m-%d %H:%M:%S'),
-            'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S') if self.update_time else None
+            'update_time': (self.update_time.strftime('%Y-%m-%d %H:%M:%S')
+                            if self.update_time else None),
+            'row_version': self.row_version
         }
 
 # 用户版本记录表
 class UserVersion(db.Model):
     __tablename__ = "user_version"
+    __table_args__ = (
+        # 版本历史按用户过滤、按时间倒序分页对应的复合索引
+        db.Index('ix_user_version_user_time_id', 'user_id', 'update_time', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     username = db.Column(db.String(50), nullable=False)
@@ -47,8 +70,19 @@ class UserVersion(db.Model):
     is_favorite = db.Column(db.Boolean, default=False)  # 新增：是否收藏
     update_time = db.Column(db.DateTime, default=datetime.now)
     operator = db.Column(db.String(50), default="system")
+    # 差量存储：快照版本保存全部字段；
+    # 差量版本只保存 changed_fields 中列出的字段（及 username）
+    is_snapshot = db.Column(db.Boolean, nullable=False, default=True,
+                            server_default='1')
+    changed_fields = db.Column(db.String(100))
 
     def to_dict(self):
+        if self.is_snapshot is False:
+            # 差量版本：向前找到最近的快照，重建出完整内容
+            from serializers import version_row_to_dict
+            from versioning import load_chain
+            chain = load_chain(db.session, self.user_id, self.id, self.id)
+            return version_row_to_dict(chain[self.id])
         return {
             'id': self.id,
             'user_id': self.user_id,
@@ -62,3 +96,45 @@ class UserVersion(db.Model):
             'update_time': self.update_time.strftime('%Y-%m-%d %H:%M:%S'),
             'operator': self.operator
         }
+
+# 联系人检索用的 n-gram 倒排索引（单字和双字），一行表示某个字段包含某个词元
+class UserSearchToken(db.Model):
+    __tablename__ = "user_search_token"
+    # 词元需要区分大小写/重音，MySQL 下使用二进制排序规则避免主键冲突
+    token = db.Column(
+        db.String(2).with_variant(mysql.VARCHAR(2, collation='utf8mb4_bin'), 'mysql'),
+        primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'),
+                        primary_key=True, index=True)
+    field = db.Column(db.String(20), primary_key=True)
+
+# 全局数据版本号（单行表）：任何写操作都会在同一事务中把它加一，
+# 读接口据此生成 ETag，数据未变化时直接返回 304
+class DataVersion(db.Model):
+    __tablename__ = "data_version"
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+# 已删除联系人的删除记录（墓碑），增量同步据此通知客户端删除本地副本
+class DeletedUser(db.Model):
+    __tablename__ = "deleted_user"
+    __table_args__ = (
+        db.Index('ix_deleted_user_change_seq_user_id', 'change_seq', 'user_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, nullable=False)  # 不设外键：用户行已被删除
+    change_seq = db.Column(db.BigInteger, nullable=False)  # 删除时的数据版本号
+    delete_time = db.Column(db.DateTime, default=datetime.now)
+
+# 联系人变更事件（发件箱）：写接口在同一事务中写入，
+# 各 worker 的 /api/user/stream 按自增 id 轮询后推送给客户端
+class UserEvent(db.Model):
+    __tablename__ = "user_event"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # create / update / delete / favorite
+    event = db.Column(db.String(20), nullable=False)
+    # 不设外键：删除事件对应的用户行已不存在
+    user_id = db.Column(db.Integer, nullable=False)
+    operator = db.Column(db.String(50))
+    # 按时间清理旧事件
+    create_time = db.Column(db.DateTime, default=datetime.now, index=True)
@@ -0,0 +1,52 @@
+import base64
+import json
+
+from flask import request
+from sqlalchemy import and_, or_
+
+
+class PaginationError(ValueError):
+    pass
+
+
+# 将排序键编码为不透明游标（base64url 编码的 JSON 数组）
+def encode_cursor(values):
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+# 解析游标，返回与排序列一一对应的值列表
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise PaginationError('无效的分页游标！')
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError('无效的分页游标！')
+    return values
+
+
+# 读取 limit 参数：缺省取 default，超过 maximum 时截断为 maximum
+def get_page_size(default, maximum):
+    raw = request.args.get('limit')
+    if raw is None or raw == '':
+        return default
+    try:
+        size = int(raw)
+    except ValueError:
+        raise PaginationError('分页大小必须为正整数！')
+    if size <= 0:
+        raise PaginationError('分页大小必须为正整数！')
+    return min(size, maximum)
+
+
+# 生成“位于游标之后”的过滤条件（所有排序列均为降序）
+# (a, b, c) < (x, y, z) 展开为 a < x OR (a = x AND b < y) OR ...，
+# 这样 MySQL 可以直接在复合索引上做范围扫描，第 N 页与第 1 页代价相同
+def keyset_after(columns, values):
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column < values[i]))
+    return or_(*clauses)
@@ -0,0 +1,133 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 借连接耗时超过该值（秒）才计为一次等待
+WAIT_THRESHOLD = 0.001
+
+
+# 单个 worker 进程内某个连接池的累计统计
+class PoolStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.peak_checked_out = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+
+    def record_wait(self, seconds, timed_out):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            if seconds >= WAIT_THRESHOLD:
+                self.waits += 1
+                self.wait_total += seconds
+                self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'peak_checked_out': self.peak_checked_out,
+                'waits': self.waits,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+            }
+
+
+# 统计借连接等待时间的连接池；dispose() 重建连接池时沿用同一份统计
+class _TimedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started, timed_out)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# 通过连接池事件统计建连、借出与失效次数
+def instrument_engine(engine):
+    def stats():
+        return getattr(engine.pool, 'stats', None)
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        pool_stats = stats()
+        if pool_stats is not None:
+            with pool_stats.lock:
+                pool_stats.connects += 1
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats = stats()
+        if pool_stats is not None:
+            checked_out = engine.pool.checkedout()
+            with pool_stats.lock:
+                pool_stats.checkouts += 1
+                pool_stats.peak_checked_out = max(pool_stats.peak_checked_out,
+                                                  checked_out)
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_stats = stats()
+        if pool_stats is not None:
+            with pool_stats.lock:
+                pool_stats.invalidations += 1
+
+    @event.listens_for(engine, 'soft_invalidate')
+    def on_soft_invalidate(dbapi_connection, connection_record, exception):
+        pool_stats = stats()
+        if pool_stats is not None:
+            with pool_stats.lock:
+                pool_stats.soft_invalidations += 1
+
+
+# 当前 worker 中某个引擎连接池的实时状态与累计统计
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'timeout': pool.timeout(),
+        })
+    pool_stats = getattr(pool, 'stats', None)
+    if pool_stats is not None:
+        status.update(pool_stats.snapshot())
+    return status
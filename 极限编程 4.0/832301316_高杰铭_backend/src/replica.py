@@ -0,0 +1,80 @@
+import random
+from functools import wraps
+
+from flask import after_this_request, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from data_version import get_data_version
+from exts import RoutingSession, db
+
+# 写操作在响应头中返回一致性令牌（提交后的数据版本号），
+# 之后的读请求通过同名请求头（或 consistency 查询参数）带回
+CONSISTENCY_HEADER = 'X-Consistency-Token'
+# 标明本次读请求实际使用的数据源（replica / primary），便于排查
+READ_SOURCE_HEADER = 'X-Read-Source'
+
+
+def _request_token():
+    value = request.headers.get(CONSISTENCY_HEADER) or request.args.get('consistency')
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+# 为当前请求的会话挑选一个只读副本
+# 副本的数据版本号不低于令牌（已经同步到该次写入）才会使用，否则回到主库；
+# 副本不可用时同样回到主库
+def _choose_replica(session, token):
+    engines = db.replica_engines()
+    random.shuffle(engines)
+    for engine in engines:
+        session.info['replica'] = engine
+        try:
+            version = get_data_version(session)
+        except OperationalError:
+            session.rollback()
+            continue
+        if version >= token:
+            return True
+        session.rollback()
+    session.info.pop('replica', None)
+    return False
+
+
+# 读接口装饰器：配置了只读副本时，本次请求的查询发往副本
+def read_replica(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if db.replica_engines():
+            use_replica = _choose_replica(db.session, _request_token())
+            source = 'replica' if use_replica else 'primary'
+
+            @after_this_request
+            def add_read_source(response):
+                response.headers[READ_SOURCE_HEADER] = source
+                return response
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# 写事务提交成功后记录一致性令牌；回滚的写入不产生令牌
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_token(session):
+    token = session.info.pop('pending_token', None)
+    if token is not None and has_request_context():
+        g.consistency_token = max(token, g.get('consistency_token', 0))
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_token(session):
+    session.info.pop('pending_token', None)
+
+
+# 蓝图 after_request：把本次请求提交的最新数据版本号作为一致性令牌返回
+def attach_consistency_token(response):
+    token = g.get('consistency_token')
+    if token is not None:
+        response.headers[CONSISTENCY_HEADER] = str(token)
+    return response
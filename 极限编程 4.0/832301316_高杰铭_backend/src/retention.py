@@ -0,0 +1,202 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, distinct, select, update
+
+from data_version import bump_data_version
+from models import User, UserVersion
+from versioning import CHAIN_COLUMNS, COLUMN_INDEX, VERSION_FIELDS, rebuild_chain
+
+# 估算单行占用：行头与整数/时间/布尔列的固定开销，字符串列按 UTF-8 长度另计
+ROW_OVERHEAD_BYTES = 40
+STRING_COLUMNS = ('username', 'phone', 'email', 'address', 'social_media', 'notes',
+                  'operator', 'changed_fields')
+# 每批检查的用户数
+USER_BATCH_SIZE = 200
+
+
+# 从配置读取保留策略
+def policy_from_config(config):
+    return {
+        'keep_last': config['VERSION_RETENTION_KEEP_LAST'],
+        'max_age_days': config['VERSION_RETENTION_MAX_AGE_DAYS'],
+        'thin_after_days': config['VERSION_RETENTION_THIN_AFTER_DAYS'],
+    }
+
+
+def policy_enabled(policy):
+    return any(value is not None for value in policy.values())
+
+
+def estimate_row_bytes(values):
+    return ROW_OVERHEAD_BYTES + sum(len(values[column].encode('utf-8'))
+                                    for column in STRING_COLUMNS if values.get(column))
+
+
+# 按策略选出需要删除的版本 id
+# versions 为某个用户按 id 升序的 [(id, update_time), ...]；最新的版本始终保留
+def select_doomed(versions, policy, now):
+    if not versions:
+        return set()
+    doomed = set()
+    keep_last = policy.get('keep_last')
+    if keep_last is not None:
+        doomed.update(version_id for version_id, _ in versions[:-max(keep_last, 1)])
+
+    max_age_days = policy.get('max_age_days')
+    if max_age_days is not None:
+        cutoff = now - timedelta(days=max_age_days)
+        doomed.update(version_id for version_id, time in versions
+                      if time and time < cutoff)
+
+    thin_after_days = policy.get('thin_after_days')
+    if thin_after_days is not None:
+        cutoff = now - timedelta(days=thin_after_days)
+        # 同一天内保留最后一个版本
+        last_of_day = {}
+        for version_id, time in versions:
+            if time and time < cutoff:
+                last_of_day[time.date()] = version_id
+        doomed.update(version_id for version_id, time in versions
+                      if time and time < cutoff
+                      and last_of_day[time.date()] != version_id)
+
+    doomed.discard(versions[-1][0])
+    return doomed
+
+
+# 计算单个用户的整理计划，
+# 返回 (待删除 id 集合, 需补全为快照的 [(id, values)], 预计回收字节数)
+# rows 为按 id 升序、包含 CHAIN_COLUMNS 的版本行
+def plan_user(rows, policy, now):
+    doomed = select_doomed([(row.id, row.update_time) for row in rows], policy, now)
+    if not doomed:
+        return doomed, [], 0
+
+    updates = []
+    reclaimed = 0
+    after_gap = False
+    for raw, full in zip(rows, rebuild_chain(rows)):
+        if raw.id in doomed:
+            reclaimed += estimate_row_bytes(raw._mapping)
+            after_gap = True
+            continue
+        # 前面有版本被删除的差量版本失去了基准，补全为完整快照
+        if after_gap and not raw.is_snapshot:
+            values = {field: full[COLUMN_INDEX[field]] for field in VERSION_FIELDS}
+            values.update(is_snapshot=True, changed_fields=None)
+            reclaimed -= (estimate_row_bytes(dict(raw._mapping, **values))
+                          - estimate_row_bytes(raw._mapping))
+            updates.append((raw.id, values))
+        after_gap = False
+    return doomed, updates, reclaimed
+
+
+# 按策略整理单个用户的版本历史，返回 (删除行数, 预计回收字节数)
+# 先把缺口之后的差量版本补全为快照，再从新到旧分块删除，
+# 这样任何一次提交之后版本链都能正确重建，每个事务持有的行锁也有上限
+def compact_user(session, user_id, policy, now, chunk_size, dry_run=False):
+    rows = session.execute(
+        select(*CHAIN_COLUMNS)
+        .where(UserVersion.user_id == user_id)
+        .order_by(UserVersion.id)
+    ).all()
+    doomed, updates, reclaimed = plan_user(rows, policy, now)
+    if not doomed or dry_run:
+        return len(doomed), reclaimed
+
+    for version_id, values in updates:
+        session.execute(
+            update(UserVersion).where(UserVersion.id == version_id).values(**values))
+    session.commit()
+
+    doomed_ids = sorted(doomed, reverse=True)
+    for start in range(0, len(doomed_ids), chunk_size):
+        chunk = doomed_ids[start:start + chunk_size]
+        session.execute(delete(UserVersion).where(UserVersion.id.in_(chunk)),
+                        execution_options={'synchronize_session': False})
+        session.execute(update(User).where(User.id == user_id)
+                        .values(version_count=User.version_count - len(chunk)))
+        bump_data_version(session)
+        session.commit()
+    return len(doomed), reclaimed
+
+
+# 在一批用户中找出可能需要整理的用户，避免逐个加载全部版本
+def _candidate_users(session, user_ids, policy, now):
+    candidates = set()
+    if policy.get('keep_last') is not None:
+        candidates.update(session.scalars(
+            select(User.id).where(User.id.in_(user_ids),
+                                  User.version_count > max(policy['keep_last'], 1))
+        ))
+    days = [policy.get(key) for key in ('max_age_days', 'thin_after_days')
+            if policy.get(key) is not None]
+    if days:
+        cutoff = now - timedelta(days=min(days))
+        candidates.update(session.scalars(
+            select(distinct(UserVersion.user_id))
+            .where(UserVersion.user_id.in_(user_ids), UserVersion.update_time < cutoff)
+        ))
+    return sorted(candidates)
+
+
+def _load_state(state_path, policy):
+    if not state_path or not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding='utf-8') as f:
+        state = json.load(f)
+    return state if state.get('policy') == policy else None
+
+
+def _save_state(state_path, state):
+    if not state_path:
+        return
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+# 分批整理全部用户的版本历史
+# 进度写入 state_path，中断后以相同策略再次运行会从上次处理到的用户继续；
+# 截止时间以首次运行的时间为准，保证续跑与一次跑完的结果一致
+def run_compaction(session, policy, chunk_size, state_path=None, dry_run=False,
+                   log=print):
+    state = None if dry_run else _load_state(state_path, policy)
+    if state is None:
+        state = {
+            'policy': policy,
+            'started_at': datetime.now().isoformat(),
+            'last_user_id': 0,
+            'deleted_rows': 0,
+            'reclaimed_bytes': 0,
+        }
+    else:
+        log(f"从用户 id {state['last_user_id']} 之后继续上次的整理")
+    now = datetime.fromisoformat(state['started_at'])
+
+    while True:
+        user_ids = session.scalars(
+            select(User.id).where(User.id > state['last_user_id'])
+            .order_by(User.id).limit(USER_BATCH_SIZE)
+        ).all()
+        if not user_ids:
+            break
+        for user_id in _candidate_users(session, user_ids, policy, now):
+            deleted, reclaimed = compact_user(session, user_id, policy, now,
+                                              chunk_size, dry_run)
+            state['deleted_rows'] += deleted
+            state['reclaimed_bytes'] += reclaimed
+        session.rollback()
+        state['last_user_id'] = user_ids[-1]
+        if not dry_run:
+            _save_state(state_path, state)
+        log(f"  已检查到用户 id {state['last_user_id']}，"
+            f"累计删除 {state['deleted_rows']} 条版本记录")
+
+    if state_path and not dry_run and os.path.exists(state_path):
+        os.remove(state_path)
+    return {'deleted_rows': state['deleted_rows'],
+            'reclaimed_bytes': state['reclaimed_bytes']}
@@ -0,0 +1,184 @@
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+
+from models import User, UserSearchToken
+
+# 参与检索的字段及其排名权重（命中用户名的结果排在命中备注的前面）
+SEARCH_FIELD_WEIGHTS = {
+    'username': 8,
+    'phone': 4,
+    'email': 4,
+    'social_media': 2,
+    'address': 1,
+    'notes': 1,
+}
+# 每个字段最多索引的字符数，避免超长备注撑大索引表
+MAX_INDEXED_CHARS = 2000
+# 搜索关键词最大长度
+MAX_QUERY_CHARS = 50
+# 单字查询每次请求最多检查的候选用户数，超出后返回游标由下一次请求继续
+MAX_SCAN_USERS = 2000
+
+
+# 把文本切成单字和双字词元
+# 中文姓名没有空格分词，按字符切分后“张三丰”能被“张”“张三”“三丰”命中
+# （只有双字词元的旧索引重新运行 migrate_build_search_index.py 即可补上单字）
+def text_grams(text):
+    grams = set()
+    for segment in text.lower().split():
+        grams.update(segment)
+        grams.update(segment[i:i + 2] for i in range(len(segment) - 1))
+    return grams
+
+
+# 把搜索关键词切成查询词元：有双字词元时只用双字（倒排列表短），
+# 否则（如“张”“当 派”）使用单字
+def query_grams(text):
+    grams = text_grams(text[:MAX_QUERY_CHARS])
+    bigrams = {gram for gram in grams if len(gram) == 2}
+    return bigrams or grams
+
+
+# 生成某个用户需要写入索引表的行
+def build_token_rows(user_id, values):
+    rows = []
+    for field in SEARCH_FIELD_WEIGHTS:
+        value = values.get(field)
+        if not value:
+            continue
+        for token in text_grams(value[:MAX_INDEXED_CHARS]):
+            rows.append({'token': token, 'user_id': user_id, 'field': field})
+    return rows
+
+
+# 重建单个用户的索引（创建、编辑时调用，与业务写入在同一事务中）
+def index_user(session, user):
+    unindex_users(session, [user.id])
+    values = {field: getattr(user, field) for field in SEARCH_FIELD_WEIGHTS}
+    rows = build_token_rows(user.id, values)
+    if rows:
+        session.execute(insert(UserSearchToken), rows)
+
+
+# 只重建部分字段的索引（部分更新时调用）；values 为 {字段: 新值}，不参与检索的字段忽略
+def reindex_fields(session, user_id, values):
+    fields = [field for field in values if field in SEARCH_FIELD_WEIGHTS]
+    if not fields:
+        return
+    session.execute(delete(UserSearchToken).where(UserSearchToken.user_id == user_id,
+                                                  UserSearchToken.field.in_(fields)))
+    rows = build_token_rows(user_id, {field: values[field] for field in fields})
+    if rows:
+        session.execute(insert(UserSearchToken), rows)
+
+
+# 删除一批用户的索引（删除用户前调用）
+def unindex_users(session, user_ids):
+    session.execute(
+        delete(UserSearchToken).where(UserSearchToken.user_id.in_(user_ids)))
+
+
+# 检索命中全部词元的候选用户，按得分降序、id 降序返回 [(user_id, score), ...]
+# 全部词元须出现在同一个字段中，得分为这些字段的权重之和
+def _candidates(session, grams, limit, after):
+    field_hits = (
+        select(UserSearchToken.user_id, UserSearchToken.field)
+        .where(UserSearchToken.token.in_(grams))
+        .group_by(UserSearchToken.user_id, UserSearchToken.field)
+        .having(func.count(func.distinct(UserSearchToken.token)) == len(grams))
+        .subquery()
+    )
+    user_id = field_hits.c.user_id
+    score = func.sum(case(SEARCH_FIELD_WEIGHTS, value=field_hits.c.field, else_=1))
+    stmt = select(user_id, score.label('score')).group_by(user_id)
+    if after is not None:
+        last_score, last_id = after
+        stmt = stmt.having(or_(score < last_score,
+                               and_(score == last_score, user_id < last_id)))
+    stmt = stmt.order_by(score.desc(), user_id.desc()).limit(limit)
+    return [(row.user_id, int(row.score)) for row in session.execute(stmt)]
+
+
+# 按 id 降序取出任一字段含有单字 gram 的一批用户 id
+# （主键 (token, user_id, field) 上的范围扫描，不需要聚合整张倒排列表）
+def _recent_candidates(session, gram, limit, after_id):
+    stmt = (select(UserSearchToken.user_id).distinct()
+            .where(UserSearchToken.token == gram))
+    if after_id is not None:
+        stmt = stmt.where(UserSearchToken.user_id < after_id)
+    stmt = stmt.order_by(UserSearchToken.user_id.desc()).limit(limit)
+    return list(session.scalars(stmt))
+
+
+# 某个字段包含完整的关键词（与原先前端 includes() 过滤的语义一致）
+def _contains(row, keyword):
+    for field in SEARCH_FIELD_WEIGHTS:
+        value = getattr(row, field)
+        if value and keyword in value.lower():
+            return True
+    return False
+
+
+# 取出候选用户的行，只保留回表校验包含完整关键词的
+def _verified(session, columns, hits, keyword):
+    stmt = select(*columns).where(User.id.in_([user_id for user_id, _ in hits]))
+    rows = {row.id: row for row in session.execute(stmt)}
+    return [(rows[user_id], score) for user_id, score in hits
+            if user_id in rows and _contains(rows[user_id], keyword)]
+
+
+# 检索用户，返回 (results, next_after)：results 为 [(row, score), ...]，最多 limit 条；
+# next_after 为下一页的 after，没有更多结果时为 None
+# 含双字词元的查询按得分降序、id 降序排列，after 为 (score, user_id)；
+# 单字查询按 id 降序排列（得分固定为 0），每次最多检查 MAX_SCAN_USERS 个候选用户，
+# 因此可能返回不足 limit 条但仍有下一页
+# row 是 select(*columns) 的结果行，columns 须包含 User.id 和全部检索字段
+# 词元只是必要条件（“ab bc”也含有“abc”的全部双字），候选用户回表校验子串后才返回
+def find_users(session, text, columns, limit, after=None):
+    grams = query_grams(text)
+    if not grams:
+        return [], None
+
+    keyword = text.lower()
+    if any(len(gram) == 2 for gram in grams):
+        return _find_ranked(session, grams, keyword, columns, limit, after)
+    return _find_recent(session, min(grams), keyword, columns, limit,
+                        after[1] if after else None)
+
+
+def _find_ranked(session, grams, keyword, columns, limit, after):
+    # 多取一条判断是否还有下一页
+    results = []
+    while len(results) <= limit:
+        wanted = limit + 1 - len(results)
+        hits = _candidates(session, grams, wanted, after)
+        if not hits:
+            break
+        results.extend(_verified(session, columns, hits, keyword))
+        if len(hits) < wanted:
+            break
+        user_id, score = hits[-1]
+        after = (score, user_id)
+    if len(results) <= limit:
+        return results, None
+    row, score = results[limit - 1]
+    return results[:limit], (score, row.id)
+
+
+def _find_recent(session, gram, keyword, columns, limit, after_id):
+    results = []
+    scanned = 0
+    while scanned < MAX_SCAN_USERS:
+        wanted = min(limit + 1 - len(results), MAX_SCAN_USERS - scanned)
+        user_ids = _recent_candidates(session, gram, wanted, after_id)
+        if not user_ids:
+            return results, None
+        scanned += len(user_ids)
+        results.extend(_verified(session, columns,
+                                 [(user_id, 0) for user_id in user_ids], keyword))
+        if len(results) > limit:
+            return results[:limit], (0, results[limit - 1][0].id)
+        if len(user_ids) < wanted:
+            return results, None
+        after_id = user_ids[-1]
+    # 达到扫描上限：从最后检查的用户之后继续
+    return results, (0, after_id)
@@ -0,0 +1,62 @@
+from functools import lru_cache
+
+from models import User, UserVersion
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 列表接口直接查询所需的列，跳过 ORM 对象构建
+USER_COLUMNS = (
+    User.id, User.username, User.phone, User.email, User.address, User.social_media,
+    User.notes, User.is_favorite, User.operator, User.create_time, User.update_time,
+    User.row_version,
+)
+VERSION_COLUMNS = (
+    UserVersion.id, UserVersion.user_id, UserVersion.username, UserVersion.phone,
+    UserVersion.email, UserVersion.address, UserVersion.social_media, UserVersion.notes,
+    UserVersion.is_favorite, UserVersion.update_time, UserVersion.operator,
+)
+
+
+# 列表中的时间大量重复（批量导入、同一秒内的修改），格式化结果做缓存
+@lru_cache(maxsize=8192)
+def format_time(value):
+    return value.strftime(TIME_FORMAT)
+
+
+# 与 User.to_dict() 输出一致（按列顺序解包，比按属性名取值更快）
+def user_row_to_dict(row):
+    (user_id, username, phone, email, address, social_media,
+     notes, is_favorite, operator, create_time, update_time, row_version) = row
+    return {
+        'id': user_id,
+        'username': username,
+        'phone': phone,
+        'email': email,
+        'address': address,
+        'social_media': social_media,
+        'notes': notes,
+        'is_favorite': is_favorite,
+        'operator': operator,
+        'create_time': format_time(create_time),
+        'update_time': format_time(update_time) if update_time else None,
+        'row_version': row_version
+    }
+
+
+# 与 UserVersion.to_dict() 输出一致
+def version_row_to_dict(row):
+    (version_id, user_id, username, phone, email, address,
+     social_media, notes, is_favorite, update_time, operator) = row
+    return {
+        'id': version_id,
+        'user_id': user_id,
+        'username': username,
+        'phone': phone,
+        'email': email,
+        'address': address,
+        'social_media': social_media,
+        'notes': notes,
+        'is_favorite': is_favorite,
+        'update_time': format_time(update_time),
+        'operator': operator
+    }
@@ -0,0 +1,121 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, request
+from sqlalchemy import event
+
+# 调试模式下返回本次请求执行的 SQL 条数与累计耗时（毫秒）
+COUNT_HEADER = 'X-SQL-Count'
+TIME_HEADER = 'X-SQL-Time'
+# 日志中截取的 SQL 长度
+LOGGED_STATEMENT_CHARS = 200
+
+# 当前上下文中正在收集统计的对象（允许嵌套：请求内再用 count_statements 统计一段代码）
+_collectors = ContextVar('sql_stats_collectors', default=())
+
+
+# 一段代码执行的 SQL 统计
+class StatementStats:
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, elapsed, executemany):
+        self.count += 1
+        self.time += elapsed
+        # 批量 executemany 本身就是一次合并写入，不参与 N+1 检测
+        if not executemany:
+            self.statements[statement] += 1
+
+    # 同一条 SQL 重复执行达到 threshold 次，多半是在循环中逐条查询（N+1）
+    def repeated(self, threshold):
+        return [(statement, count) for statement, count in self.statements.most_common()
+                if count >= threshold]
+
+
+def _push(stats):
+    _collectors.set(_collectors.get() + (stats,))
+
+
+def _pop(stats):
+    _collectors.set(tuple(item for item in _collectors.get() if item is not stats))
+
+
+# 统计 with 块内执行的 SQL，供测试断言每个接口的语句数：
+#     with count_statements() as stats:
+#         client.delete('/api/user/delete/1')
+#     assert stats.count == 5
+@contextmanager
+def count_statements():
+    stats = StatementStats()
+    _push(stats)
+    try:
+        yield stats
+    finally:
+        _pop(stats)
+
+
+# 通过游标事件统计每条 SQL（在 exts 创建引擎时注册）
+def track_statements(engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        conn.info['statement_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context,
+                             executemany):
+        started = conn.info.pop('statement_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for stats in _collectors.get():
+            stats.record(statement, elapsed, executemany)
+
+
+# 当前请求的 SQL 统计（未开始统计时为 None）
+def request_sql_stats():
+    return g.get('sql_stats')
+
+
+# 注册请求钩子：统计每个请求的 SQL，调试模式下写入响应头；
+# 超出 SQL_STATEMENT_BUDGET（或 SQL_STATEMENT_BUDGETS 中该路由的预算）、
+# 或同一条 SQL 重复 SQL_REPEAT_THRESHOLD 次以上时记录警告日志；预算为 None 的路由不检查
+def init_sql_stats(app):
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = StatementStats()
+        _push(g.sql_stats)
+
+    @app.after_request
+    def add_sql_headers(response):
+        stats = request_sql_stats()
+        if stats is not None and current_app.debug:
+            response.headers[COUNT_HEADER] = str(stats.count)
+            response.headers[TIME_HEADER] = f'{stats.time * 1000:.3f}'
+        return response
+
+    @app.teardown_request
+    def finish_sql_stats(exception):
+        stats = request_sql_stats()
+        if stats is None:
+            return
+        _pop(stats)
+        config = current_app.config
+        endpoint = request.endpoint or 'unmatched'
+        budget = config['SQL_STATEMENT_BUDGETS'].get(endpoint,
+                                                     config['SQL_STATEMENT_BUDGET'])
+        if budget is None:
+            return
+        if stats.count > budget:
+            current_app.logger.warning(
+                '%s %s 执行了 %d 条 SQL（%.1f ms），超过预算 %d 条',
+                request.method, endpoint, stats.count, stats.time * 1000, budget)
+        for statement, count in stats.repeated(config['SQL_REPEAT_THRESHOLD']):
+            current_app.logger.warning(
+                '%s %s 中同一条 SQL 执行了 %d 次，可能存在 N+1 查询：%s',
+                request.method, endpoint, count,
+                ' '.join(statement.split())[:LOGGED_STATEMENT_CHARS])
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+
+from models import UserEvent
+
+# 推送给客户端的事件类型
+EVENT_TYPES = ('create', 'update', 'delete', 'favorite')
+
+
+# 把变更事件写入发件箱（与业务写入处于同一事务，由调用方提交）
+# 必须在 bump_data_version 之后调用：数据版本号行在提交前一直被锁住，
+# 事件 id 的分配顺序因此与提交顺序一致，推送端按 id 续读时不会跳过晚提交的小 id
+def publish_events(session, event, user_ids, operator):
+    if not user_ids:
+        return
+    now = datetime.now()
+    session.execute(insert(UserEvent).values([
+        {'event': event, 'user_id': user_id, 'operator': operator, 'create_time': now}
+        for user_id in user_ids
+    ]))
+
+
+# 当前最新的事件 id，新连接从这里开始只接收之后的事件
+def latest_event_id(session):
+    return session.scalar(select(func.max(UserEvent.id))) or 0
+
+
+# 按 id 顺序读取 after_id 之后的一批事件（主键范围扫描）
+def read_events(session, after_id, limit):
+    return session.execute(
+        select(UserEvent.id, UserEvent.event, UserEvent.user_id, UserEvent.operator,
+               UserEvent.create_time)
+        .where(UserEvent.id > after_id)
+        .order_by(UserEvent.id)
+        .limit(limit)
+    ).all()
+
+
+# 一条 SSE 消息；客户端断线重连时浏览器会把最后收到的 id 放在 Last-Event-ID 请求头中
+def sse_message(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_message(row):
+    return sse_message(row.event, {
+        'id': row.id,
+        'user_id': row.user_id,
+        'operator': row.operator,
+        'time': row.create_time.strftime('%Y-%m-%d %H:%M:%S')
+    }, row.id)
+
+
+# 两次查询之间的等待：异步部署（asgi.py）中让出事件循环，不阻塞同一进程内的其他请求
+def pause(seconds):
+    if current_app.config.get('SQLALCHEMY_ASYNC'):
+        from sqlalchemy.util import await_only
+        await_only(asyncio.sleep(seconds))
+    else:
+        time.sleep(seconds)
@@ -0,0 +1,118 @@
+from flask import current_app
+from sqlalchemy import func, select
+
+from models import UserVersion
+from serializers import VERSION_COLUMNS
+
+# 版本记录中随编辑变化的字段（operator / update_time 是每个版本自身的信息，始终保存）
+VERSION_FIELDS = ('username', 'phone', 'email', 'address', 'social_media', 'notes',
+                  'is_favorite')
+# 重建链条时额外需要的列
+CHAIN_COLUMNS = VERSION_COLUMNS + (UserVersion.is_snapshot, UserVersion.changed_fields)
+# VERSION_COLUMNS 中各字段的位置
+COLUMN_INDEX = {column.key: index for index, column in enumerate(VERSION_COLUMNS)}
+
+
+def parse_changed(changed_fields):
+    return set(changed_fields.split(',')) if changed_fields else set()
+
+
+# 是否按差量存储版本
+def delta_enabled():
+    return current_app.config['VERSION_STORAGE_MODE'] == 'delta'
+
+
+# 用户的第 ordinal 个版本是否需要保存完整快照（非差量模式下总是快照）
+def snapshot_due(ordinal):
+    interval = current_app.config['VERSION_SNAPSHOT_INTERVAL']
+    return not delta_enabled() or (ordinal - 1) % interval == 0
+
+
+# 新增一条版本记录
+# changed 为本次修改的字段集合，None 表示初始版本；ordinal 为该版本是用户的第几个版本
+# 差量模式下只保存变化的字段，每 VERSION_SNAPSHOT_INTERVAL 个版本保存一次完整快照
+# 差量版本只读取 values 中 changed 的字段与 username，部分更新时不需要传入其余字段
+def record_version(session, user_id, values, changed, operator, ordinal):
+    snapshot = changed is None or snapshot_due(ordinal)
+    if snapshot:
+        stored = {field: values[field] for field in VERSION_FIELDS}
+        changed_fields = None
+    else:
+        # username 为非空列，差量版本中也照常保存
+        stored = {field: (values[field] if field in changed else None)
+                  for field in VERSION_FIELDS}
+        stored['username'] = values['username']
+        changed_fields = ','.join(sorted(changed)) or None
+    version = UserVersion(user_id=user_id, operator=operator, is_snapshot=snapshot,
+                          changed_fields=changed_fields, **stored)
+    session.add(version)
+    return version
+
+
+# 按 id 升序重建一段版本链，返回与 VERSION_COLUMNS 顺序一致的完整行
+# 链条应以快照开头；若开头缺少快照（历史数据异常），以第一条记录为基准
+def rebuild_chain(rows):
+    state = None
+    rebuilt = []
+    for row in rows:
+        values = list(row[:len(VERSION_COLUMNS)])
+        if state is None or row.is_snapshot:
+            state = {field: values[COLUMN_INDEX[field]] for field in VERSION_FIELDS}
+        else:
+            for field in parse_changed(row.changed_fields) | {'username'}:
+                state[field] = values[COLUMN_INDEX[field]]
+            for field, value in state.items():
+                values[COLUMN_INDEX[field]] = value
+        rebuilt.append(tuple(values))
+    return rebuilt
+
+
+# 读取并重建某个用户 [from_id, to_id] 范围内的版本（自动向前找到最近的快照）
+def load_chain(session, user_id, from_id, to_id):
+    base_id = session.scalar(
+        select(func.max(UserVersion.id))
+        .where(UserVersion.user_id == user_id,
+               UserVersion.id <= from_id,
+               UserVersion.is_snapshot.is_(True))
+    )
+    stmt = (select(*CHAIN_COLUMNS)
+            .where(UserVersion.user_id == user_id,
+                   UserVersion.id >= (base_id if base_id is not None else 0),
+                   UserVersion.id <= to_id)
+            .order_by(UserVersion.id))
+    return {row[0]: row for row in rebuild_chain(session.execute(stmt).all())}
+
+
+# 把一页（任意顺序的）版本行转换为完整行，保持原有顺序
+# 整页都是快照时不产生额外查询
+def materialize(session, user_id, rows):
+    delta_ids = [row.id for row in rows if not row.is_snapshot]
+    if not delta_ids:
+        return [tuple(row[:len(VERSION_COLUMNS)]) for row in rows]
+    full = load_chain(session, user_id, min(delta_ids), max(delta_ids))
+    return [full.get(row.id, tuple(row[:len(VERSION_COLUMNS)])) for row in rows]
+
+
+# 删除一条版本记录，同时保证后续差量版本仍可重建：
+# 删除快照时把下一条差量版本补全为快照；删除差量时把它的修改合并进下一条差量版本
+def remove_version(session, version):
+    following = session.scalars(
+        select(UserVersion)
+        .where(UserVersion.user_id == version.user_id, UserVersion.id > version.id)
+        .order_by(UserVersion.id)
+        .limit(1)
+    ).first()
+    if following is not None and following.is_snapshot is False:
+        following_changed = parse_changed(following.changed_fields) | {'username'}
+        if version.is_snapshot is False:
+            carried = parse_changed(version.changed_fields)
+            for field in carried - following_changed:
+                setattr(following, field, getattr(version, field))
+            merged = carried | parse_changed(following.changed_fields)
+            following.changed_fields = ','.join(sorted(merged)) or None
+        else:
+            for field in set(VERSION_FIELDS) - following_changed:
+                setattr(following, field, getattr(version, field))
+            following.is_snapshot = True
+            following.changed_fields = None
+    session.delete(version)
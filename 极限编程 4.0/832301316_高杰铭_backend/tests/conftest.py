@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 数据库地址与监控目录需要在首次导入 config 之前通过环境变量指定（与 benchmarks 相同）
+WORK_DIR = tempfile.mkdtemp(prefix='address_book_test_')
+DATABASE_PATH = os.path.join(WORK_DIR, 'test.db')
+os.environ['ADDRESS_BOOK_DATABASE_URI'] = f'sqlite:///{DATABASE_PATH}'
+os.environ['ADDRESS_BOOK_METRICS_DIR'] = os.path.join(WORK_DIR, 'metrics')
+os.environ.pop('ADDRESS_BOOK_REPLICA_URIS', None)
+os.environ.pop('ADDRESS_BOOK_ASYNC', None)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app import app as flask_app  # noqa: E402
+from exts import db  # noqa: E402
+
+
+# 每个测试使用一个空数据库
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# 通过批量导入接口写入 count 个联系人，返回它们的 id（按创建顺序）
+@pytest.fixture
+def seed_users(client):
+    def seed(count, **fields):
+        rows = [dict({'username': f'user{index}', 'notes': f'note {index}'}, **fields)
+                for index in range(count)]
+        result = client.post('/api/user/bulk-create', json={'users': rows}).get_json()
+        assert result['code'] == 200
+        listed = client.get('/api/user/all?limit=100').get_json()['data']
+        return sorted(user['id'] for user in listed)
+    return seed
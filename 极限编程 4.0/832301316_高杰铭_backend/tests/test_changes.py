@@ -0,0 +1,133 @@
+import pytest
+
+from pagination import encode_cursor
+
+
+def read_changes(client, since=None, limit=None):
+    params = {'since': since, 'limit': limit}
+    result = client.get('/api/user/changes', query_string={
+        key: value for key, value in params.items() if value}).get_json()
+    assert result['code'] == 200
+    if limit:
+        assert len(result['data']) <= limit
+    return result
+
+
+# 模拟客户端：沿着游标读完全部变更并应用到本地副本，返回新的游标
+def sync(client, local, since=None, limit=None):
+    while True:
+        result = read_changes(client, since, limit)
+        for change in result['data']:
+            if change['type'] == 'delete':
+                assert 'data' not in change
+                local.pop(change['id'], None)
+            else:
+                local[change['id']] = change['data']
+        since = result['next_cursor']
+        if not result['has_more']:
+            return since
+
+
+def server_users(client):
+    users = client.get('/api/user/all').get_json()['data']
+    return {user['id']: user for user in users}
+
+
+# 新增、修改、收藏、删除（含批量删除）混合的一批写操作
+def make_changes(client, user_ids):
+    client.patch(f'/api/user/{user_ids[0]}', json={'notes': 'edited'})
+    client.post(f'/api/user/toggle-favorite/{user_ids[1]}', json={})
+    client.delete(f'/api/user/delete/{user_ids[2]}', json={})
+    client.post('/api/user/bulk', json={'action': 'delete', 'ids': user_ids[3:6]})
+    client.post('/api/user/create', json={'username': 'newcomer'})
+
+
+@pytest.mark.parametrize('limit', [None, 1, 2, 5])
+def test_incremental_sync_matches_server(client, seed_users, limit):
+    user_ids = seed_users(8)
+    local = {}
+    cursor = sync(client, local, limit=limit)
+    assert local == server_users(client)
+
+    make_changes(client, user_ids)
+    sync(client, local, cursor, limit)
+    assert local == server_users(client)
+
+
+# 删除的联系人以墓碑出现，只包含 id，同一次批量删除的墓碑共享一个 change_seq
+def test_delete_tombstones(client, seed_users):
+    user_ids = seed_users(5)
+    cursor = read_changes(client)['next_cursor']
+    client.delete(f'/api/user/delete/{user_ids[0]}', json={})
+    client.post('/api/user/bulk', json={'action': 'delete', 'ids': user_ids[2:4]})
+
+    changes = read_changes(client, cursor)['data']
+    assert [(change['type'], change['id']) for change in changes] == [
+        ('delete', user_ids[0]), ('delete', user_ids[2]), ('delete', user_ids[3])]
+    seqs = [change['change_seq'] for change in changes]
+    assert seqs[0] < seqs[1] == seqs[2]
+
+
+# 新增后又删除的联系人在增量中只剩下墓碑
+def test_created_then_deleted_leaves_only_tombstone(client, seed_users):
+    seed_users(2)
+    cursor = read_changes(client)['next_cursor']
+    user_id = client.post('/api/user/create',
+                          json={'username': 'ghost'}).get_json()['data']['id']
+    client.delete(f'/api/user/delete/{user_id}', json={})
+    changes = read_changes(client, cursor)['data']
+    assert [(change['type'], change['id']) for change in changes] == [
+        ('delete', user_id)]
+
+
+# latest=1 只返回当前位置，之后只收到新的变更
+def test_latest_cursor(client, seed_users):
+    user_ids = seed_users(4)
+    result = client.get('/api/user/changes?latest=1').get_json()
+    assert result['data'] == [] and result['has_more'] is False
+    assert read_changes(client, result['next_cursor'])['data'] == []
+
+    client.patch(f'/api/user/{user_ids[1]}', json={'phone': '123'})
+    changes = read_changes(client, result['next_cursor'])['data']
+    assert [(change['type'], change['id']) for change in changes] == [
+        ('upsert', user_ids[1])]
+    assert changes[0]['data']['phone'] == '123'
+
+
+# 没有新变更时游标不变
+def test_no_changes_keeps_cursor(client, seed_users):
+    seed_users(3)
+    cursor = read_changes(client)['next_cursor']
+    result = read_changes(client, cursor)
+    assert result['data'] == [] and result['next_cursor'] == cursor
+
+
+# 轮询时带上 ETag，没有新变更直接得到 304，有写入后重新返回数据
+def test_poll_with_etag(client, seed_users):
+    user_ids = seed_users(3)
+    cursor = read_changes(client)['next_cursor']
+    url = f'/api/user/changes?since={cursor}'
+    etag = client.get(url).headers['ETag']
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.headers['ETag'] == etag
+
+    client.delete(f'/api/user/delete/{user_ids[0]}', json={})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+    [change] = response.get_json()['data']
+    assert change['type'] == 'delete' and change['id'] == user_ids[0]
+
+
+@pytest.mark.parametrize('since', [
+    'not-base64!',
+    encode_cursor([1, 1]),
+    encode_cursor(['one', 1, 0]),
+])
+def test_invalid_since(client, since):
+    result = client.get(f'/api/user/changes?since={since}').get_json()
+    assert result['code'] == 400
+
+
+def test_invalid_limit(client):
+    assert client.get('/api/user/changes?limit=0').get_json()['code'] == 400
@@ -0,0 +1,180 @@
+import pytest
+from sqlalchemy import event, select
+
+from exts import db
+from models import UserVersion
+
+
+@pytest.fixture
+def user(client):
+    result = client.post('/api/user/create', json={
+        'username': 'alice', 'phone': '100', 'email': 'alice@example.com',
+        'notes': 'first'}).get_json()
+    assert result['code'] == 200 and result['data']['row_version'] == 1
+    return result['data']
+
+
+def edit(client, user_id, headers=None, **fields):
+    body = dict({'username': 'alice', 'phone': '100', 'email': 'alice@example.com',
+                 'notes': 'first'}, **fields)
+    return client.put(f'/api/user/edit/{user_id}', json=body, headers=headers)
+
+
+def test_edit_returns_next_row_version(client, user):
+    response = edit(client, user['id'], row_version=1, notes='second')
+    result = response.get_json()
+    assert result['code'] == 200 and result['data']['row_version'] == 2
+    assert response.headers['ETag'] == '"r2"'
+
+    # 响应中的 ETag 可以直接用于下一次 If-Match
+    response = edit(client, user['id'], headers={'If-Match': response.headers['ETag']},
+                    notes='third')
+    assert response.get_json()['code'] == 200
+    assert response.headers['ETag'] == '"r3"'
+
+
+# 请求体中的 row_version 过期：返回 409 与当前内容，不修改数据
+def test_stale_row_version_in_body(client, user):
+    edit(client, user['id'], notes='second')
+    response = edit(client, user['id'], row_version=1, notes='lost update')
+    result = response.get_json()
+    assert response.status_code == 409 and result['code'] == 409
+    assert result['data']['notes'] == 'second' and result['data']['row_version'] == 2
+    assert response.headers['ETag'] == '"r2"'
+    assert client.get(f"/api/user/{user['id']}").get_json()['data']['notes'] == 'second'
+
+
+def test_stale_if_match(client, user):
+    edit(client, user['id'], notes='second')
+    response = edit(client, user['id'], headers={'If-Match': '"r1"'}, notes='lost')
+    assert response.status_code == 409
+    assert response.get_json()['data']['notes'] == 'second'
+    versions = client.get(f"/api/user/versions/{user['id']}").get_json()
+    assert versions['total'] == 2
+
+
+# If-Match 优先于请求体中的 row_version
+def test_if_match_takes_precedence(client, user):
+    response = edit(client, user['id'], headers={'If-Match': '"r1"'}, row_version=7,
+                    notes='second')
+    assert response.status_code == 200
+
+
+# 不带行版本号时仍按原来的方式直接更新
+def test_edit_without_row_version(client, user):
+    edit(client, user['id'], notes='second')
+    response = edit(client, user['id'], notes='third')
+    assert response.get_json()['data']['row_version'] == 3
+
+
+@pytest.mark.parametrize('row_version', ['abc', True, [1]])
+def test_malformed_row_version(client, user, row_version):
+    result = edit(client, user['id'], row_version=row_version).get_json()
+    assert result == {'code': 400, 'message': '行版本号格式不正确！'}
+
+
+def patch(client, user_id, headers=None, **fields):
+    return client.patch(f'/api/user/{user_id}', json=fields, headers=headers)
+
+
+# 记录执行的 UPDATE user 语句
+@pytest.fixture
+def user_updates(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE user '):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+# 只更新请求中实际变化的字段，其余字段保持不变，并按变化的字段记录差量版本
+def test_patch_updates_only_changed_fields(app, client, user, user_updates):
+    response = patch(client, user['id'], phone='200', notes='first', row_version=1)
+    result = response.get_json()
+    assert result['code'] == 200 and response.headers['ETag'] == '"r2"'
+    assert result['data']['phone'] == '200'
+    assert result['data']['email'] == 'alice@example.com'
+    assert result['data']['notes'] == 'first'
+
+    # 第一条是 PATCH 本身的 UPDATE（其后是 bump_data_version 写 change_seq）
+    assigned = user_updates[0].split(' SET ')[1].split(' WHERE ')[0]
+    assert 'phone=' in assigned and 'notes' not in assigned and 'email' not in assigned
+
+    with app.app_context():
+        version = db.session.scalars(
+            select(UserVersion).order_by(UserVersion.id.desc())).first()
+        assert version.is_snapshot is False and version.changed_fields == 'phone'
+    versions = client.get(f"/api/user/versions/{user['id']}").get_json()
+    assert versions['total'] == 2
+    assert versions['data'][0]['phone'] == '200'
+    assert versions['data'][0]['notes'] == 'first'
+
+
+def search_names(client, keyword):
+    result = client.get(f'/api/user/search?q={keyword}').get_json()
+    return [found['username'] for found in result['data']]
+
+
+def test_patch_reindexes_changed_text(client, user):
+    patch(client, user['id'], notes='zebra')
+    assert search_names(client, 'zebra') == ['alice']
+    assert search_names(client, 'first') == []
+
+
+# 只修改收藏状态时不记录版本，但行版本号照常加一
+def test_patch_favorite_only_records_no_version(client, user):
+    result = patch(client, user['id'], is_favorite=True).get_json()
+    assert result['data']['is_favorite'] is True and result['data']['row_version'] == 2
+    assert client.get(f"/api/user/versions/{user['id']}").get_json()['total'] == 1
+
+
+def test_patch_without_changes_keeps_row_version(client, user, user_updates):
+    response = patch(client, user['id'], phone='100', notes=' first ')
+    assert response.get_json()['message'] == '用户「alice」没有变化'
+    assert response.headers['ETag'] == '"r1"' and user_updates == []
+
+
+def test_patch_stale_row_version(client, user):
+    patch(client, user['id'], notes='second')
+    response = patch(client, user['id'], row_version=1, notes='lost update')
+    assert response.status_code == 409
+    assert response.get_json()['data']['notes'] == 'second'
+    response = patch(client, user['id'], headers={'If-Match': '"r1"'}, phone='300')
+    assert response.status_code == 409
+    assert response.get_json()['data']['phone'] == '100'
+
+
+@pytest.mark.parametrize('body, message', [
+    ({}, '没有需要更新的字段！'),
+    ({'operator': 'bob'}, '没有需要更新的字段！'),
+    ({'username': '  '}, '用户名不能为空！'),
+    ({'phone': 100}, '字段 phone 必须是字符串！'),
+    ({'is_favorite': 'false'}, '字段 is_favorite 必须是布尔值！'),
+    ({'notes': 'x', 'row_version': 'abc'}, '行版本号格式不正确！'),
+])
+def test_patch_validation(client, user, body, message):
+    result = client.patch(f"/api/user/{user['id']}", json=body).get_json()
+    assert result == {'code': 400, 'message': message}
+
+
+def test_patch_rejects_non_object_body(client, user):
+    result = client.patch(f"/api/user/{user['id']}", json=['phone']).get_json()
+    assert result == {'code': 400, 'message': '请求内容格式不正确！'}
+
+
+def test_patch_duplicate_username(client, user):
+    client.post('/api/user/create', json={'username': 'bob'})
+    result = patch(client, user['id'], username='bob').get_json()
+    assert result['code'] == 400
+    current = client.get(f"/api/user/{user['id']}").get_json()['data']
+    assert current['username'] == 'alice'
+
+
+def test_patch_unknown_user(client):
+    assert patch(client, 999, notes='x').status_code == 404
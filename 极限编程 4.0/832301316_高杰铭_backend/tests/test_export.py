@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+import exporter
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def test_csv_content_type(client, seed_users):
+    seed_users(3)
+    response = client.get('/api/user/export?format=csv')
+    assert response.headers['Content-Type'] == 'text/csv; charset=utf-8'
+    lines = response.get_data(as_text=True).lstrip('﻿').splitlines()
+    assert len(lines) == 4
+
+
+# 以“=”开头的文本按字符串写入，网址不变成超链接
+@pytest.mark.parametrize('writer', ['xlsxwriter', 'openpyxl'])
+def test_xlsx_writes_user_text_as_strings(tmp_path, writer):
+    pytest.importorskip(writer)
+    path = tmp_path / 'contacts.xlsx'
+    row = [1, '=HYPERLINK("http://evil")', '', 'https://example.com', '', '', '',
+           '否', '', '']
+    getattr(exporter, f'_write_xlsx_{writer}')(str(path), [row])
+
+    worksheet = openpyxl.load_workbook(path).worksheets[0]
+    cell = worksheet.cell(row=2, column=2)
+    assert cell.data_type == 's'
+    assert cell.value == '=HYPERLINK("http://evil")'
+    assert worksheet.cell(row=2, column=4).hyperlink is None
+
+
+# 超出单个工作表的行数上限时续写到新的工作表，每个工作表都有表头
+@pytest.mark.parametrize('writer', ['xlsxwriter', 'openpyxl'])
+def test_xlsx_splits_rows_across_sheets(tmp_path, monkeypatch, writer):
+    pytest.importorskip(writer)
+    monkeypatch.setattr(exporter, 'XLSX_MAX_ROWS', 4)
+    path = tmp_path / 'contacts.xlsx'
+    rows = [[index, f'user{index}'] for index in range(1, 8)]
+    getattr(exporter, f'_write_xlsx_{writer}')(str(path), rows)
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ['联系人列表', '联系人列表 2', '联系人列表 3']
+    values = [[row[0] for row in sheet.iter_rows(values_only=True)]
+              for sheet in workbook.worksheets]
+    assert values == [['ID', 1, 2, 3], ['ID', 4, 5, 6], ['ID', 7]]
+
+
+def test_xlsx_export_endpoint(client, seed_users):
+    seed_users(3, notes='=1+1')
+    response = client.get('/api/user/export?format=xlsx')
+    assert response.status_code == 200
+    worksheet = openpyxl.load_workbook(io.BytesIO(response.data)).worksheets[0]
+    assert worksheet.max_row == 4
+    assert worksheet.cell(row=2, column=7).value == '=1+1'
@@ -0,0 +1,98 @@
+import pytest
+
+from pagination import encode_cursor
+
+
+def list_page(client, limit, cursor=None):
+    url = f'/api/user/all?limit={limit}'
+    if cursor:
+        url += f'&cursor={cursor}'
+    result = client.get(url).get_json()
+    assert result['code'] == 200
+    return result
+
+
+# 沿着游标取完全部页，返回 id 列表
+def list_all_ids(client, limit):
+    ids = []
+    cursor = None
+    while True:
+        result = list_page(client, limit, cursor)
+        ids += [user['id'] for user in result['data']]
+        if not result['has_more']:
+            assert result['next_cursor'] is None
+            return ids
+        cursor = result['next_cursor']
+
+
+# 批量导入的联系人创建时间相同，靠 id 区分先后，翻页时不重复也不遗漏
+@pytest.mark.parametrize('limit', [1, 3, 7, 20])
+def test_pages_cover_every_user_once_with_tied_create_time(client, seed_users, limit):
+    user_ids = seed_users(20)
+    assert list_all_ids(client, limit) == sorted(user_ids, reverse=True)
+
+
+# 收藏的排在前面，跨越收藏与未收藏分界的页也按同样的顺序继续
+def test_favorites_first_across_page_boundary(client, seed_users):
+    user_ids = seed_users(6)
+    favorites = [user_ids[1], user_ids[4]]
+    for user_id in favorites:
+        client.post(f'/api/user/toggle-favorite/{user_id}', json={})
+    others = [user_id for user_id in user_ids if user_id not in favorites]
+    expected = sorted(favorites, reverse=True) + sorted(others, reverse=True)
+    assert list_all_ids(client, 1) == expected
+    assert list_all_ids(client, 3) == expected
+
+
+# 最后一页恰好取满时不返回游标
+def test_exact_last_page_has_no_cursor(client, seed_users):
+    seed_users(4)
+    first = list_page(client, 2)
+    second = list_page(client, 2, first['next_cursor'])
+    assert len(second['data']) == 2
+    assert second['has_more'] is False and second['next_cursor'] is None
+
+
+# 翻页期间删除了游标所在的联系人，下一页仍从它之后继续
+def test_cursor_survives_deleting_its_row(client, seed_users):
+    user_ids = sorted(seed_users(5), reverse=True)
+    first = list_page(client, 2)
+    client.delete(f'/api/user/delete/{user_ids[1]}', json={})
+    second = list_page(client, 2, first['next_cursor'])
+    assert [user['id'] for user in second['data']] == user_ids[2:4]
+
+
+def test_empty_list(client):
+    result = list_page(client, 5)
+    assert result['data'] == [] and result['has_more'] is False
+
+
+def test_without_limit_returns_everything(client, seed_users):
+    seed_users(25)
+    result = client.get('/api/user/all').get_json()
+    assert len(result['data']) == 25 and 'next_cursor' not in result
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!',
+    encode_cursor([1, '2024-01-01 00:00:00.000000']),
+    encode_cursor([1, 'yesterday', 3]),
+    encode_cursor({'id': 3}),
+])
+def test_invalid_cursor(client, seed_users, cursor):
+    seed_users(2)
+    result = client.get(f'/api/user/all?limit=1&cursor={cursor}').get_json()
+    assert result == {'code': 400, 'message': '无效的分页游标！'}
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', 'abc'])
+def test_invalid_limit(client, limit):
+    result = client.get(f'/api/user/all?limit={limit}').get_json()
+    assert result['code'] == 400
+
+
+def test_limit_is_capped(client, app, seed_users):
+    seed_users(app.config['USER_PAGE_SIZE_MAX'] + 1)
+    result = list_page(client, 10_000)
+    assert len(result['data']) == app.config['USER_PAGE_SIZE_MAX']
+    assert result['has_more'] is True
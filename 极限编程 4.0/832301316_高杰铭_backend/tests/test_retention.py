@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+import retention
+from exts import db
+from models import User, UserVersion
+from retention import run_compaction
+
+
+def quiet(message):
+    pass
+
+
+# 创建联系人并交替修改电话和备注 edits 次，返回用户 id
+def create_history(client, username, edits):
+    result = client.post('/api/user/create', json={
+        'username': username, 'phone': '100', 'email': f'{username}@example.com',
+        'notes': 'first'}).get_json()
+    user_id = result['data']['id']
+    for index in range(edits):
+        change = {'notes': f'note {index}'} if index % 2 else {'phone': f'1{index}'}
+        client.patch(f'/api/user/{user_id}', json=change)
+    return user_id
+
+
+def list_versions(client, user_id):
+    result = client.get(f'/api/user/versions/{user_id}').get_json()
+    return result['data'], result['total']
+
+
+@pytest.fixture
+def histories(client):
+    return [create_history(client, name, 14) for name in ('alice', 'bob', 'carol')]
+
+
+# 把某个用户最早的 count 个版本改为 days 天前
+def age_versions(user_id, count, days):
+    oldest = (select(UserVersion.id).where(UserVersion.user_id == user_id)
+              .order_by(UserVersion.id).limit(count))
+    db.session.execute(update(UserVersion)
+                       .where(UserVersion.id.in_(oldest.scalar_subquery()))
+                       .values(update_time=datetime.now() - timedelta(days=days)))
+    db.session.commit()
+
+
+def policy(keep_last=None, max_age_days=None):
+    return {'keep_last': keep_last, 'max_age_days': max_age_days,
+            'thin_after_days': None}
+
+
+# 保留最新的 keep_last 个版本，剩余版本（缺口后的差量被补全为快照）内容不变
+def test_keep_last(app, client, histories):
+    before = {user_id: list_versions(client, user_id)[0] for user_id in histories}
+    with app.app_context():
+        summary = run_compaction(db.session, policy(keep_last=4), chunk_size=3,
+                                 log=quiet)
+        assert summary['deleted_rows'] == 3 * 11
+        assert summary['reclaimed_bytes'] > 0
+    for user_id in histories:
+        versions, total = list_versions(client, user_id)
+        assert versions == before[user_id][:4] and total == 4
+    with app.app_context():
+        assert set(db.session.scalars(select(User.version_count))) == {4}
+
+
+# 早于 max_age_days 的版本被删除，最新版本即使过期也保留
+def test_max_age(app, client, histories):
+    alice, bob, carol = histories
+    with app.app_context():
+        age_versions(alice, 6, days=40)
+        age_versions(bob, 15, days=40)
+    before = {user_id: list_versions(client, user_id)[0] for user_id in histories}
+    with app.app_context():
+        summary = run_compaction(db.session, policy(max_age_days=30), chunk_size=500,
+                                 log=quiet)
+    assert summary['deleted_rows'] == 6 + 14
+    assert list_versions(client, alice) == (before[alice][:9], 9)
+    assert list_versions(client, bob) == (before[bob][:1], 1)
+    assert list_versions(client, carol) == (before[carol], 15)
+
+
+def test_dry_run_deletes_nothing(app, client, histories, tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    with app.app_context():
+        summary = run_compaction(db.session, policy(keep_last=4), chunk_size=500,
+                                 state_path=state_path, dry_run=True, log=quiet)
+        assert summary['deleted_rows'] == 3 * 11
+        assert db.session.scalar(select(func.count()).select_from(UserVersion)) == 45
+        assert set(db.session.scalars(select(User.version_count))) == {15}
+    assert not (tmp_path / 'state.json').exists()
+
+
+# 中断后以相同策略再次运行，从状态文件记录的用户之后继续，结果与一次跑完相同
+def test_resume_from_state_file(app, client, histories, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, 'USER_BATCH_SIZE', 1)
+    state_path = str(tmp_path / 'state.json')
+    before = {user_id: list_versions(client, user_id)[0] for user_id in histories}
+
+    def interrupt(message):
+        raise KeyboardInterrupt
+
+    with app.app_context():
+        with pytest.raises(KeyboardInterrupt):
+            run_compaction(db.session, policy(keep_last=4), chunk_size=500,
+                           state_path=state_path, log=interrupt)
+        # 第一个用户已整理，其余用户尚未处理
+        assert list_versions(client, histories[0])[1] == 4
+        assert list_versions(client, histories[1])[1] == 15
+
+        messages = []
+        summary = run_compaction(db.session, policy(keep_last=4), chunk_size=500,
+                                 state_path=state_path, log=messages.append)
+    assert summary['deleted_rows'] == 3 * 11
+    assert messages[0] == f'从用户 id {histories[0]} 之后继续上次的整理'
+    assert not (tmp_path / 'state.json').exists()
+    for user_id in histories:
+        assert list_versions(client, user_id) == (before[user_id][:4], 4)
+
+
+# 策略改变后不沿用旧的进度
+def test_state_file_for_other_policy_is_ignored(app, client, histories, tmp_path):
+    state_path = tmp_path / 'state.json'
+    state_path.write_text('{"policy": {"keep_last": 1}, "last_user_id": 999}',
+                          encoding='utf-8')
+    with app.app_context():
+        summary = run_compaction(db.session, policy(keep_last=4), chunk_size=500,
+                                 state_path=str(state_path), log=quiet)
+    assert summary['deleted_rows'] == 3 * 11
@@ -0,0 +1,71 @@
+import search_index
+
+
+def create_users(client, rows):
+    result = client.post('/api/user/bulk-create', json={'users': rows}).get_json()
+    assert result['code'] == 200
+
+
+def search(client, keyword, limit=20, cursor=None):
+    url = f'/api/user/search?q={keyword}&limit={limit}'
+    if cursor:
+        url += f'&cursor={cursor}'
+    result = client.get(url).get_json()
+    assert result['code'] == 200
+    return result
+
+
+# 沿着游标取完全部结果，返回用户名列表
+def search_all(client, keyword, limit):
+    names = []
+    cursor = None
+    while True:
+        result = search(client, keyword, limit, cursor)
+        names += [user['username'] for user in result['data']]
+        if not result['has_more']:
+            return names
+        cursor = result['next_cursor']
+
+
+def test_single_character_surname(client):
+    create_users(client, [{'username': '张三'}, {'username': '李四'},
+                          {'username': '王五', 'notes': '张经理介绍'}])
+    result = search(client, '张')
+    assert sorted(user['username'] for user in result['data']) == ['张三', '王五']
+    assert not result['has_more']
+
+
+def test_space_separated_single_characters(client):
+    create_users(client, [{'username': 'a', 'notes': '选 当 派 代表'},
+                          {'username': 'b', 'notes': '当派'},
+                          {'username': 'c', 'notes': '派 当'}])
+    assert [user['username'] for user in search(client, '当 派')['data']] == ['a']
+
+
+# 词元分散在不同字段中不算命中
+def test_grams_must_match_within_one_field(client):
+    create_users(client, [{'username': 'ab', 'notes': 'xx bc'},
+                          {'username': 'abc1'}])
+    assert [user['username'] for user in search(client, 'abc')['data']] == ['abc1']
+
+
+def test_ranked_results_page_through_cursor(client):
+    create_users(client,
+                 [{'username': f'lin{index}'} for index in range(7)]
+                 + [{'username': f'other{index}', 'notes': 'lin'}
+                    for index in range(3)])
+    names = search_all(client, 'lin', limit=3)
+    assert len(names) == len(set(names)) == 10
+    # 命中用户名的结果排在只命中备注的前面
+    assert all(name.startswith('lin') for name in names[:7])
+
+
+# 单字查询达到扫描上限时返回不足一页的结果和游标，继续请求能取到全部结果
+def test_single_character_scan_limit(client, monkeypatch):
+    monkeypatch.setattr(search_index, 'MAX_SCAN_USERS', 3)
+    create_users(client, [{'username': f"{'张' if index % 4 == 0 else '李'}{index}"}
+                          for index in range(20)])
+    first = search(client, '张', limit=10)
+    assert first['has_more'] and len(first['data']) < 10
+    names = search_all(client, '张', limit=10)
+    assert sorted(names) == sorted(f'张{index}' for index in range(0, 20, 4))
@@ -0,0 +1,61 @@
+import pytest
+
+from sql_stats import count_statements
+
+# 各接口每个请求执行的 SQL 条数，与数据量（联系人数、版本数）无关；
+# 条数增加说明引入了额外查询或 N+1，确认无误后再更新这里的数字
+ALL_STATEMENTS = 2  # 数据版本号（ETag）+ 列表
+SEARCH_STATEMENTS = 2  # 候选用户 + 回表校验子串
+VERSIONS_STATEMENTS = 5  # 数据版本号 + 用户 + 版本页 + 差量链的起点快照 id + 差量链
+DELETE_STATEMENTS = 7  # 版本记录用一条 DELETE 删除，不逐条加载
+
+
+def statement_count(client, method, url):
+    with count_statements() as stats:
+        response = client.open(url, method=method)
+    assert response.status_code == 200
+    assert response.get_json()['code'] == 200
+    return stats.count
+
+
+# 给联系人追加 count 个版本（每次修改备注都会记录一个版本）
+def add_versions(client, user_id, count):
+    for index in range(count):
+        response = client.patch(f'/api/user/{user_id}', json={'notes': f'edit {index}'})
+        assert response.get_json()['code'] == 200
+
+
+@pytest.mark.parametrize('users', [5, 60])
+def test_all_statement_count(client, seed_users, users):
+    seed_users(users)
+    assert statement_count(client, 'GET', '/api/user/all?limit=20') == ALL_STATEMENTS
+
+
+def test_all_next_page_statement_count(client, seed_users):
+    seed_users(60)
+    cursor = client.get('/api/user/all?limit=20').get_json()['next_cursor']
+    url = f'/api/user/all?limit=20&cursor={cursor}'
+    assert statement_count(client, 'GET', url) == ALL_STATEMENTS
+
+
+@pytest.mark.parametrize('users', [5, 60])
+def test_search_statement_count(client, seed_users, users):
+    seed_users(users)
+    url = '/api/user/search?q=user&limit=20'
+    assert statement_count(client, 'GET', url) == SEARCH_STATEMENTS
+
+
+@pytest.mark.parametrize('versions', [1, 15])
+def test_versions_statement_count(client, seed_users, versions):
+    user_id = seed_users(1)[0]
+    add_versions(client, user_id, versions)
+    url = f'/api/user/versions/{user_id}?limit=50'
+    assert statement_count(client, 'GET', url) == VERSIONS_STATEMENTS
+
+
+@pytest.mark.parametrize('versions', [0, 15])
+def test_delete_statement_count(client, seed_users, versions):
+    user_id = seed_users(1)[0]
+    add_versions(client, user_id, versions)
+    url = f'/api/user/delete/{user_id}'
+    assert statement_count(client, 'DELETE', url) == DELETE_STATEMENTS
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from exts import db
+from models import UserVersion
+from pagination import encode_cursor
+
+CONTENT_FIELDS = ('username', 'phone', 'email', 'address', 'social_media', 'notes',
+                  'is_favorite')
+
+
+# 创建一个联系人并做 edits 次部分更新（交替修改备注和电话），
+# 返回用户 id 与每个版本应有的内容（按版本先后）
+def create_history(client, edits):
+    result = client.post('/api/user/create', json={
+        'username': 'alice', 'phone': '100', 'email': 'a@example.com',
+        'notes': 'first'}).get_json()
+    user = result['data']
+    states = [{field: user[field] for field in CONTENT_FIELDS}]
+    for index in range(edits):
+        if index % 3 == 2:
+            change = {'phone': f'1{index}'}
+        else:
+            change = {'notes': f'note {index}'}
+        result = client.patch(f"/api/user/{user['id']}", json=change).get_json()
+        assert result['code'] == 200
+        states.append(dict(states[-1], **change))
+    return user['id'], states
+
+
+def version_contents(versions):
+    return [{field: version[field] for field in CONTENT_FIELDS} for version in versions]
+
+
+def list_versions(client, user_id):
+    result = client.get(f'/api/user/versions/{user_id}').get_json()
+    assert result['code'] == 200
+    return result['data']
+
+
+# 沿着游标取完全部版本
+def page_versions(client, user_id, limit):
+    versions = []
+    cursor = None
+    while True:
+        url = f'/api/user/versions/{user_id}?limit={limit}'
+        if cursor:
+            url += f'&cursor={cursor}'
+        result = client.get(url).get_json()
+        assert result['code'] == 200
+        assert len(result['data']) <= limit
+        versions += result['data']
+        if not result['has_more']:
+            assert result['next_cursor'] is None
+            return versions, result['total']
+        cursor = result['next_cursor']
+
+
+@pytest.fixture
+def user_id_and_states(client):
+    return create_history(client, 14)
+
+
+def test_full_history_is_materialized(client, user_id_and_states):
+    user_id, states = user_id_and_states
+    versions = list_versions(client, user_id)
+    assert version_contents(versions) == states[::-1]
+
+
+# 各页（包括只含差量版本的页）都重建为完整内容，并与不分页的结果一致
+@pytest.mark.parametrize('limit', [1, 4, 6, 15])
+def test_pages_match_full_history(client, user_id_and_states, limit):
+    user_id, states = user_id_and_states
+    versions, total = page_versions(client, user_id, limit)
+    assert versions == list_versions(client, user_id)
+    assert total == len(states)
+
+
+# 多个版本的更新时间相同时按 id 排序，翻页时不重复也不遗漏
+def test_tied_update_time_pages_by_id(app, client, user_id_and_states):
+    user_id, states = user_id_and_states
+    with app.app_context():
+        db.session.execute(update(UserVersion).values(
+            update_time=datetime(2024, 1, 1, 12, 0, 0)))
+        db.session.commit()
+    versions, _ = page_versions(client, user_id, 4)
+    ids = [version['id'] for version in versions]
+    assert ids == sorted(ids, reverse=True) and len(ids) == len(states)
+    assert version_contents(versions) == states[::-1]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!',
+    encode_cursor(['yesterday', 3]),
+    encode_cursor(['2024-01-01 00:00:00.000000']),
+])
+def test_invalid_cursor(client, user_id_and_states, cursor):
+    user_id, _ = user_id_and_states
+    result = client.get(f'/api/user/versions/{user_id}?cursor={cursor}').get_json()
+    assert result == {'code': 400, 'message': '无效的分页游标！'}
+
+
+def test_unknown_user(client):
+    assert client.get('/api/user/versions/999?limit=5').status_code == 404
+
+
+# 删除版本后，其余版本仍能重建出删除前的内容
+# 14 次编辑共 15 个版本：第 1、11 个是快照，其余是差量（快照间隔为 10）
+@pytest.mark.parametrize('deleted', [
+    [0],            # 第一个快照
+    [10],           # 中间的快照
+    [4],            # 差量
+    [14],           # 最新的差量
+    [9, 10, 11],    # 跨越快照的连续版本
+    [3, 4, 5, 0],   # 连续的差量，再删除它们前面的快照
+])
+def test_delete_version_keeps_other_versions(client, user_id_and_states, deleted):
+    user_id, states = user_id_and_states
+    before = list_versions(client, user_id)[::-1]
+    for index in deleted:
+        result = client.delete(f"/api/user/versions/delete/{before[index]['id']}")
+        assert result.get_json()['code'] == 200
+
+    expected = [version for index, version in enumerate(before) if index not in deleted]
+    after = list_versions(client, user_id)[::-1]
+    assert after == expected
+    # 分页读取（从差量版本开始的页）同样得到完整内容，total 随删除减少
+    paged, total = page_versions(client, user_id, 3)
+    assert paged == after[::-1] and total == len(expected)
+
+
+# 删除快照后，下一个差量版本被补全为快照
+def test_delete_snapshot_promotes_next_delta(app, client, user_id_and_states):
+    user_id, _ = user_id_and_states
+    versions = list_versions(client, user_id)[::-1]
+    client.delete(f"/api/user/versions/delete/{versions[10]['id']}")
+    with app.app_context():
+        promoted = db.session.get(UserVersion, versions[11]['id'])
+        assert promoted.is_snapshot is True and promoted.changed_fields is None
+        assert promoted.email == 'a@example.com'
@@ -0,0 +1,298 @@
+/*
+ * 用户列表渲染基准测试 - 对比 user-list.js 的两种渲染方式（无浏览器，使用 jsdom）
+ * 1. 旧实现：每次整表重建 <tbody> 的 innerHTML，切换收藏后整体排序再重建，搜索框每个按键都搜索并重绘
+ * 2. 新实现：虚拟滚动只创建可视区域内的行，按用户ID复用行并二分插入变化的用户，搜索防抖
+ * 页面脚本在 jsdom 中按原样加载，fetch 由脚本模拟返回生成的联系人数据，不访问后端
+ * jsdom 不做布局，统计的是 DOM 构建与脚本耗时（浏览器中还要加上样式计算与布局，旧实现的差距只会更大）
+ *
+ * 使用方法:
+ * 1. 在frontend目录下安装 jsdom（只用于基准测试）: npm install --no-save jsdom
+ * 2. 运行: node benchmarks/bench_render.js [用户数] [重复次数]
+ *    例如: node benchmarks/bench_render.js 50000 5
+ */
+
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+
+let JSDOM;
+try {
+    ({ JSDOM } = require('jsdom'));
+} catch (error) {
+    console.error('未安装 jsdom，请先在frontend目录下运行: npm install --no-save jsdom');
+    process.exit(1);
+}
+
+const SRC_DIR = path.join(__dirname, '..', 'src');
+const USER_COUNT = parseInt(process.argv[2], 10) || 50000;
+const RUNS = parseInt(process.argv[3], 10) || 5;
+const SEARCH_TEXT = '张伟 138'; // 模拟逐字输入的搜索词
+const KEY_INTERVAL = 60; // 模拟输入时两次按键的间隔（毫秒），快于搜索防抖时间
+const SEARCH_RESULTS = 100; // 模拟搜索接口每次返回的条数
+const SCROLL_STEPS = 200; // 滚动测试的次数
+
+// 生成与后端接口格式一致的联系人（按收藏、创建时间、ID 倒序，与 /api/user/all 相同）
+function generateUsers(count) {
+    const surnames = ['张', '王', '李', '赵', '刘', '陈', '杨', '黄', '周', '吴'];
+    const given = ['伟', '芳', '娜', '敏', '静', '磊', '洋', '艳', '勇', '军', '杰', '涛'];
+    const start = Date.UTC(2024, 0, 1);
+    const users = [];
+    for (let i = 1; i <= count; i++) {
+        const time = new Date(start + i * 60000).toISOString().replace('T', ' ').slice(0, 19);
+        users.push({
+            id: i,
+            username: `${surnames[i % surnames.length]}${given[(i * 7) % given.length]}${i}`,
+            phone: `138${String(i).padStart(8, '0')}`,
+            email: i % 3 === 0 ? null : `user${i}@example.com`,
+            address: i % 4 === 0 ? `北京市朝阳区建国路${i % 200}号` : null,
+            social_media: i % 5 === 0 ? `wx_${i}` : null,
+            notes: i % 6 === 0 ? '客户，每月联系一次' : null,
+            is_favorite: i % 20 === 0,
+            operator: 'system',
+            create_time: time,
+            update_time: time,
+            row_version: 1
+        });
+    }
+    return users.sort((a, b) => {
+        if (a.is_favorite !== b.is_favorite) {
+            return a.is_favorite ? -1 : 1;
+        }
+        return a.create_time < b.create_time ? 1 : (a.create_time > b.create_time ? -1 : b.id - a.id);
+    });
+}
+
+function jsonResponse(body) {
+    return Promise.resolve({
+        ok: true,
+        status: 200,
+        headers: { get: () => null },
+        json: () => Promise.resolve(body)
+    });
+}
+
+// 在 jsdom 中加载 user-list.html 与页面脚本，fetch 返回生成的数据并记录请求
+async function loadPage(users) {
+    const html = fs.readFileSync(path.join(SRC_DIR, 'user-list.html'), 'utf-8')
+        .replace(/<script[^>]*src=[^>]*><\/script>/g, '');
+    const dom = new JSDOM(html, { runScripts: 'outside-only', pretendToBeVisual: true, url: 'http://localhost/' });
+    const { window } = dom;
+    const requests = [];
+    window.fetch = (url) => {
+        requests.push(url);
+        if (url.includes('/user/changes')) {
+            return jsonResponse({ code: 200, data: [], next_cursor: 'start', has_more: false });
+        }
+        if (url.includes('/user/search')) {
+            return jsonResponse({ code: 200, data: users.slice(0, SEARCH_RESULTS), has_more: false });
+        }
+        return jsonResponse({ code: 200, data: users });
+    };
+    window.eval(fs.readFileSync(path.join(SRC_DIR, 'js', 'api.js'), 'utf-8'));
+    window.eval(fs.readFileSync(path.join(SRC_DIR, 'js', 'user-list.js'), 'utf-8'));
+    await waitFor(() => window.eval('allUsers').length === users.length);
+    return { window, requests };
+}
+
+function waitFor(condition) {
+    return new Promise((resolve) => {
+        const check = () => (condition() ? resolve() : setTimeout(check, 10));
+        check();
+    });
+}
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function median(values) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.floor(sorted.length / 2)];
+}
+
+function timeIt(fn) {
+    const started = performance.now();
+    fn();
+    return performance.now() - started;
+}
+
+// 旧实现（改动前的 displayUsers / applyUserChanges），作为对照
+function legacyDisplayUsers(document, users) {
+    const tableBody = document.getElementById('user-table-body');
+    tableBody.innerHTML = users.map((user, index) => {
+        const details = [];
+        if (user.address) details.push(`地址: ${user.address}`);
+        if (user.social_media) details.push(`社交媒体: ${user.social_media}`);
+        if (user.notes) details.push(`备注: ${user.notes}`);
+        const detailsHtml = details.length > 0 ? `<br><small class="text-muted">${details.join(' | ')}</small>` : '';
+
+        return `
+            <tr class="user-row">
+                <td>
+                    <input type="checkbox" class="form-check-input"
+                           onchange="toggleSelection(${user.id}, this.checked)">
+                </td>
+                <td>${index + 1}</td>
+                <td>
+                    <span class="star-icon ${user.is_favorite ? 'favorited' : ''}"
+                          onclick="toggleFavorite(${user.id}, event)"
+                          title="${user.is_favorite ? '取消收藏' : '收藏'}">
+                        ${user.is_favorite ? '★' : '☆'}
+                    </span>
+                </td>
+                <td>
+                    <strong>${user.username}</strong>
+                    ${detailsHtml}
+                </td>
+                <td>${user.phone || '未填写'}</td>
+                <td>${user.email || '未填写'}</td>
+                <td>${user.create_time.split(' ')[0]}</td>
+                <td>${user.update_time}</td>
+                <td class="action-buttons">
+                    <a href="user-detail.html?id=${user.id}&display_id=${index + 1}" class="btn btn-sm btn-info">详情</a>
+                    <a href="user-edit.html?id=${user.id}" class="btn btn-sm btn-warning">编辑</a>
+                    <a href="user-versions.html?id=${user.id}" class="btn btn-sm btn-secondary">版本</a>
+                    <button class="btn btn-sm btn-danger" onclick="deleteUser(${user.id}, '${user.username}')">删除</button>
+                </td>
+            </tr>
+        `;
+    }).join('');
+}
+
+function legacyApplyUserChanges(window, users, updatedUsers) {
+    const updated = new Map(updatedUsers.map(user => [user.id, user]));
+    const compareUsers = window.compareUsers;
+    const result = users.map(user => updated.get(user.id) || user).sort(compareUsers);
+    legacyDisplayUsers(window.document, result);
+    return result;
+}
+
+function flipFavorite(user) {
+    return { ...user, is_favorite: !user.is_favorite, row_version: user.row_version + 1 };
+}
+
+function tableRows(document) {
+    return document.getElementById('user-table-body').querySelectorAll('tr.user-row').length;
+}
+
+async function benchLegacy(users) {
+    const { window } = await loadPage(users);
+    const { document } = window;
+    let current = users;
+    const render = [];
+    const toggle = [];
+    for (let run = 0; run < RUNS; run++) {
+        render.push(timeIt(() => legacyDisplayUsers(document, current)));
+        const target = current[Math.floor(current.length / 2) + run];
+        toggle.push(timeIt(() => {
+            current = legacyApplyUserChanges(window, current, [flipFavorite(target)]);
+        }));
+    }
+    // 旧实现每个按键都搜索并重绘一次
+    const searchResults = users.slice(0, SEARCH_RESULTS);
+    const search = timeIt(() => {
+        for (let i = 1; i <= SEARCH_TEXT.length; i++) {
+            legacyDisplayUsers(document, searchResults);
+        }
+    });
+    return {
+        render_ms: median(render),
+        toggle_ms: median(toggle),
+        scroll_ms: 0,
+        search_requests: SEARCH_TEXT.length,
+        search_render_ms: search,
+        dom_rows: users.length
+    };
+}
+
+async function benchVirtual(users) {
+    const { window, requests } = await loadPage(users);
+    const { document } = window;
+    const displayUsers = window.displayUsers;
+    const applyUserChanges = window.applyUserChanges;
+    const container = document.getElementById('user-table-scroll');
+    const render = [];
+    const toggle = [];
+    for (let run = 0; run < RUNS; run++) {
+        container.scrollTop = 0;
+        render.push(timeIt(() => displayUsers(window.eval('allUsers'))));
+        // 滚动到中间位置后切换一个可见用户的收藏状态
+        const current = window.eval('allUsers');
+        const middle = Math.floor(current.length / 2) + run;
+        container.scrollTop = middle * window.eval('rowHeight');
+        window.renderWindow(false);
+        const target = current[middle];
+        toggle.push(timeIt(() => applyUserChanges([flipFavorite(target)], [])));
+    }
+    const domRows = tableRows(document);
+
+    // 滚动：每次跳到一个新位置并重新计算可视区域
+    const scroll = [];
+    const total = window.eval('allUsers').length;
+    for (let step = 0; step < SCROLL_STEPS; step++) {
+        container.scrollTop = Math.floor((step * 7919) % total) * window.eval('rowHeight');
+        scroll.push(timeIt(() => window.renderWindow(false)));
+    }
+
+    // 搜索：逐字输入，按键间隔小于防抖时间，只应发出一次搜索请求
+    const input = document.getElementById('search-input');
+    const before = requests.filter(url => url.includes('/user/search')).length;
+    let searchRender = 0;
+    const originalDisplay = window.displayUsers;
+    window.displayUsers = (list) => {
+        searchRender += timeIt(() => originalDisplay(list));
+    };
+    for (let i = 1; i <= SEARCH_TEXT.length; i++) {
+        input.value = SEARCH_TEXT.slice(0, i);
+        input.dispatchEvent(new window.Event('input'));
+        await sleep(KEY_INTERVAL);
+    }
+    await sleep(window.eval('SEARCH_DEBOUNCE') + 100);
+    window.displayUsers = originalDisplay;
+    const searches = requests.filter(url => url.includes('/user/search')).length - before;
+
+    return {
+        render_ms: median(render),
+        toggle_ms: median(toggle),
+        scroll_ms: median(scroll),
+        search_requests: searches,
+        search_render_ms: searchRender,
+        dom_rows: domRows
+    };
+}
+
+function format(value) {
+    return typeof value === 'number' && !Number.isInteger(value) ? value.toFixed(2) : String(value);
+}
+
+async function main() {
+    console.log(`生成 ${USER_COUNT} 个联系人，每项重复 ${RUNS} 次取中位数...`);
+    const users = generateUsers(USER_COUNT);
+
+    const legacy = await benchLegacy(users);
+    const virtual = await benchVirtual(users);
+
+    const rows = [
+        ['首次渲染 (ms)', 'render_ms'],
+        ['切换一个收藏 (ms)', 'toggle_ms'],
+        ['滚动一次 (ms)', 'scroll_ms'],
+        [`输入「${SEARCH_TEXT}」的搜索请求数`, 'search_requests'],
+        ['输入期间重绘耗时 (ms)', 'search_render_ms'],
+        ['表格中的 DOM 行数', 'dom_rows']
+    ];
+    console.log('');
+    console.log(`${'场景'.padEnd(24)}${'旧实现'.padStart(12)}${'新实现'.padStart(12)}`);
+    rows.forEach(([label, key]) => {
+        console.log(`${label.padEnd(24)}${format(legacy[key]).padStart(12)}${format(virtual[key]).padStart(12)}`);
+    });
+    console.log('\n(旧实现没有虚拟滚动，滚动不需要重绘，记为 0)');
+    return true;
+}
+
+main().then(
+    success => process.exit(success ? 0 : 1),
+    error => {
+        console.error(error);
+        process.exit(1);
+    }
+);
@@ -1,6 +1,21 @@
 // API基础地址（后端服务地址）
 const API_BASE_URL = 'http://8.138.190.252:5000/api';
 
+// 读写分离：写操作返回一致性令牌，之后的读请求带上它，保证能读到自己刚写入的数据
+const CONSISTENCY_HEADER = 'X-Consistency-Token';
+const CONSISTENCY_STORAGE_KEY = 'consistencyToken';
+
+function getConsistencyToken() {
+    return sessionStorage.getItem(CONSISTENCY_STORAGE_KEY);
+}
+
+function rememberConsistencyToken(token) {
+    const current = Number(getConsistencyToken() || 0);
+    if (Number(token) > current) {
+        sessionStorage.setItem(CONSISTENCY_STORAGE_KEY, token);
+    }
+}
+
 // 封装fetch请求
 async function apiRequest(url, method = 'GET', data = null) {
     const options = {
@@ -16,12 +31,25 @@ async function apiRequest(url, method = 'GET', data = null) {
         options.body = JSON.stringify(data);
     }
 
+    const token = getConsistencyToken();
+    if (method === 'GET' && token) {
+        options.headers[CONSISTENCY_HEADER] = token;
+    }
+
     try {
         const response = await fetch(`${API_BASE_URL}${url}`, options);
+        const newToken = response.headers.get(CONSISTENCY_HEADER);
+        if (newToken) {
+            rememberConsistencyToken(newToken);
+        }
         const result = await response.json();
 
         if (!response.ok) {
-            throw new Error(result.message || `请求失败: ${response.status}`);
+            // 保留状态码与响应内容，调用方可以据此处理（如编辑冲突 409 时返回的最新数据）
+            const error = new Error(result.message || `请求失败: ${response.status}`);
+            error.status = response.status;
+            error.result = result;
+            throw error;
         }
 
         return result;
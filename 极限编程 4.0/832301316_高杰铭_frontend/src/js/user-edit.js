@@ -1,4 +1,22 @@
 const userId = getUrlParam('id');
+// 可编辑的字段；提交时只发送与加载时不同的字段
+const EDITABLE_FIELDS = ['username', 'phone', 'email', 'address', 'social_media', 'notes', 'is_favorite'];
+// 加载时的用户数据与行版本号，提交时带上；期间被其他人修改过时后端返回 409
+let loadedUser = null;
+let rowVersion = null;
+
+function fillForm(user) {
+    document.getElementById('username').value = user.username;
+    document.getElementById('phone').value = user.phone || '';
+    document.getElementById('email').value = user.email || '';
+    document.getElementById('address').value = user.address || '';
+    document.getElementById('social_media').value = user.social_media || '';
+    document.getElementById('notes').value = user.notes || '';
+    document.getElementById('operator').value = user.operator || 'system';
+    document.getElementById('is_favorite').checked = user.is_favorite || false;
+    loadedUser = user;
+    rowVersion = user.row_version;
+}
 
 async function loadUserInfo() {
     if (!userId) {
@@ -8,16 +26,7 @@ async function loadUserInfo() {
 
     try {
         const result = await apiRequest(`/user/${userId}`, 'GET');
-        const user = result.data;
-
-        document.getElementById('username').value = user.username;
-        document.getElementById('phone').value = user.phone || '';
-        document.getElementById('email').value = user.email || '';
-        document.getElementById('address').value = user.address || '';
-        document.getElementById('social_media').value = user.social_media || '';
-        document.getElementById('notes').value = user.notes || '';
-        document.getElementById('operator').value = user.operator || 'system';
-        document.getElementById('is_favorite').checked = user.is_favorite || false;
+        fillForm(result.data);
 
         const detailUrl = `user-detail.html?id=${userId}`;
         document.getElementById('detail-btn').href = detailUrl;
@@ -42,14 +51,35 @@ async function submitEditForm(e) {
         is_favorite: document.getElementById('is_favorite').checked
     };
 
+    // 只提交修改过的字段（PATCH），未修改的长备注等不需要重新上传
+    const changes = {};
+    EDITABLE_FIELDS.forEach(field => {
+        const original = field === 'is_favorite' ? Boolean(loadedUser[field]) : (loadedUser[field] || null);
+        if (formData[field] !== original) {
+            changes[field] = formData[field];
+        }
+    });
+    if (Object.keys(changes).length === 0) {
+        showAlert('没有需要保存的修改', 'info');
+        return;
+    }
+
     try {
-        const result = await apiRequest(`/user/edit/${userId}`, 'PUT', formData);
+        const result = await apiRequest(`/user/${userId}`, 'PATCH', {
+            ...changes,
+            operator: formData.operator,
+            row_version: rowVersion
+        });
         showAlert(result.message, 'success');
 
         setTimeout(() => {
             window.location.href = `user-detail.html?id=${userId}`;
         }, 2000);
     } catch (error) {
+        // 编辑冲突：显示其他人保存后的最新内容，确认后可再次提交
+        if (error.status === 409 && error.result && error.result.data) {
+            fillForm(error.result.data);
+        }
         console.error('更新用户失败:', error);
     }
 }
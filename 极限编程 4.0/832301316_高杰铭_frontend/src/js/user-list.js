@@ -1,27 +1,59 @@
 let allUsers = []; // 存储所有用户数据用于搜索过滤
+let displayedUsers = []; // 当前表格中显示的用户（全部或搜索结果）
+const selectedIds = new Set(); // 勾选的用户ID，用于批量操作
+const IMPORT_BATCH_SIZE = 1000; // 导入时每次请求提交的行数
+const BULK_BATCH_SIZE = 1000; // 批量操作每次请求提交的用户数（与后端 BULK_ACTION_MAX_IDS 一致）
+let changeCursor = null; // 增量同步游标，本地列表已包含该位置之前的全部变更
+const LIVE_SYNC_DELAY = 300; // 收到推送后延迟同步的毫秒数，短时间内的多个事件只同步一次
+const POLL_SYNC_INTERVAL = 15000; // 服务端不支持实时推送（同步部署）时定时增量同步的间隔毫秒数
+let liveSyncTimer = null;
+let syncQueue = Promise.resolve(); // 同步依次执行，避免并发请求使用同一个游标
+const ROW_HEIGHT = 80; // 行高估计值（像素），首次渲染后按实际行高修正
+const OVERSCAN_ROWS = 10; // 可视区域上下额外渲染的行数，快速滚动时不出现空白
+const SEARCH_DEBOUNCE = 250; // 停止输入多少毫秒后才发起搜索
+const SEARCH_PAGE_SIZE = 100; // 每次加载的搜索结果条数（与后端 USER_PAGE_SIZE_MAX 一致）
+const RESORT_THRESHOLD = 200; // 一次合并的用户数超过该值时整体重新排序，否则逐个二分插入
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+let rowHeight = ROW_HEIGHT;
+let rowHeightMeasured = false;
+let renderedRange = { start: 0, end: 0 };
+const renderedRows = new Map(); // 当前已渲染的行：用户ID -> { element, user, index, selected }
+let spacerRows = null;
+let renderFrame = null;
+let searchTimer = null;
+let searchCursor = null; // 搜索结果的下一页游标，没有更多结果时为 null
 
 async function loadUsers() {
     try {
+        // 先取当前位置的游标再加载列表，之后的变更都能通过增量同步拿到
+        const head = await apiRequest('/user/changes?latest=1', 'GET');
         const result = await apiRequest('/user/all', 'GET');
+        changeCursor = head.next_cursor;
         allUsers = result.data;
         displayUsers(allUsers);
     } catch (error) {
         console.error('加载用户失败:', error);
         document.getElementById('user-table-body').innerHTML = `
             <tr>
-                <td colspan="8" class="text-center text-danger">加载失败,请刷新页面重试</td>
+                <td colspan="9" class="text-center text-danger">加载失败,请刷新页面重试</td>
             </tr>
         `;
     }
 }
 
+// 虚拟滚动：表格放在固定高度的滚动容器中，只为可视区域内（上下各多渲染 OVERSCAN_ROWS 行）的用户创建 <tr>，
+// 上下用占位行撑出完整的滚动高度，5 万行时 DOM 中也只有几十行
 function displayUsers(users) {
     const tableBody = document.getElementById('user-table-body');
+    displayedUsers = users;
+    updateBulkToolbar();
 
     if (users.length === 0) {
+        renderedRows.clear();
+        renderedRange = { start: 0, end: 0 };
         tableBody.innerHTML = `
             <tr>
-                <td colspan="8" class="text-center">
+                <td colspan="9" class="text-center">
                     暂无用户数据,<a href="user-add.html" class="text-primary">去创建用户</a>
                 </td>
             </tr>
@@ -29,41 +61,163 @@ function displayUsers(users) {
         return;
     }
 
-    tableBody.innerHTML = users.map((user, index) => {
-        // 构建详细信息显示
-        const details = [];
-        if (user.address) details.push(`地址: ${user.address}`);
-        if (user.social_media) details.push(`社交媒体: ${user.social_media}`);
-        if (user.notes) details.push(`备注: ${user.notes}`);
-        const detailsHtml = details.length > 0 ? `<br><small class="text-muted">${details.join(' | ')}</small>` : '';
-
-        return `
-            <tr class="user-row">
-                <td>${index + 1}</td>
-                <td>
-                    <span class="star-icon ${user.is_favorite ? 'favorited' : ''}" 
-                          onclick="toggleFavorite(${user.id}, event)"
-                          title="${user.is_favorite ? '取消收藏' : '收藏'}">
-                        ${user.is_favorite ? '★' : '☆'}
-                    </span>
-                </td>
-                <td>
-                    <strong>${user.username}</strong>
-                    ${detailsHtml}
-                </td>
-                <td>${user.phone || '未填写'}</td>
-                <td>${user.email || '未填写'}</td>
-                <td>${user.create_time.split(' ')[0]}</td>
-                <td>${user.update_time}</td>
-                <td class="action-buttons">
-                    <a href="user-detail.html?id=${user.id}&display_id=${index + 1}" class="btn btn-sm btn-info">详情</a>
-                    <a href="user-edit.html?id=${user.id}" class="btn btn-sm btn-warning">编辑</a>
-                    <a href="user-versions.html?id=${user.id}" class="btn btn-sm btn-secondary">版本</a>
-                    <button class="btn btn-sm btn-danger" onclick="deleteUser(${user.id}, '${user.username}')">删除</button>
-                </td>
-            </tr>
-        `;
-    }).join('');
+    renderWindow(true);
+}
+
+// 渲染可视区域内的行；force 为 false 时（滚动）可视范围没变就什么都不做
+// 已渲染的行按用户ID复用，用户数据、序号和勾选状态都没变的行不做任何 DOM 操作
+function renderWindow(force) {
+    const container = document.getElementById('user-table-scroll');
+    const tableBody = document.getElementById('user-table-body');
+    if (displayedUsers.length === 0) {
+        return;
+    }
+    const viewportHeight = container.clientHeight || window.innerHeight;
+    const first = Math.min(Math.floor(container.scrollTop / rowHeight), displayedUsers.length - 1);
+    const start = Math.max(0, first - OVERSCAN_ROWS);
+    const end = Math.min(displayedUsers.length, first + Math.ceil(viewportHeight / rowHeight) + OVERSCAN_ROWS);
+    if (!force && start === renderedRange.start && end === renderedRange.end) {
+        return;
+    }
+    renderedRange = { start, end };
+
+    const rows = [];
+    const visibleIds = new Set();
+    for (let index = start; index < end; index++) {
+        const user = displayedUsers[index];
+        visibleIds.add(user.id);
+        rows.push(patchRow(user, index));
+    }
+    renderedRows.forEach((row, id) => {
+        if (!visibleIds.has(id)) {
+            renderedRows.delete(id);
+        }
+    });
+
+    const spacers = getSpacerRows();
+    spacers.top.firstElementChild.style.height = `${start * rowHeight}px`;
+    spacers.bottom.firstElementChild.style.height = `${(displayedUsers.length - end) * rowHeight}px`;
+    // 斑马纹按行的奇偶位置着色：起始行为奇数时多放一个隐藏行，滚动时每个用户的底色保持不变
+    const before = start % 2 === 1 ? [spacers.top, spacers.parity] : [spacers.top];
+    tableBody.replaceChildren(...before, ...rows, spacers.bottom);
+
+    // 首次渲染后用实际行高修正估计值，占位高度和滚动位置才准确
+    if (!rowHeightMeasured && rows[0].offsetHeight > 0) {
+        rowHeightMeasured = true;
+        if (rows[0].offsetHeight !== rowHeight) {
+            rowHeight = rows[0].offsetHeight;
+            renderWindow(true);
+        }
+    }
+}
+
+// 复用或创建某个用户的行，只有内容变化时才重写该行的 innerHTML
+function patchRow(user, index) {
+    const selected = selectedIds.has(user.id);
+    const row = renderedRows.get(user.id);
+    if (row && row.user === user && row.index === index && row.selected === selected) {
+        return row.element;
+    }
+    const element = row ? row.element : document.createElement('tr');
+    element.className = 'user-row';
+    element.dataset.id = user.id;
+    element.innerHTML = userRowHtml(user, index, selected);
+    renderedRows.set(user.id, { element, user, index, selected });
+    return element;
+}
+
+// 上、下占位行和保持斑马纹奇偶的隐藏行，创建一次后反复使用
+function getSpacerRows() {
+    if (!spacerRows) {
+        const createSpacer = () => {
+            const row = document.createElement('tr');
+            row.className = 'virtual-spacer';
+            row.innerHTML = '<td colspan="9"></td>';
+            return row;
+        };
+        spacerRows = { top: createSpacer(), bottom: createSpacer(), parity: document.createElement('tr') };
+        spacerRows.parity.style.display = 'none';
+    }
+    return spacerRows;
+}
+
+// 单行的 HTML；收藏、删除和勾选由 tbody 上的事件委托处理（见 handleTableClick）
+function userRowHtml(user, index, selected) {
+    // 构建详细信息显示
+    const details = [];
+    if (user.address) details.push(`地址: ${escapeHtml(user.address)}`);
+    if (user.social_media) details.push(`社交媒体: ${escapeHtml(user.social_media)}`);
+    if (user.notes) details.push(`备注: ${escapeHtml(user.notes)}`);
+    const detailsHtml = details.length > 0 ? `<br><small class="text-muted">${details.join(' | ')}</small>` : '';
+
+    return `
+        <td>
+            <input type="checkbox" class="form-check-input" data-action="select" ${selected ? 'checked' : ''}>
+        </td>
+        <td>${index + 1}</td>
+        <td>
+            <span class="star-icon ${user.is_favorite ? 'favorited' : ''}" data-action="favorite"
+                  title="${user.is_favorite ? '取消收藏' : '收藏'}">
+                ${user.is_favorite ? '★' : '☆'}
+            </span>
+        </td>
+        <td>
+            <strong>${escapeHtml(user.username)}</strong>
+            ${detailsHtml}
+        </td>
+        <td>${escapeHtml(user.phone || '未填写')}</td>
+        <td>${escapeHtml(user.email || '未填写')}</td>
+        <td>${user.create_time.split(' ')[0]}</td>
+        <td>${user.update_time}</td>
+        <td class="action-buttons">
+            <a href="user-detail.html?id=${user.id}&display_id=${index + 1}" class="btn btn-sm btn-info">详情</a>
+            <a href="user-edit.html?id=${user.id}" class="btn btn-sm btn-warning">编辑</a>
+            <a href="user-versions.html?id=${user.id}" class="btn btn-sm btn-secondary">版本</a>
+            <button class="btn btn-sm btn-danger" data-action="delete">删除</button>
+        </td>
+    `;
+}
+
+function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, char => HTML_ESCAPES[char]);
+}
+
+// 滚动时每帧最多重新计算一次可视范围
+function scheduleRender() {
+    if (renderFrame) {
+        return;
+    }
+    renderFrame = requestAnimationFrame(() => {
+        renderFrame = null;
+        renderWindow(false);
+    });
+}
+
+function scrollToTop() {
+    document.getElementById('user-table-scroll').scrollTop = 0;
+}
+
+// 行内的收藏、删除按钮由 tbody 统一处理，行被复用或重绘时不需要重新绑定事件
+function handleTableClick(event) {
+    const target = event.target.closest('[data-action]');
+    if (!target || target.dataset.action === 'select') {
+        return;
+    }
+    const row = renderedRows.get(Number(target.closest('tr').dataset.id));
+    if (!row) {
+        return;
+    }
+    if (target.dataset.action === 'favorite') {
+        toggleFavorite(row.user.id, event);
+    } else if (target.dataset.action === 'delete') {
+        deleteUser(row.user.id, row.user.username);
+    }
+}
+
+function handleTableChange(event) {
+    if (event.target.dataset.action === 'select') {
+        toggleSelection(Number(event.target.closest('tr').dataset.id), event.target.checked);
+    }
 }
 
 async function toggleFavorite(userId, event) {
@@ -75,7 +229,8 @@ async function toggleFavorite(userId, event) {
     try {
         const result = await apiRequest(`/user/toggle-favorite/${userId}`, 'POST');
         showAlert(result.message, 'success');
-        await loadUsers(); // 重新加载用户列表
+        // 用返回的最新数据更新本地列表，无需重新加载整个列表
+        applyUserChanges([result.data], []);
     } catch (error) {
         console.error('切换收藏状态失败:', error);
         showAlert('切换收藏状态失败', 'danger');
@@ -90,82 +245,276 @@ async function deleteUser(userId, username) {
     try {
         const result = await apiRequest(`/user/delete/${userId}`, 'DELETE');
         showAlert(result.message, 'success');
-        await loadUsers();
+        applyUserChanges([], [userId]);
     } catch (error) {
         console.error('删除用户失败:', error);
     }
 }
 
-// 搜索功能
-function searchUsers() {
-    const searchTerm = document.getElementById('search-input').value.toLowerCase().trim();
+// 列表排序与后端一致：收藏的在前，其次按创建时间、ID 倒序
+function compareUsers(a, b) {
+    if (a.is_favorite !== b.is_favorite) {
+        return a.is_favorite ? -1 : 1;
+    }
+    if (a.create_time !== b.create_time) {
+        return a.create_time < b.create_time ? 1 : -1;
+    }
+    return b.id - a.id;
+}
 
-    if (!searchTerm) {
+// 在已排序的列表中二分查找 user 应插入的位置
+function sortedIndex(users, user) {
+    let low = 0;
+    let high = users.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (compareUsers(users[mid], user) <= 0) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+}
+
+// 把变更合并进本地列表：删除的用户移除，新增或更新的用户按排序规则插入到正确位置（不重新排序整个列表），
+// 然后只重绘可视区域内受影响的行。显示搜索结果时在结果中原地替换，不重新发起搜索
+function applyUserChanges(updatedUsers, deletedIds) {
+    const showingAll = displayedUsers === allUsers;
+    const updated = new Map(updatedUsers.map(user => [user.id, user]));
+    const removed = new Set(deletedIds);
+    updated.forEach((user, id) => removed.add(id));
+
+    allUsers = allUsers.filter(user => !removed.has(user.id));
+    if (updated.size > RESORT_THRESHOLD) {
+        allUsers = allUsers.concat(Array.from(updated.values())).sort(compareUsers);
+    } else {
+        updated.forEach(user => allUsers.splice(sortedIndex(allUsers, user), 0, user));
+    }
+    deletedIds.forEach(id => selectedIds.delete(id));
+
+    if (showingAll) {
         displayUsers(allUsers);
+    } else {
+        const deleted = new Set(deletedIds);
+        displayUsers(displayedUsers
+            .filter(user => !deleted.has(user.id))
+            .map(user => updated.get(user.id) || user));
+    }
+}
+
+// 增量同步：只拉取游标之后新增、修改和删除的用户并合并进本地列表，不重新下载整个列表
+async function syncChanges() {
+    if (!changeCursor) {
+        await loadUsers();
         return;
     }
+    try {
+        const updated = new Map();
+        const deleted = new Set();
+        let hasMore = true;
+        while (hasMore) {
+            const result = await apiRequest(`/user/changes?since=${encodeURIComponent(changeCursor)}`, 'GET');
+            result.data.forEach(change => {
+                if (change.type === 'delete') {
+                    updated.delete(change.id);
+                    deleted.add(change.id);
+                } else {
+                    deleted.delete(change.id);
+                    updated.set(change.id, change.data);
+                }
+            });
+            changeCursor = result.next_cursor;
+            hasMore = result.has_more;
+        }
+        applyUserChanges(Array.from(updated.values()), Array.from(deleted));
+    } catch (error) {
+        console.error('同步用户变更失败:', error);
+        await loadUsers();
+    }
+}
+
+// 订阅实时推送：其他人新增、修改、删除联系人后收到事件，随即增量同步
+// 服务端每次只保持连接很短时间，断开后浏览器自动重连并带上 Last-Event-ID，不会漏掉事件
+// 同步部署的服务端不保持连接（ready 事件中 push 为 false），此时关闭连接改为定时增量同步，
+// 避免浏览器每隔几秒重连一次
+function subscribeChanges() {
+    if (!window.EventSource) {
+        pollChanges();
+        return;
+    }
+    const source = new EventSource(`${API_BASE_URL}/user/stream`);
+    source.addEventListener('ready', event => {
+        if (JSON.parse(event.data).push === false) {
+            source.close();
+            pollChanges();
+        }
+    });
+    ['create', 'update', 'delete', 'favorite'].forEach(type => source.addEventListener(type, scheduleSync));
+}
 
-    const filteredUsers = allUsers.filter(user => {
-        return (
-            user.username.toLowerCase().includes(searchTerm) ||
-            (user.phone && user.phone.toLowerCase().includes(searchTerm)) ||
-            (user.email && user.email.toLowerCase().includes(searchTerm)) ||
-            (user.address && user.address.toLowerCase().includes(searchTerm)) ||
-            (user.social_media && user.social_media.toLowerCase().includes(searchTerm)) ||
-            (user.notes && user.notes.toLowerCase().includes(searchTerm))
-        );
+// 定时增量同步；页面在后台时跳过，切回前台时立即同步一次
+function pollChanges() {
+    setInterval(() => {
+        if (!document.hidden) {
+            queueSync();
+        }
+    }, POLL_SYNC_INTERVAL);
+    document.addEventListener('visibilitychange', () => {
+        if (!document.hidden) {
+            queueSync();
+        }
     });
+}
 
-    displayUsers(filteredUsers);
+function scheduleSync() {
+    clearTimeout(liveSyncTimer);
+    liveSyncTimer = setTimeout(queueSync, LIVE_SYNC_DELAY);
 }
 
-// 导出Excel功能
-function exportToExcel() {
-    if (allUsers.length === 0) {
-        showAlert('没有数据可以导出', 'warning');
+function queueSync() {
+    syncQueue = syncQueue.then(syncChanges);
+    return syncQueue;
+}
+
+function toggleSelection(userId, checked) {
+    if (checked) {
+        selectedIds.add(userId);
+    } else {
+        selectedIds.delete(userId);
+    }
+    updateBulkToolbar();
+}
+
+function updateBulkToolbar() {
+    document.getElementById('bulk-toolbar').style.display = selectedIds.size > 0 ? '' : 'none';
+    document.getElementById('bulk-selected-count').textContent = selectedIds.size;
+    const selectAll = document.getElementById('select-all-checkbox');
+    selectAll.checked = displayedUsers.length > 0 && displayedUsers.every(user => selectedIds.has(user.id));
+}
+
+function selectAllDisplayed(checked) {
+    displayedUsers.forEach(user => (checked ? selectedIds.add(user.id) : selectedIds.delete(user.id)));
+    displayUsers(displayedUsers);
+}
+
+function clearSelection() {
+    selectedIds.clear();
+    displayUsers(displayedUsers);
+}
+
+// 批量操作：勾选的用户按批提交给 /user/bulk，全部完成后只重新加载一次列表
+async function bulkAction(action) {
+    const ids = Array.from(selectedIds);
+    if (ids.length === 0) {
+        return;
+    }
+
+    let operator = 'system';
+    if (action === 'delete' && !confirm(`确定要删除选中的 ${ids.length} 个用户吗？`)) {
         return;
     }
+    if (action === 'set_operator') {
+        operator = (prompt('请输入新的操作人：') || '').trim();
+        if (!operator) {
+            return;
+        }
+    }
+
+    let successCount = 0;
+    let failCount = 0;
+    for (let start = 0; start < ids.length; start += BULK_BATCH_SIZE) {
+        const batch = ids.slice(start, start + BULK_BATCH_SIZE);
+        try {
+            const result = await apiRequest('/user/bulk', 'POST', { action, ids: batch, operator });
+            if (result.code !== 200) {
+                throw new Error(result.message);
+            }
+            successCount += result.data.success_count;
+            failCount += result.data.fail_count;
+        } catch (error) {
+            failCount += batch.length;
+            console.error('批量操作失败:', error);
+        }
+    }
+
+    const alertType = failCount === 0 ? 'success' : (successCount > 0 ? 'info' : 'danger');
+    showAlert(`批量操作完成！成功: ${successCount}, 失败: ${failCount}`, alertType);
+    selectedIds.clear();
+    await queueSync();
+}
 
-    // 准备导出数据
-    const exportData = allUsers.map((user, index) => ({
-        'ID': index + 1,
-        '姓名': user.username,
-        '电话': user.phone || '',
-        '邮箱': user.email || '',
-        '地址': user.address || '',
-        '社交媒体': user.social_media || '',
-        '备注': user.notes || '',
-        '收藏': user.is_favorite ? '是' : '否',
-        '创建时间': user.create_time,
-        '最后更新': user.update_time
-    }));
-
-    // 创建工作簿
-    const wb = XLSX.utils.book_new();
-    const ws = XLSX.utils.json_to_sheet(exportData);
-
-    // 设置列宽
-    ws['!cols'] = [
-        { wch: 5 },  // ID
-        { wch: 15 }, // 姓名
-        { wch: 15 }, // 电话
-        { wch: 25 }, // 邮箱
-        { wch: 30 }, // 地址
-        { wch: 20 }, // 社交媒体
-        { wch: 30 }, // 备注
-        { wch: 8 },  // 收藏
-        { wch: 20 }, // 创建时间
-        { wch: 20 }  // 最后更新
-    ];
-
-    XLSX.utils.book_append_sheet(wb, ws, '联系人列表');
-
-    // 生成文件名
-    const filename = `联系人列表_${new Date().toISOString().split('T')[0]}.xlsx`;
-
-    // 下载文件
-    XLSX.writeFile(wb, filename);
-    showAlert('导出成功！', 'success');
+// 输入停止 SEARCH_DEBOUNCE 毫秒后再搜索，连续输入时不会每个按键都发请求、重绘表格
+function scheduleSearch() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(searchUsers, SEARCH_DEBOUNCE);
+}
+
+// 搜索功能（由后端 n-gram 索引检索，无需先下载整个地址簿）
+// 每次加载 SEARCH_PAGE_SIZE 条，还有更多结果时显示“加载更多”按钮，append 为 true 时追加下一页
+async function searchUsers(append = false) {
+    const searchInput = document.getElementById('search-input');
+    const searchTerm = searchInput.value.trim();
+
+    if (!searchTerm) {
+        showAllUsers();
+        return;
+    }
+
+    try {
+        let url = `/user/search?q=${encodeURIComponent(searchTerm)}&limit=${SEARCH_PAGE_SIZE}`;
+        if (append && searchCursor) {
+            url += `&cursor=${encodeURIComponent(searchCursor)}`;
+        }
+        const result = await apiRequest(url, 'GET');
+        // 请求返回前输入框已变化，丢弃过期结果
+        if (searchInput.value.trim() !== searchTerm) {
+            return;
+        }
+        if (result.code !== 200) {
+            // 游标无效等情况：保留当前列表，只提示原因
+            setSearchStatus(result.message, null);
+            return;
+        }
+        const users = result.data || [];
+        if (append) {
+            displayUsers(displayedUsers.concat(users));
+        } else {
+            scrollToTop();
+            displayUsers(users);
+        }
+        setSearchStatus(`找到 ${displayedUsers.length}${result.has_more ? '+' : ''} 个匹配的联系人`,
+            result.has_more ? result.next_cursor : null);
+    } catch (error) {
+        console.error('搜索用户失败:', error);
+    }
+}
+
+// 更新搜索提示和“加载更多”按钮；cursor 为 null 表示没有下一页
+function setSearchStatus(message, cursor) {
+    searchCursor = cursor;
+    document.getElementById('search-status').textContent = message;
+    document.getElementById('search-more-btn').style.display = cursor ? '' : 'none';
+}
+
+// 退出搜索，显示完整列表
+function showAllUsers() {
+    setSearchStatus('', null);
+    if (displayedUsers !== allUsers) {
+        scrollToTop();
+        displayUsers(allUsers);
+    }
+}
+
+// 导出Excel功能（由后端流式生成文件，不依赖浏览器中已加载的数据）
+function exportToExcel() {
+    const link = document.createElement('a');
+    const token = getConsistencyToken();
+    link.href = `${API_BASE_URL}/user/export?format=xlsx${token ? `&consistency=${token}` : ''}`;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    showAlert('正在导出，请稍候...', 'info');
 }
 
 // 导入Excel功能
@@ -191,54 +540,61 @@ function importFromExcel(file) {
             let successCount = 0;
             let failCount = 0;
             const errors = [];
+            const rows = [];
 
-            // 逐个创建用户
+            // 整理每一行数据，姓名为空的行直接记为失败
             for (let i = 0; i < jsonData.length; i++) {
                 const row = jsonData[i];
-                try {
-                    // 只读取需要的字段，忽略ID、创建时间、最后更新、操作人
-                    const username = (row['姓名'] || '').toString().trim();
-                    const phone = (row['电话'] || '').toString().trim();
-                    const email = (row['邮箱'] || '').toString().trim();
-                    const address = (row['地址'] || '').toString().trim();
-                    const social_media = (row['社交媒体'] || '').toString().trim();
-                    const notes = (row['备注'] || '').toString().trim();
-
-                    // 处理收藏字段：支持"是"/"否"或true/false
-                    let is_favorite = false;
-                    if (row['收藏'] === '是' || row['收藏'] === true || row['收藏'] === 'true' || row['收藏'] === 1) {
-                        is_favorite = true;
-                    }
+                // 只读取需要的字段，忽略ID、创建时间、最后更新、操作人
+                const username = (row['姓名'] || '').toString().trim();
 
-                    // 验证必填字段
-                    if (!username) {
-                        failCount++;
-                        errors.push(`第${i + 2}行: 姓名不能为空`);
-                        console.warn(`跳过第${i + 2}行: 姓名为空`);
-                        continue;
-                    }
+                // 处理收藏字段：支持"是"/"否"或true/false
+                let is_favorite = false;
+                if (row['收藏'] === '是' || row['收藏'] === true || row['收藏'] === 'true' || row['收藏'] === 1) {
+                    is_favorite = true;
+                }
 
-                    const userData = {
-                        username: username,
-                        phone: phone || null,
-                        email: email || null,
-                        address: address || null,
-                        social_media: social_media || null,
-                        notes: notes || null,
-                        is_favorite: is_favorite,
-                        operator: 'system'  // 默认操作人
-                    };
+                // 验证必填字段
+                if (!username) {
+                    failCount++;
+                    errors.push(`第${i + 2}行: 姓名不能为空`);
+                    console.warn(`跳过第${i + 2}行: 姓名为空`);
+                    continue;
+                }
 
-                    console.log(`准备导入第${i + 2}行:`, userData);
+                rows.push({
+                    row: i + 2,
+                    username: username,
+                    phone: (row['电话'] || '').toString().trim() || null,
+                    email: (row['邮箱'] || '').toString().trim() || null,
+                    address: (row['地址'] || '').toString().trim() || null,
+                    social_media: (row['社交媒体'] || '').toString().trim() || null,
+                    notes: (row['备注'] || '').toString().trim() || null,
+                    is_favorite: is_favorite
+                });
+            }
 
-                    const result = await apiRequest('/user/create', 'POST', userData);
-                    console.log(`第${i + 2}行导入成功:`, result);
-                    successCount++;
+            // 分批提交给批量创建接口，每批一次请求
+            for (let start = 0; start < rows.length; start += IMPORT_BATCH_SIZE) {
+                const batch = rows.slice(start, start + IMPORT_BATCH_SIZE);
+                try {
+                    const result = await apiRequest('/user/bulk-create', 'POST', {
+                        users: batch,
+                        operator: 'system'  // 默认操作人
+                    });
+                    if (result.code !== 200) {
+                        throw new Error(result.message);
+                    }
+                    successCount += result.data.success_count;
+                    failCount += result.data.fail_count;
+                    result.data.results
+                        .filter(item => !item.success)
+                        .forEach(item => errors.push(item.message));
                 } catch (error) {
-                    failCount++;
+                    failCount += batch.length;
                     const errorMsg = error.message || error.toString();
-                    errors.push(`第${i + 2}行 (${row['姓名'] || '未知'}): ${errorMsg}`);
-                    console.error(`导入第${i + 2}行失败:`, error);
+                    batch.forEach(item => errors.push(`第${item.row}行 (${item.username}): ${errorMsg}`));
+                    console.error(`导入第${batch[0].row}-${batch[batch.length - 1].row}行失败:`, error);
                 }
             }
 
@@ -251,7 +607,7 @@ function importFromExcel(file) {
             const alertType = failCount === 0 ? 'success' : (successCount > 0 ? 'info' : 'danger');
             showAlert(message, alertType);
 
-            await loadUsers(); // 重新加载用户列表
+            await queueSync(); // 只同步新导入的用户，不重新加载整个列表
 
         } catch (error) {
             console.error('读取Excel文件失败:', error);
@@ -264,16 +620,36 @@ function importFromExcel(file) {
 
 // 事件监听器
 document.addEventListener('DOMContentLoaded', function () {
-    loadUsers();
+    loadUsers().then(subscribeChanges);
 
     // 搜索输入事件
-    document.getElementById('search-input').addEventListener('input', searchUsers);
+    document.getElementById('search-input').addEventListener('input', scheduleSearch);
 
     // 清空搜索按钮
     document.getElementById('clear-search-btn').addEventListener('click', function () {
         document.getElementById('search-input').value = '';
-        displayUsers(allUsers);
+        clearTimeout(searchTimer);
+        showAllUsers();
+    });
+
+    // 搜索结果加载更多
+    document.getElementById('search-more-btn').addEventListener('click', () => searchUsers(true));
+
+    // 表格：行内的收藏、删除、勾选用事件委托处理；滚动时重新计算可视区域
+    const tableBody = document.getElementById('user-table-body');
+    tableBody.addEventListener('click', handleTableClick);
+    tableBody.addEventListener('change', handleTableChange);
+    document.getElementById('user-table-scroll').addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', scheduleRender);
+
+    // 批量操作
+    document.getElementById('select-all-checkbox').addEventListener('change', function (e) {
+        selectAllDisplayed(e.target.checked);
+    });
+    document.querySelectorAll('[data-bulk-action]').forEach(button => {
+        button.addEventListener('click', () => bulkAction(button.dataset.bulkAction));
     });
+    document.getElementById('bulk-clear-btn').addEventListener('click', clearSelection);
 
     // 导出Excel按钮
     document.getElementById('export-excel-btn').addEventListener('click', exportToExcel);
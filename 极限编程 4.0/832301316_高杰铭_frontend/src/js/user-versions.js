@@ -1,6 +1,10 @@
 const userId = getUrlParam('id');
+const VERSION_PAGE_SIZE = 50; // 每次加载的版本记录条数
+let nextCursor = null; // 下一页游标
+let loadedCount = 0; // 已显示的版本记录数
 
-async function loadVersions() {
+// 加载版本历史，append 为 true 时追加下一页
+async function loadVersions(append = false) {
     if (!userId) {
         showAlert('用户ID不存在', 'danger');
         return;
@@ -9,14 +13,27 @@ async function loadVersions() {
     document.getElementById('detail-btn').href = `user-detail.html?id=${userId}`;
 
     try {
-        const result = await apiRequest(`/user/versions/${userId}`, 'GET');
+        let url = `/user/versions/${userId}?limit=${VERSION_PAGE_SIZE}`;
+        if (append && nextCursor) {
+            url += `&cursor=${encodeURIComponent(nextCursor)}`;
+        }
+        const result = await apiRequest(url, 'GET');
         const versions = result.data;
         const tableBody = document.getElementById('versions-table-body');
         const versionCount = document.getElementById('version-count');
+        const loadMoreBtn = document.getElementById('load-more-btn');
+
+        // 总数由后端计数字段提供，不需要加载全部记录
+        versionCount.textContent = `共 ${result.total} 次修改记录（含初始创建）`;
+        nextCursor = result.next_cursor;
+        loadMoreBtn.style.display = result.has_more ? '' : 'none';
 
-        versionCount.textContent = `共 ${versions.length} 次修改记录（含初始创建）`;
+        if (!append) {
+            loadedCount = 0;
+            tableBody.innerHTML = '';
+        }
 
-        if (versions.length === 0) {
+        if (!append && versions.length === 0) {
             tableBody.innerHTML = `
                 <tr>
                     <td colspan="10" class="text-center">暂无版本记录</td>
@@ -25,9 +42,9 @@ async function loadVersions() {
             return;
         }
 
-        tableBody.innerHTML = versions.map((version, index) => `
+        tableBody.insertAdjacentHTML('beforeend', versions.map((version, index) => `
             <tr>
-                <td>${index + 1}</td>
+                <td>${loadedCount + index + 1}</td>
                 <td>${version.username}</td>
                 <td>${version.phone || '未填写'}</td>
                 <td>${version.email || '未填写'}</td>
@@ -40,7 +57,8 @@ async function loadVersions() {
                     <button class="btn btn-sm btn-danger" onclick="deleteVersion(${version.id})">删除</button>
                 </td>
             </tr>
-        `).join('');
+        `).join(''));
+        loadedCount += versions.length;
 
     } catch (error) {
         console.error('加载版本历史失败:', error);
@@ -76,4 +94,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     loadVersions();
+
+    // 加载更多按钮
+    document.getElementById('load-more-btn').addEventListener('click', () => loadVersions(true));
 });
\ No newline at end of file